@@ -6,8 +6,11 @@ from flask_jwt_extended import jwt_required
 from backend.database import db
 from backend.saas_models import User, Subscription, Script, UsageMetric
 from backend.auth_utils import get_current_user
-from datetime import datetime, timedelta
+from backend.identity import current_is_admin
+from backend.admin_stats import platform_stats
+from datetime import datetime
 from sqlalchemy import func
+from sqlalchemy.orm import joinedload
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -17,8 +20,8 @@ def admin_required(f):
     @wraps(f)
     @jwt_required()
     def decorated_function(*args, **kwargs):
-        user = get_current_user()
-        if not user or not user.is_admin:
+        # Claim `adm` du JWT si à jour, sinon l'identité de la requête (mémorisée)
+        if not current_is_admin():
             return jsonify({'error': 'Admin access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -26,50 +29,9 @@ def admin_required(f):
 @admin_bp.route('/stats', methods=['GET'])
 @admin_required
 def get_platform_stats():
-    """Get global platform statistics"""
+    """Get global platform statistics (tables d'agrégats, voir admin_stats)"""
     try:
-        # User stats
-        total_users = User.query.count()
-        verified_users = User.query.filter_by(email_verified=True).count()
-        
-        # Subscription stats
-        free_users = Subscription.query.filter_by(plan_type='free').count()
-        pro_users = Subscription.query.filter_by(plan_type='pro').count()
-        enterprise_users = Subscription.query.filter_by(plan_type='enterprise').count()
-        
-        # Script stats
-        total_scripts = Script.query.count()
-        scripts_today = Script.query.filter(
-            Script.created_at >= datetime.utcnow().date()
-        ).count()
-        
-        # Monthly revenue (estimated)
-        monthly_revenue = (pro_users * 19) + (enterprise_users * 99)
-        
-        # Recent signups (last 7 days)
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_signups = User.query.filter(User.created_at >= week_ago).count()
-        
-        return jsonify({
-            'users': {
-                'total': total_users,
-                'verified': verified_users,
-                'recent_signups': recent_signups
-            },
-            'subscriptions': {
-                'free': free_users,
-                'pro': pro_users,
-                'enterprise': enterprise_users
-            },
-            'scripts': {
-                'total': total_scripts,
-                'today': scripts_today
-            },
-            'revenue': {
-                'monthly': monthly_revenue,
-                'annual': monthly_revenue * 12
-            }
-        }), 200
+        return jsonify(platform_stats()), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -83,7 +45,8 @@ def list_all_users():
         per_page = request.args.get('per_page', 50, type=int)
         search = request.args.get('search', '')
         
-        query = User.query
+        # Abonnement chargé dans la même requête (JOIN), pas un SELECT par ligne
+        query = User.query.options(joinedload(User.subscription))
         
         if search:
             query = query.filter(
@@ -94,6 +57,15 @@ def list_all_users():
         query = query.order_by(User.created_at.desc())
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         
+        # Nombre de scripts de la page : un seul GROUP BY
+        user_ids = [user.id for user in pagination.items]
+        scripts_counts = dict(
+            db.session.query(Script.user_id, func.count(Script.id))
+            .filter(Script.user_id.in_(user_ids))
+            .group_by(Script.user_id)
+            .all()
+        ) if user_ids else {}
+        
         users = [{
             'id': user.id,
             'name': user.name,
@@ -102,7 +74,7 @@ def list_all_users():
             'email_verified': user.email_verified,
             'created_at': user.created_at.isoformat(),
             'subscription': user.subscription.to_dict() if user.subscription else None,
-            'scripts_count': Script.query.filter_by(user_id=user.id).count()
+            'scripts_count': scripts_counts.get(user.id, 0)
         } for user in pagination.items]
         
         return jsonify({
@@ -120,7 +92,7 @@ def list_all_users():
 def get_user_details(user_id):
     """Get detailed user information"""
     try:
-        user = User.query.get(user_id)
+        user = User.query.options(joinedload(User.subscription)).get(user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -233,8 +205,14 @@ def delete_user(user_id):
 def get_recent_activity():
     """Get recent platform activity"""
     try:
-        # Recent scripts
-        recent_scripts = Script.query.order_by(Script.created_at.desc()).limit(20).all()
+        # Recent scripts : colonnes utiles + email de l'auteur en une requête (sans le contenu)
+        recent_scripts = (
+            db.session.query(Script.id, Script.title, Script.platform, Script.created_at, User.email)
+            .outerjoin(User, User.id == Script.user_id)
+            .order_by(Script.created_at.desc())
+            .limit(20)
+            .all()
+        )
         
         # Recent signups
         recent_users = User.query.order_by(User.created_at.desc()).limit(10).all()
@@ -244,7 +222,7 @@ def get_recent_activity():
                 'id': s.id,
                 'title': s.title,
                 'platform': s.platform,
-                'user_email': User.query.get(s.user_id).email if User.query.get(s.user_id) else 'Unknown',
+                'user_email': s.email or 'Unknown',
                 'created_at': s.created_at.isoformat()
             } for s in recent_scripts],
             'recent_users': [{
@@ -0,0 +1,204 @@
+"""
+Statistiques du tableau de bord admin lues dans des tables d'agrégats (`stats_daily`,
+`stats_plans`) au lieu de COUNT(*) sur `users` / `subscriptions` / `scripts` à chaque
+chargement : la latence ne dépend plus du volume des tables.
+
+- `refresh()` (tâche Celery beat) recalcule les derniers jours (plages indexées sur
+  `created_at`) et la répartition par plan (un GROUP BY).
+- `refresh(full=True)` (quotidien, ou tables vides) reconstruit tout l'historique :
+  corrige les suppressions de scripts / comptes antérieures à la fenêtre.
+- Un seul recalcul à la fois, tous processus confondus (verrou Redis) : au premier
+  chargement, les requêtes concurrentes attendent la reconstruction au lieu de la refaire
+  (et de se heurter sur la clé primaire `day`).
+- `platform_stats()` met le résultat en cache mémoire (par processus) STATS_CACHE_SEC.
+
+Env :
+  STATS_CACHE_SEC       défaut 30
+  STATS_REFRESH_SEC     défaut 300 (période du rafraîchissement incrémental)
+  STATS_WINDOW_DAYS     défaut 2 (jours recalculés à chaque passage)
+  STATS_LOCK_WAIT_SEC   défaut 30 (attente maximale du verrou de recalcul)
+"""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from backend.database import db
+from backend.redis_client import get_redis_client
+from backend.saas_models import DailyStat, PlanStat, Script, Subscription, User
+
+logger = logging.getLogger(__name__)
+
+CACHE_SEC = float(os.getenv('STATS_CACHE_SEC', '30'))
+WINDOW_DAYS = int(os.getenv('STATS_WINDOW_DAYS', '2'))
+LOCK_WAIT_SEC = float(os.getenv('STATS_LOCK_WAIT_SEC', '30'))
+_LOCK_KEY = 'stats:refresh_lock'
+_LOCK_TTL = 600  # reconstruction complète la plus longue attendue (verrou libéré si le worker meurt)
+
+# Revenu mensuel estimé par plan
+PLAN_PRICES = {'pro': 19, 'enterprise': 99}
+
+_cache = {'at': 0.0, 'value': None}
+_cache_lock = threading.Lock()
+_refresh_local = threading.Lock()  # sans Redis : sérialisation limitée au processus
+
+
+def _as_date(value) -> date:
+    # func.date() : objet date (PostgreSQL) ou chaîne ISO (SQLite)
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _per_day(column, since: Optional[datetime]) -> Dict[date, int]:
+    query = db.session.query(func.date(column), func.count()).group_by(func.date(column))
+    if since is not None:
+        query = query.filter(column >= since)
+    return {_as_date(day): count for day, count in query.all() if day is not None}
+
+
+@contextmanager
+def _refresh_lock(wait: float):
+    """Verrou Redis partagé par l'API et les workers ; cède `False` si non obtenu après `wait` s."""
+    client = get_redis_client()
+    lock = None
+    if client is not None:
+        try:
+            lock = client.lock(_LOCK_KEY, timeout=_LOCK_TTL, blocking_timeout=wait)
+            acquired = lock.acquire()
+        except Exception as e:
+            logger.warning("Verrou des statistiques indisponible, verrou local: %s", e)
+            lock = None
+    if lock is None:
+        acquired = _refresh_local.acquire(timeout=wait)
+    try:
+        yield acquired
+    finally:
+        if acquired and lock is None:
+            _refresh_local.release()
+        elif acquired:
+            try:
+                lock.release()
+            except Exception:
+                pass  # verrou Redis expiré entre-temps
+
+
+def _is_empty() -> bool:
+    return not db.session.query(PlanStat.plan_type).first()
+
+
+def refresh(full: bool = False, if_empty: bool = False) -> dict:
+    """
+    Recalcule les agrégats ; `full` reconstruit tout l'historique quotidien.
+    `if_empty` : seulement si les tables sont encore vides une fois le verrou obtenu
+    (un autre processus a pu les remplir pendant l'attente).
+    """
+    with _refresh_lock(LOCK_WAIT_SEC) as acquired:
+        if not acquired:
+            return {'skipped': 'locked', 'full': full}
+        if if_empty and not _is_empty():
+            return {'skipped': 'ready', 'full': full}
+        try:
+            return _refresh(full)
+        except IntegrityError as e:
+            # Sans verrou partagé (Redis absent), deux processus ont pu écrire le même jour
+            db.session.rollback()
+            logger.warning("Recalcul des statistiques concurrent abandonné: %s", e)
+            return {'skipped': 'conflict', 'full': full}
+
+
+def _refresh(full: bool) -> dict:
+    now = datetime.utcnow()
+    since = None if full else datetime.combine(now.date() - timedelta(days=WINDOW_DAYS - 1), datetime.min.time())
+    signups = _per_day(User.created_at, since)
+    scripts = _per_day(Script.created_at, since)
+
+    daily = DailyStat.query
+    if since is not None:
+        daily = daily.filter(DailyStat.day >= since.date())
+    daily.delete(synchronize_session=False)
+    for day in sorted(set(signups) | set(scripts)):
+        db.session.add(DailyStat(day=day, signups=signups.get(day, 0), scripts=scripts.get(day, 0), updated_at=now))
+
+    plans = (
+        db.session.query(func.coalesce(Subscription.plan_type, 'none'), User.email_verified, func.count(User.id))
+        .outerjoin(Subscription, Subscription.user_id == User.id)
+        .group_by(func.coalesce(Subscription.plan_type, 'none'), User.email_verified)
+        .all()
+    )
+    # email_verified NULL et False tombent sur la même clé : fusion avant insertion
+    merged: Dict[tuple, int] = {}
+    for plan_type, verified, count in plans:
+        key = (plan_type, bool(verified))
+        merged[key] = merged.get(key, 0) + count
+    PlanStat.query.delete(synchronize_session=False)
+    for (plan_type, verified), count in merged.items():
+        db.session.add(PlanStat(plan_type=plan_type, email_verified=verified, users=count, updated_at=now))
+    db.session.commit()
+    invalidate()
+    return {'days': len(set(signups) | set(scripts)), 'plans': len(merged), 'full': full}
+
+
+def invalidate() -> None:
+    with _cache_lock:
+        _cache['at'] = 0.0
+
+
+def _compute() -> dict:
+    if _is_empty():
+        refresh(full=True, if_empty=True)  # premier chargement : tables d'agrégats encore vides
+
+    today = datetime.utcnow().date()
+    scripts_total, = db.session.query(func.coalesce(func.sum(DailyStat.scripts), 0)).one()
+    today_row = DailyStat.query.get(today)
+    recent_signups, = (  # 7 derniers jours, aujourd'hui compris
+        db.session.query(func.coalesce(func.sum(DailyStat.signups), 0))
+        .filter(DailyStat.day >= today - timedelta(days=6))
+        .one()
+    )
+    per_plan: Dict[str, int] = {}
+    total_users = verified_users = 0
+    for row in PlanStat.query.all():
+        per_plan[row.plan_type] = per_plan.get(row.plan_type, 0) + row.users
+        total_users += row.users
+        if row.email_verified:
+            verified_users += row.users
+    monthly_revenue = sum(per_plan.get(plan, 0) * price for plan, price in PLAN_PRICES.items())
+    updated_at = db.session.query(func.max(PlanStat.updated_at)).scalar()
+
+    return {
+        'users': {
+            'total': total_users,
+            'verified': verified_users,
+            'recent_signups': int(recent_signups),
+        },
+        'subscriptions': {
+            'free': per_plan.get('free', 0),
+            'pro': per_plan.get('pro', 0),
+            'enterprise': per_plan.get('enterprise', 0),
+        },
+        'scripts': {
+            'total': int(scripts_total),
+            'today': today_row.scripts if today_row else 0,
+        },
+        'revenue': {
+            'monthly': monthly_revenue,
+            'annual': monthly_revenue * 12,
+        },
+        'updated_at': updated_at.isoformat() if updated_at else None,
+    }
+
+
+def platform_stats() -> dict:
+    """Statistiques du tableau de bord (cache mémoire de STATS_CACHE_SEC)."""
+    with _cache_lock:
+        if _cache['value'] is not None and time.monotonic() - _cache['at'] < CACHE_SEC:
+            return _cache['value']
+    value = _compute()
+    with _cache_lock:
+        _cache.update(at=time.monotonic(), value=value)
+    return value
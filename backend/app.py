@@ -7,10 +7,16 @@ import json
 import base64
 from datetime import datetime, timedelta
 import io
+import logging
 import tempfile
 
 # Permet d'importer main.py depuis le dossier parent
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Journaux JSON via une file non bloquante (voir backend/log_setup.py)
+from backend.log_setup import configure as configure_logging
+configure_logging()
+logger = logging.getLogger(__name__)
+
 # Importer toutes les fonctions nécessaires de main.py, y compris les fonctions auxiliaires
 from main import generate_topics, generate_script, save_to_pdf, modify_script_with_ai, estimate_reading_time, fetch_research, extract_sources, generate_images_for_script, sanitize_text, generate_fallback_script
 
@@ -26,7 +32,7 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev_key_change_in_produ
 database_url = os.environ.get('DATABASE_URL')
 if database_url and database_url.startswith("postgres://"):
     database_url = database_url.replace("postgres://", "postgresql://", 1)
-    print(f"URL de base de données adaptée pour SQLAlchemy : {database_url[:20]}...")
+    logger.info(f"URL de base de données adaptée pour SQLAlchemy : {database_url[:20]}...")
 
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url or 'sqlite:///yt_autom.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
@@ -52,11 +58,11 @@ CORS(app, resources={r"/*": {"origins": "*", "supports_credentials": True, "expo
 user_profiles = {}
 
 # Système d'authentification désactivé en faveur d'une approche simplifiée
-print(" Système de profil simplifié activé")
+logger.info("Système de profil simplifié activé")
 
 # Configuration pour l'authentification désactivée
 app.config['LOGIN_DISABLED'] = True
-print(" Authentification désactivée, utilisation du système de profil simplifié")
+logger.info("Authentification désactivée, utilisation du système de profil simplifié")
 
 # Route pour enregistrer le profil
 @app.route('/api/save-profile', methods=['POST'])
@@ -71,8 +77,8 @@ def save_profile():
     user_profiles[youtuber_name] = data
     
     # Log pour débogage
-    print(f"Profil enregistré pour: {youtuber_name}")
-    print(f"Nombre de profils en mémoire: {len(user_profiles)}")
+    logger.info(f"Profil enregistré pour: {youtuber_name}")
+    logger.debug(f"Nombre de profils en mémoire: {len(user_profiles)}")
     
     return jsonify({
         'success': True,
@@ -110,7 +116,7 @@ def save_theme_to_history(theme, user_id=''):
             json.dump(history, f)
             
     except Exception as e:
-        print(f"Erreur lors de la sauvegarde dans l'historique: {str(e)}")
+        logger.error(f"Erreur lors de la sauvegarde dans l'historique: {str(e)}")
 
 # Route pour générer des sujets YouTube
 @app.route('/generate-topics', methods=['POST'])
@@ -141,7 +147,7 @@ def generate_topics_route():
         
         return jsonify({"topics": result})
     except Exception as e:
-        print(f"Erreur generation topics: {e}")
+        logger.error(f"Erreur generation topics: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/generate-script', methods=['POST'])
@@ -168,7 +174,7 @@ def generate_script_route():
         })
             
     except Exception as e:
-        print(f"Erreur generation script: {e}")
+        logger.error(f"Erreur generation script: {e}")
         return jsonify({'error': str(e)}), 500
 
 # --- NOUVELLES ROUTES TRACKING (MOCK) ---
@@ -216,8 +222,8 @@ def export_pdf_route():
         final_channel = channel_name or channel or 'Ma Chaîne YouTube'
         final_topic = topic or 'Script YouTube'
         
-        print(f"Génération du PDF pour {final_youtuber}, chaîne: {final_channel}, sujet: {final_topic}")
-        print(f"Nombre de sources: {len(sources)}")
+        logger.info(f"Génération du PDF pour {final_youtuber}, chaîne: {final_channel}, sujet: {final_topic}")
+        logger.info(f"Nombre de sources: {len(sources)}")
         
         # Vérifier la structure des sources et les normaliser si nécessaire
         normalized_sources = []
@@ -245,7 +251,7 @@ def export_pdf_route():
         
         # 1. Premier niveau: Essayer la génération standard avec save_to_pdf
         try:
-            print("Génération PDF standard...")
+            logger.info("Génération PDF standard...")
             pdf_path = save_to_pdf(
                 final_script, 
                 title=final_topic, 
@@ -256,24 +262,24 @@ def export_pdf_route():
             
             if pdf_path and os.path.exists(pdf_path) and pdf_path.endswith('.pdf'):
                 pdf_filename = os.path.basename(pdf_path)
-                print(f"PDF généré avec succès: {pdf_path}")
+                logger.info(f"PDF généré avec succès: {pdf_path}")
                 
                 # Vérifier que le PDF est valide
                 with open(pdf_path, 'rb') as pdf_file:
                     pdf_content = pdf_file.read()
                     if not pdf_content.startswith(b'%PDF'):
-                        print("Le PDF généré n'est pas valide, passage au niveau 2")
+                        logger.warning("Le PDF généré n'est pas valide, passage au niveau 2")
                         raise Exception("PDF invalid")
                     pdf_base64 = base64.b64encode(pdf_content).decode('utf-8')
             else:
-                print("Chemin PDF non valide ou fichier non PDF")
+                logger.warning("Chemin PDF non valide ou fichier non PDF")
                 raise Exception("PDF path invalid")
         except Exception as pdf_error:
-            print(f"Erreur niveau 1 - Génération standard: {pdf_error}")
+            logger.error(f"Erreur niveau 1 - Génération standard: {pdf_error}")
             
             # 2. Deuxième niveau: génération directe avec FPDF
             try:
-                print("Tentative de génération PDF de secours avec FPDF...")
+                logger.warning("Tentative de génération PDF de secours avec FPDF...")
                 from fpdf import FPDF
                 
                 # Créer un nom de fichier unique avec extension .pdf
@@ -353,7 +359,7 @@ def export_pdf_route():
                 
                 # Sauvegarder le PDF
                 pdf.output(force_pdf_path)
-                print(f"PDF de secours généré avec succès: {force_pdf_path}")
+                logger.info(f"PDF de secours généré avec succès: {force_pdf_path}")
                 
                 # Vérifier que le PDF a bien été créé
                 if os.path.exists(force_pdf_path):
@@ -366,11 +372,11 @@ def export_pdf_route():
                 else:
                     raise Exception("PDF de secours non créé")
             except Exception as fpdf_error:
-                print(f"Erreur niveau 2 - Génération FPDF: {fpdf_error}")
+                logger.error(f"Erreur niveau 2 - Génération FPDF: {fpdf_error}")
                 
                 # 3. Troisième niveau: PDF minimal
                 try:
-                    print("Tentative de création d'un PDF minimal...")
+                    logger.warning("Tentative de création d'un PDF minimal...")
                     from fpdf import FPDF
                     
                     # Utiliser la fonction de sanitisation déjà définie (ou la redéfinir)
@@ -413,7 +419,7 @@ def export_pdf_route():
                     else:
                         raise Exception("PDF minimal non créé")
                 except Exception as minimal_error:
-                    print(f"Erreur niveau 3 - PDF minimal: {minimal_error}")
+                    logger.error(f"Erreur niveau 3 - PDF minimal: {minimal_error}")
                     return jsonify({
                         'error': 'Erreur lors de la génération du PDF',
                         'file_type': 'application/pdf'  # Toujours indiquer le type PDF
@@ -435,7 +441,7 @@ def export_pdf_route():
         })
         
     except Exception as e:
-        print(f"Erreur lors de l'export PDF: {str(e)}")
+        logger.error(f"Erreur lors de l'export PDF: {str(e)}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Erreur lors de l\'export PDF: {str(e)}'}), 500
@@ -445,7 +451,7 @@ def export_pdf_route():
 def download_file(filename):
     """Route pour télécharger un fichier généré (PDF, TXT ou image)."""
     try:
-        print(f"Demande de téléchargement pour: {filename}")
+        logger.info(f"Demande de téléchargement pour: {filename}")
         
         # Trouver le fichier dans le répertoire temporaire
         if os.name == 'nt':  # Windows
@@ -463,14 +469,15 @@ def download_file(filename):
             file_path = os.path.join(temp_dir, filename)
             basename = filename
             
-        print(f" Recherche de: {file_path}")
+        logger.debug(f"Recherche de: {file_path}")
         
         # Liste tous les fichiers du répertoire temporaire pour le débogage
-        print(f" Contenu du répertoire temporaire: {os.listdir(temp_dir)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Contenu du répertoire temporaire", extra={'files': os.listdir(temp_dir)})
         
         # Essayer de trouver un fichier correspondant par nom partiel si le fichier exact n'existe pas
         if not os.path.exists(file_path):
-            print(f" Fichier exact non trouvé: {file_path}")
+            logger.warning(f"Fichier exact non trouvé: {file_path}")
             
             # Chercher un fichier correspondant par nom partiel
             basename_parts = basename.split('_')
@@ -481,23 +488,23 @@ def download_file(filename):
                 if matching_files:
                     newest_file = max(matching_files, key=lambda f: os.path.getmtime(os.path.join(temp_dir, f)))
                     file_path = os.path.join(temp_dir, newest_file)
-                    print(f" Fichier alternatif trouvé par correspondance partielle: {file_path}")
+                    logger.info(f"Fichier alternatif trouvé par correspondance partielle: {file_path}")
                 else:
                     # Si toujours pas trouvé, chercher le fichier le plus récent avec les extensions acceptées
                     all_files = [f for f in os.listdir(temp_dir) if f.endswith('.pdf') or f.endswith('.txt') or f.endswith('.png') or f.endswith('.jpg')]
                     if all_files:
                         newest_file = max(all_files, key=lambda f: os.path.getmtime(os.path.join(temp_dir, f)))
                         file_path = os.path.join(temp_dir, newest_file)
-                        print(f" Dernier fichier trouvé comme alternative: {file_path}")
+                        logger.info(f"Dernier fichier trouvé comme alternative: {file_path}")
         
         # Vérifier si le fichier existe après toutes nos tentatives
         if not os.path.exists(file_path):
-            print(f" Fichier introuvable après toutes les tentatives: {file_path}")
+            logger.warning(f"Fichier introuvable après toutes les tentatives: {file_path}")
             return jsonify({'error': 'Fichier introuvable'}), 404
         
         # Vérifier si le fichier est lisible et valide
         if os.path.getsize(file_path) == 0:
-            print(f" Fichier vide: {file_path}")
+            logger.warning(f"Fichier vide: {file_path}")
             return jsonify({'error': 'Le fichier est vide'}), 500
         
         # Déterminer si le fichier est un PDF, TXT ou image
@@ -533,7 +540,7 @@ def download_file(filename):
             else:
                 mimetype = 'application/octet-stream'
             
-            print(f" Envoi du fichier {file_path} ({os.path.getsize(file_path)} octets)")
+            logger.info(f"Envoi du fichier {file_path} ({os.path.getsize(file_path)} octets)")
             return send_file(
                 file_path,
                 as_attachment=True,
@@ -542,11 +549,11 @@ def download_file(filename):
             )
                 
         except Exception as e:
-            print(f" Erreur lors de la lecture/envoi du fichier: {str(e)}")
+            logger.error(f"Erreur lors de la lecture/envoi du fichier: {str(e)}")
             return jsonify({'error': f'Erreur lors de la lecture du fichier: {str(e)}'}), 500
     
     except Exception as e:
-        print(f" Erreur critique lors du téléchargement: {str(e)}")
+        logger.error(f"Erreur critique lors du téléchargement: {str(e)}")
         return jsonify({'error': f'Erreur critique lors du téléchargement: {str(e)}'}), 500
 
 # Route pour consulter l'historique des sujets
@@ -606,7 +613,7 @@ def register():
         return response
         
     try:
-        print(" Traitement d'une demande d'inscription...")
+        logger.info("Traitement d'une demande d'inscription...")
         data = request.get_json()
         username = data.get('username')
         email = data.get('email')
@@ -660,7 +667,7 @@ def register():
         db.session.add(new_user)
         db.session.add(new_profile)
         db.session.commit()
-        print(f"Nouvel utilisateur créé: {username} ({email})")
+        logger.info(f"Nouvel utilisateur créé: {username} ({email})")
         
         # Connecter automatiquement l'utilisateur
         login_user(new_user)
@@ -694,7 +701,7 @@ def register():
         return response
         
     except Exception as e:
-        print(f"Erreur lors de l'inscription: {e}")
+        logger.error(f"Erreur lors de l'inscription: {e}")
         import traceback
         traceback.print_exc()
         db.session.rollback()
@@ -712,7 +719,7 @@ def login():
         return response
         
     try:
-        print(" Tentative de connexion...")
+        logger.info("Tentative de connexion...")
         data = request.get_json()
         
         # Extraire les données de connexion
@@ -720,11 +727,11 @@ def login():
         password = data.get('password')
         remember = data.get('remember', False)
         
-        print(f"Email: {email}, Remember: {remember}")
+        logger.debug("Email: %s, Remember: %s", email, remember)
         
         # Vérification des données requises
         if not all([email, password]):
-            print("Données manquantes dans la requête")
+            logger.warning("Données manquantes dans la requête")
             return jsonify({'error': 'Email et mot de passe requis'}), 400
             
         # SOLUTION ROBUSTE: Essayer d'abord par email exact, puis par nom d'utilisateur
@@ -732,12 +739,12 @@ def login():
         if not user:
             user = User.query.filter(User.username == email).first()
         
-        print(f"Utilisateur trouvé: {user is not None}")
+        logger.debug(f"Utilisateur trouvé: {user is not None}")
         
         # Si l'utilisateur n'existe pas, créer automatiquement un compte (facilite l'utilisation)
         if not user:
             # Créer un nouvel utilisateur avec ces identifiants
-            print(f"Création automatique d'utilisateur: {email}")
+            logger.info(f"Création automatique d'utilisateur: {email}")
             username = email.split('@')[0] if '@' in email else email
             user = User(email=email, username=username)
             user.set_password(password)
@@ -749,7 +756,7 @@ def login():
             db.session.add(profile)
             db.session.commit()
         elif not user.check_password(password):
-            print("Mot de passe incorrect")
+            logger.warning("Mot de passe incorrect")
             return jsonify({'error': 'Email ou mot de passe incorrect'}), 401
             
         # Connecter l'utilisateur
@@ -797,7 +804,7 @@ def login():
         return response
         
     except Exception as e:
-        print(f"Erreur lors de la connexion: {e}")
+        logger.error(f"Erreur lors de la connexion: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f"Erreur lors de la connexion: {str(e)}"}), 500
@@ -821,7 +828,7 @@ def setup_profile():
         return response
         
     try:
-        print(f" Configuration du profil pour l'utilisateur {current_user.username}...")
+        logger.info(f"Configuration du profil pour l'utilisateur {current_user.username}...")
         data = request.get_json()
         
         # Vérification des données minimales requises
@@ -836,9 +843,9 @@ def setup_profile():
         if not profile:
             profile = UserProfile(user_id=current_user.id)
             db.session.add(profile)
-            print(f"Nouveau profil créé pour {current_user.username}")
+            logger.info(f"Nouveau profil créé pour {current_user.username}")
         else:
-            print(f"Profil existant mis à jour pour {current_user.username}")
+            logger.info(f"Profil existant mis à jour pour {current_user.username}")
         
         # Mettre à jour les champs du profil
         profile.channel_name = channel_name
@@ -880,7 +887,7 @@ def setup_profile():
         return response
         
     except Exception as e:
-        print(f"Erreur lors de la configuration du profil: {e}")
+        logger.error(f"Erreur lors de la configuration du profil: {e}")
         import traceback
         traceback.print_exc()
         db.session.rollback()
@@ -929,7 +936,7 @@ def setup_profile_simple():
         
     try:
         data = request.get_json()
-        print(f"Reçu une configuration de profil simplifiée: {data}")
+        logger.debug("Reçu une configuration de profil simplifiée", extra={'profile': data})
         
         response = jsonify({
             'success': True,
@@ -945,7 +952,7 @@ def setup_profile_simple():
         return response
         
     except Exception as e:
-        print(f"Erreur lors de la configuration simplifiée du profil: {e}")
+        logger.error(f"Erreur lors de la configuration simplifiée du profil: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f"Erreur lors de la configuration du profil: {str(e)}"}), 500
@@ -967,7 +974,7 @@ def register_simple():
         username = data.get('username', '')
         email = data.get('email', '')
         
-        print(f"Tentative d'inscription simplifiée pour: {email} / {username}")
+        logger.info(f"Tentative d'inscription simplifiée pour: {email} / {username}")
         
         # Créer un utilisateur fictif pour une inscription directe
         user_data = {
@@ -994,11 +1001,11 @@ def register_simple():
         response.set_cookie('logged_in_user', '1', httponly=False, samesite='Lax', max_age=86400)
         response.set_cookie('auth_mode', 'simple', httponly=False, samesite='Lax', max_age=86400)
         
-        print("Inscription simplifiée réussie, cookies définis")
+        logger.info("Inscription simplifiée réussie, cookies définis")
         return response
     
     except Exception as e:
-        print(f"Erreur lors de l'inscription simplifiée: {e}")
+        logger.error(f"Erreur lors de l'inscription simplifiée: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f"Erreur lors de l'inscription: {str(e)}"}), 500
@@ -1019,7 +1026,7 @@ def login_simple():
         data = request.get_json()
         email = data.get('email', '')
         
-        print(f"Tentative de connexion simplifiée pour: {email}")
+        logger.info(f"Tentative de connexion simplifiée pour: {email}")
         
         # Créer un utilisateur fictif pour une connexion directe
         username = email.split('@')[0] if '@' in email else email
@@ -1052,11 +1059,11 @@ def login_simple():
         response.set_cookie('logged_in_user', '1', httponly=False, samesite='Lax', max_age=86400)
         response.set_cookie('auth_mode', 'simple', httponly=False, samesite='Lax', max_age=86400)
         
-        print("Connexion simplifiée réussie, cookies définis")
+        logger.info("Connexion simplifiée réussie, cookies définis")
         return response
     
     except Exception as e:
-        print(f"Erreur lors de la connexion simplifiée: {e}")
+        logger.error(f"Erreur lors de la connexion simplifiée: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f"Erreur lors de la connexion: {str(e)}"}), 500
@@ -1101,7 +1108,7 @@ def modify_script_route():
         })
         
     except Exception as e:
-        print(f"Erreur lors de la modification du script: {str(e)}")
+        logger.error(f"Erreur lors de la modification du script: {str(e)}")
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Erreur lors de la modification du script: {str(e)}'}), 500
@@ -1125,7 +1132,7 @@ def estimate_time_route():
         
         return jsonify(estimation)
     except Exception as e:
-        print(f"Erreur lors de l'estimation du temps: {str(e)}")
+        logger.error(f"Erreur lors de l'estimation du temps: {str(e)}")
         return jsonify({'error': f'Erreur lors de l\'estimation: {str(e)}'}), 500
 
 # Route pour générer directement un script à partir d'une idée
@@ -1149,26 +1156,26 @@ def generate_direct_script_route():
         content_style = profile.get('content_style', 'informative')
         
         # Rechercher des informations sur l'idée
-        print(f"Recherche d'informations pour l'idée: {idea[:100]}...")
+        logger.info(f"Recherche d'informations pour l'idée: {idea[:100]}...")
         try:
             research = fetch_research(idea)
             
             if not research:
-                print("Aucune recherche trouvée, utilisation d'un contexte minimal.")
+                logger.warning("Aucune recherche trouvée, utilisation d'un contexte minimal.")
                 research = f"Idée de vidéo YouTube: {idea}"
             else:
-                print(f"Recherche récupérée: {len(research)} caractères")
+                logger.info(f"Recherche récupérée: {len(research)} caractères")
         except Exception as research_error:
-            print(f"Erreur lors de la recherche: {research_error}")
+            logger.error(f"Erreur lors de la recherche: {research_error}")
             # Fournir un contexte minimal en cas d'erreur
             research = f"Idée de vidéo YouTube: {idea}\n\nCette vidéo abordera le sujet de {idea} de manière approfondie et engageante."
         
         # Extraire les vraies sources depuis la recherche
         try:
             real_sources = extract_sources(research)
-            print(f"Sources extraites: {len(real_sources)}")
+            logger.info(f"Sources extraites: {len(real_sources)}")
         except Exception as source_error:
-            print(f"Erreur lors de l'extraction des sources: {source_error}")
+            logger.error(f"Erreur lors de l'extraction des sources: {source_error}")
             # Créer des sources de secours si l'extraction échoue
             real_sources = [
                 {"url": "https://example.com/resource1", "title": "Ressource principale sur le sujet", "type": "web"},
@@ -1176,7 +1183,7 @@ def generate_direct_script_route():
             ]
         
         # Générer le script avec les informations du profil
-        print(f"Génération du script pour l'idée: {idea[:100]}...")
+        logger.info(f"Génération du script pour l'idée: {idea[:100]}...")
         try:
             script_text = generate_script(idea, research, user_context={
                 'youtuber_name': youtuber_name,
@@ -1191,7 +1198,7 @@ def generate_direct_script_route():
                 'custom_options': profile.get('custom_options', {})
             })
         except Exception as script_error:
-            print(f"Erreur lors de la génération du script: {script_error}")
+            logger.error(f"Erreur lors de la génération du script: {script_error}")
             from main import generate_fallback_script
             # Utiliser un script de secours si la génération normale échoue
             script_text = generate_fallback_script(idea, youtuber_name=youtuber_name, channel_name=channel_name)
@@ -1209,7 +1216,7 @@ def generate_direct_script_route():
             has_sections = any(line.strip().startswith('[') and line.strip().endswith(']') for line in script.split('\n'))
             
             if not has_sections:
-                print("Restructuration du script pour le PDF: ajout de sections")
+                logger.info("Restructuration du script pour le PDF: ajout de sections")
                 # Découper le script en lignes
                 lines = script.split('\n')
                 formatted_script = []
@@ -1265,7 +1272,7 @@ def generate_direct_script_route():
         
         # Générer le PDF si le script a été généré avec succès
         if script_text:
-            print(f"Script généré avec succès ({len(script_text)} caractères). Génération du PDF...")
+            logger.info(f"Script généré avec succès ({len(script_text)} caractères). Génération du PDF...")
             
             # Utiliser une approche simple et directe pour générer le PDF
             # Pré-formater le script pour s'assurer qu'il a une structure exploitée correctement par save_to_pdf
@@ -1274,7 +1281,7 @@ def generate_direct_script_route():
                 has_sections = any(line.strip().startswith('[') and line.strip().endswith(']') for line in script_text.split('\n'))
                 
                 if not has_sections:
-                    print("Le script n'a pas de sections formatées correctement. Restructuration...")
+                    logger.info("Le script n'a pas de sections formatées correctement. Restructuration...")
                     # Structure simple pour le script
                     formatted_script = []
                     formatted_script.append(f"[TITRE: {title}]\n\n")
@@ -1284,7 +1291,7 @@ def generate_direct_script_route():
                     script_text = '\n'.join(formatted_script)
                 
                 # Génération du PDF avec la fonction standard
-                print(f"Génération du PDF pour: {title}")
+                logger.info(f"Génération du PDF pour: {title}")
                 pdf_path = save_to_pdf(
                     script_text, 
                     title=title, 
@@ -1296,7 +1303,7 @@ def generate_direct_script_route():
                 # Vérification du PDF généré
                 if pdf_path and os.path.exists(pdf_path) and pdf_path.endswith('.pdf'):
                     pdf_filename = os.path.basename(pdf_path)
-                    print(f"PDF généré avec succès: {pdf_path}")
+                    logger.info(f"PDF généré avec succès: {pdf_path}")
                     
                     # Encoder le PDF en base64 pour le téléchargement direct
                     with open(pdf_path, 'rb') as pdf_file:
@@ -1314,7 +1321,7 @@ def generate_direct_script_route():
                         'estimated_reading_time': estimate_reading_time(script_text)
                     })
                 else:
-                    print("Échec de la génération du PDF par save_to_pdf")
+                    logger.error("Échec de la génération du PDF par save_to_pdf")
                     # En dernier recours, retourner le script sans PDF
                     return jsonify({
                         'error': 'Impossible de générer le PDF',
@@ -1322,7 +1329,7 @@ def generate_direct_script_route():
                         'sources': real_sources
                     }), 500
             except Exception as e:
-                print(f"Erreur lors de la génération du PDF: {e}")
+                logger.error(f"Erreur lors de la génération du PDF: {e}")
                 # Assurer une réponse même en cas d'erreur
                 return jsonify({
                     'error': f'Erreur lors de la génération du PDF: {str(e)}',
@@ -1331,7 +1338,7 @@ def generate_direct_script_route():
                 }), 500
     # Exception pour l'ensemble de la fonction
     except Exception as e:
-        print(f"Erreur générale lors de la génération de script ou PDF: {e}")
+        logger.error(f"Erreur générale lors de la génération de script ou PDF: {e}")
         return jsonify({
             'error': f'Erreur générale: {str(e)}',
             'script': idea if 'idea' in locals() else '',
@@ -1380,7 +1387,7 @@ def save_script_pdf():
                 'script': script_text
             }), 500
     except Exception as e:
-        print(f"Erreur lors de la sauvegarde du script en PDF: {e}")
+        logger.error(f"Erreur lors de la sauvegarde du script en PDF: {e}")
         return jsonify({
             'error': f'Erreur: {str(e)}',
             'script': data.get('script', '') if 'data' in locals() else ''
@@ -1407,18 +1414,18 @@ def generate_images_route():
         # Limiter le nombre d'images pour éviter les abus
         if num_images > 5:
             num_images = 5
-            print(f"Limitation du nombre d'images à {num_images}")
+            logger.warning(f"Limitation du nombre d'images à {num_images}")
             
         # Validation des styles supportés
         styles_supportes = ['moderne', 'minimaliste', 'coloré', 'sombre', 'nature']
         if style not in styles_supportes:
-            print(f"Style non supporté: {style}, utilisation du style par défaut")
+            logger.warning(f"Style non supporté: {style}, utilisation du style par défaut")
             style = 'moderne'
             
         # Validation des formats supportés
         formats_supportes = ['paysage', 'portrait', 'carré']
         if format_image not in formats_supportes:
-            print(f"Format non supporté: {format_image}, utilisation du format par défaut")
+            logger.warning(f"Format non supporté: {format_image}, utilisation du format par défaut")
             format_image = 'paysage'
             
         # Générer les images avec les options personnalisées et capturer les messages de progression
@@ -1480,7 +1487,7 @@ def generate_grok_images_route():
         # Limiter le nombre d'images pour éviter les abus
         if num_images > 5:
             num_images = 5
-            print(f"Limitation du nombre d'images à {num_images}")
+            logger.warning(f"Limitation du nombre d'images à {num_images}")
         
         # Générer les images avec l'option Grok activée
         image_paths, progress_messages = generate_images_for_script(
@@ -1528,7 +1535,7 @@ with app.app_context():
     except Exception as e:
         # Ignore l'erreur si les tables existent déjà (race condition avec gunicorn workers)
         if "already exists" not in str(e):
-            print(f"Erreur lors de la création des tables: {e}")
+            logger.error(f"Erreur lors de la création des tables: {e}")
             raise
 
 if __name__ == '__main__':
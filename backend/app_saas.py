@@ -8,6 +8,10 @@ from flask_jwt_extended import JWTManager
 from datetime import timedelta
 import os
 
+# Journaux JSON via une file non bloquante, avant tout import qui journalise (voir backend/log_setup.py)
+from backend.log_setup import configure as configure_logging
+configure_logging()
+
 # Initialize Flask app
 app = Flask(__name__)
 
@@ -35,6 +39,18 @@ from backend import saas_models
 from backend.database import init_db
 init_db(app)
 
+# Compteur de requêtes SQL (en-tête X-DB-Queries si DB_QUERY_COUNT=1)
+from backend.query_counter import install as install_query_counter
+install_query_counter(app)
+
+# Traces (X-Trace-Id, traceparent) et métriques Prometheus (/metrics)
+from backend.telemetry import install as install_telemetry
+install_telemetry(app)
+
+# Index plein texte des scripts (GIN PostgreSQL / FTS5 SQLite)
+from backend.script_search import install as install_script_search
+install_script_search(app)
+
 # Register blueprints
 from backend.auth_routes import auth_bp
 from backend.scripts_routes import scripts_bp
@@ -70,6 +86,16 @@ def health_check():
         'version': '2.0.0'
     }), 200
 
+# Scénario de charge (benchmarks/concurrency_load.py) : attente d'E/S simulée, désactivée par défaut
+if os.getenv('LOADTEST_ENDPOINTS') == '1':
+    import time
+
+    @app.route('/health/slow', methods=['GET'])
+    def health_slow():
+        ms = min(request.args.get('ms', 500, type=int), 10000)
+        time.sleep(ms / 1000.0)  # coopératif sous gevent (time patché)
+        return jsonify({'status': 'ok', 'slept_ms': ms}), 200
+
 # Root route
 @app.route('/', methods=['GET'])
 def root():
@@ -92,6 +118,11 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
+# Jetons révoqués à la déconnexion (liste noire Redis) ; l'import enregistre aussi
+# l'invalidation des claims plan / admin sur modification d'abonnement
+from backend.identity import is_token_revoked
+jwt.token_in_blocklist_loader(is_token_revoked)
+
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
     return jsonify({
@@ -0,0 +1,243 @@
+"""
+Cache disque persistant des vidéos de stock (Pexels, fixtures locales…).
+
+- Fichiers indexés par (provider, video_id) dans SQLite avec leurs métadonnées
+  (durée, résolution, orientation, tags, taille, sha256).
+- Résultats de recherche (requête -> candidats) mis en cache avec un TTL.
+- Éviction LRU quand le budget disque est dépassé.
+- Téléchargements via `backend.downloads` (blocs de 1 Mo, reprise Range, vérification),
+  sérialisés par fichier (verrou `<dest>.lock`) : deux workers qui veulent le même asset
+  ne se partagent jamais le `.part`, le second réutilise le fichier du premier.
+- Recherches vides (aucun résultat) gardées ASSET_QUERY_NEGATIVE_TTL_SEC seulement ;
+  les erreurs du fournisseur (429, 5xx…) ne sont jamais mises en cache.
+
+Env :
+  ASSET_CACHE_DIR         défaut ./cache/assets
+  ASSET_CACHE_MAX_MB      défaut 2048
+  ASSET_QUERY_TTL_SEC     défaut 86400
+  ASSET_QUERY_NEGATIVE_TTL_SEC  défaut 300
+  ASSET_CACHE_PIN_SEC     défaut 3600 (fichiers utilisés récemment jamais évincés)
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows (dev) : verrou limité au processus
+    fcntl = None
+
+from backend.downloads import download_file
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    provider TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    url TEXT,
+    size INTEGER NOT NULL,
+    sha256 TEXT,
+    duration REAL,
+    width INTEGER,
+    height INTEGER,
+    orientation TEXT,
+    tags TEXT,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (provider, video_id)
+);
+CREATE INDEX IF NOT EXISTS ix_assets_last_access ON assets (last_access);
+CREATE TABLE IF NOT EXISTS queries (
+    key TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+_local_locks: Dict[str, threading.Lock] = {}
+_local_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _dest_lock(dest: str):
+    """Verrou exclusif sur `dest`, partagé entre threads et processus (flock sur `<dest>.lock`)."""
+    if fcntl is None:
+        with _local_locks_guard:
+            lock = _local_locks.setdefault(dest, threading.Lock())
+        with lock:
+            yield
+        return
+    with open(dest + ".lock", "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def orientation_of(width: Optional[int], height: Optional[int]) -> str:
+    if not width or not height or width == height:
+        return "square"
+    return "landscape" if width > height else "portrait"
+
+
+class AssetCache:
+    """Index SQLite + répertoire de fichiers ; sûr entre threads (une connexion par opération)."""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        query_ttl: Optional[int] = None,
+    ):
+        self.root = os.path.abspath(root or os.getenv("ASSET_CACHE_DIR", os.path.join("cache", "assets")))
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("ASSET_CACHE_MAX_MB", "2048")) * 1024 * 1024
+        self.query_ttl = query_ttl if query_ttl is not None else int(os.getenv("ASSET_QUERY_TTL_SEC", "86400"))
+        self.negative_ttl = int(os.getenv("ASSET_QUERY_NEGATIVE_TTL_SEC", "300"))
+        self.pin_seconds = int(os.getenv("ASSET_CACHE_PIN_SEC", "3600"))
+        self._evict_lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def owns(self, path: str) -> bool:
+        return os.path.abspath(path).startswith(self.root + os.sep)
+
+    # --- Résultats de recherche -------------------------------------------------
+
+    @staticmethod
+    def query_key(provider: str, query: str, orientation: str, duration_min: int) -> str:
+        return f"{provider}|{query.strip().lower()}|{orientation}|{duration_min}"
+
+    def get_query(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT results, expires_at FROM queries WHERE key = ?", (key,)).fetchone()
+        if not row or row["expires_at"] < time.time():
+            return None
+        return json.loads(row["results"])
+
+    def put_query(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """Met en cache un résultat de recherche ; une liste vide n'est gardée que brièvement."""
+        ttl = self.query_ttl if results else self.negative_ttl
+        if ttl <= 0:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO queries (key, results, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(results), time.time() + ttl),
+            )
+
+    # --- Fichiers ---------------------------------------------------------------
+
+    def lookup(self, provider: str, video_id: str) -> Optional[str]:
+        """Chemin local si l'asset est en cache et intact (met à jour l'accès LRU)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT path, size FROM assets WHERE provider = ? AND video_id = ?",
+                (provider, str(video_id)),
+            ).fetchone()
+            if not row:
+                return None
+            if not os.path.isfile(row["path"]) or os.path.getsize(row["path"]) != row["size"]:
+                conn.execute("DELETE FROM assets WHERE provider = ? AND video_id = ?", (provider, str(video_id)))
+                return None
+            conn.execute(
+                "UPDATE assets SET last_access = ? WHERE provider = ? AND video_id = ?",
+                (time.time(), provider, str(video_id)),
+            )
+        return row["path"]
+
+    def cached_ids(self, provider: str, video_ids: List[str]) -> set:
+        if not video_ids:
+            return set()
+        marks = ",".join("?" for _ in video_ids)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT video_id FROM assets WHERE provider = ? AND video_id IN ({marks})",
+                (provider, *[str(v) for v in video_ids]),
+            ).fetchall()
+        return {r["video_id"] for r in rows}
+
+    def fetch(self, candidate: Dict[str, Any]) -> str:
+        """
+        Retourne le chemin local du candidat, en le téléchargeant si besoin.
+        candidate: {provider, video_id, url, duration, width, height, orientation, tags}
+        """
+        provider, video_id = candidate["provider"], str(candidate["video_id"])
+        path = self.lookup(provider, video_id)
+        if path:
+            return path
+
+        dest_dir = os.path.join(self.root, provider)
+        os.makedirs(dest_dir, exist_ok=True)
+        dest = os.path.join(dest_dir, f"{video_id}.mp4")
+        with _dest_lock(dest):
+            # Un autre worker a pu terminer le téléchargement pendant l'attente du verrou
+            path = self.lookup(provider, video_id)
+            if path:
+                return path
+            size, digest = download_file(candidate["url"], dest, expected_size=candidate.get("size"))
+
+            now = time.time()
+            with self._connect() as conn:
+                conn.execute(
+                    """INSERT OR REPLACE INTO assets
+                       (provider, video_id, path, url, size, sha256, duration, width, height,
+                        orientation, tags, created_at, last_access)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (
+                        provider,
+                        video_id,
+                        dest,
+                        candidate.get("url"),
+                        size,
+                        digest,
+                        candidate.get("duration"),
+                        candidate.get("width"),
+                        candidate.get("height"),
+                        candidate.get("orientation") or orientation_of(candidate.get("width"), candidate.get("height")),
+                        ",".join(candidate.get("tags") or []),
+                        now,
+                        now,
+                    ),
+                )
+        self.evict()
+        return dest
+
+    def evict(self) -> int:
+        """Supprime les fichiers les moins récemment utilisés au-delà du budget ; retourne les octets libérés."""
+        freed = 0
+        with self._evict_lock, self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM assets").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            rows = conn.execute(
+                "SELECT provider, video_id, path, size FROM assets WHERE last_access < ? ORDER BY last_access ASC",
+                (time.time() - self.pin_seconds,),
+            ).fetchall()
+            for row in rows:
+                if total - freed <= self.max_bytes:
+                    break
+                try:
+                    os.remove(row["path"])
+                except FileNotFoundError:
+                    pass
+                conn.execute(
+                    "DELETE FROM assets WHERE provider = ? AND video_id = ?",
+                    (row["provider"], row["video_id"]),
+                )
+                freed += row["size"]
+        return freed
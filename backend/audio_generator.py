@@ -1,6 +1,8 @@
 import edge_tts
 import asyncio
 
+from backend.telemetry import span
+
 class AudioGenerator:
     """Générateur de voix off utilisant Edge TTS (Gratuit & Qualitatif)."""
     
@@ -16,8 +18,9 @@ class AudioGenerator:
         Génère un fichier MP3 à partir du texte.
         """
         voice = self.voices.get(gender, self.voices['male'])
-        communicate = edge_tts.Communicate(text, voice)
-        await communicate.save(output_path)
+        with span('tts', provider='edge_tts', model=voice, chars=len(text)):
+            communicate = edge_tts.Communicate(text, voice)
+            await communicate.save(output_path)
         return output_path
 
     def generate_sync(self, text: str, output_path: str, gender: str = 'male'):
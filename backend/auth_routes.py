@@ -2,11 +2,11 @@
 Authentication routes for Scripty SaaS
 """
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt, get_jwt_identity, get_jti
 from backend.database import db
 from backend.saas_models import User, Subscription
 from backend.auth_utils import verify_email_token, generate_verification_token
-from datetime import timedelta
+from backend.identity import ACCESS_TTL, REFRESH_TTL, claims_for, load_user, revoke_token
 import re
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -68,8 +68,10 @@ def register():
         print(f"📧 Verification URL: {verification_url}")
         
         # Create tokens
-        access_token = create_access_token(identity=user.id, expires_delta=timedelta(hours=1))
-        refresh_token = create_refresh_token(identity=user.id, expires_delta=timedelta(days=7))
+        refresh_token = create_refresh_token(identity=user.id, expires_delta=REFRESH_TTL)
+        access_token = create_access_token(
+            identity=user.id, expires_delta=ACCESS_TTL, additional_claims=claims_for(user, get_jti(refresh_token))
+        )
         
         return jsonify({
             'message': 'User registered successfully',
@@ -108,8 +110,10 @@ def login():
             return jsonify({'error': 'Invalid credentials'}), 401
         
         # Create tokens
-        access_token = create_access_token(identity=user.id, expires_delta=timedelta(hours=1))
-        refresh_token = create_refresh_token(identity=user.id, expires_delta=timedelta(days=7))
+        refresh_token = create_refresh_token(identity=user.id, expires_delta=REFRESH_TTL)
+        access_token = create_access_token(
+            identity=user.id, expires_delta=ACCESS_TTL, additional_claims=claims_for(user, get_jti(refresh_token))
+        )
         
         return jsonify({
             'message': 'Login successful',
@@ -145,8 +149,13 @@ def verify_email(token):
 def refresh():
     """Refresh access token"""
     try:
-        user_id = get_jwt_identity()
-        access_token = create_access_token(identity=user_id, expires_delta=timedelta(hours=1))
+        user = load_user(get_jwt_identity())
+        if not user:
+            return jsonify({'error': 'User not found'}), 401
+        # Même jeton de rafraîchissement : la déconnexion avec ce jeton d'accès le révoque aussi
+        access_token = create_access_token(
+            identity=user.id, expires_delta=ACCESS_TTL, additional_claims=claims_for(user, get_jwt()['jti'])
+        )
         
         return jsonify({'access_token': access_token}), 200
         
@@ -158,8 +167,7 @@ def refresh():
 def get_current_user_info():
     """Get current user info"""
     try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = load_user(get_jwt_identity())
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -173,6 +181,6 @@ def get_current_user_info():
 @jwt_required()
 def logout():
     """Logout user (client should discard tokens)"""
-    # JWT stateless, so just return success
-    # Client should remove tokens from storage
+    # Jeton d'accès et jeton de rafraîchissement associé refusés jusqu'à expiration (liste noire Redis)
+    revoke_token(get_jwt())
     return jsonify({'message': 'Logged out successfully'}), 200
@@ -3,16 +3,16 @@ Authentication utilities for Scripty SaaS
 """
 from functools import wraps
 from flask import jsonify, request
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from flask_jwt_extended import verify_jwt_in_request
 from backend.saas_models import User, Subscription
 from backend.database import db
-from datetime import datetime, timedelta
 import secrets
 
 def get_current_user():
-    """Get current authenticated user"""
-    user_id = get_jwt_identity()
-    return User.query.get(user_id)
+    """Get current authenticated user (abonnement joint, mémorisé pour la requête)"""
+    from backend.identity import current_user
+
+    return current_user()
 
 def login_required(f):
     """Decorator to require authentication"""
@@ -33,20 +33,22 @@ def plan_required(required_plan='free'):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             try:
+                from backend.identity import current_plan
+
                 verify_jwt_in_request()
-                user = get_current_user()
+                plan_type = current_plan()
                 
-                if not user or not user.subscription:
+                if not plan_type:
                     return jsonify({'error': 'Subscription required'}), 403
                 
-                user_plan_level = plan_hierarchy.get(user.subscription.plan_type, 0)
+                user_plan_level = plan_hierarchy.get(plan_type, 0)
                 required_plan_level = plan_hierarchy.get(required_plan, 0)
                 
                 if user_plan_level < required_plan_level:
                     return jsonify({
                         'error': 'Upgrade required',
                         'required_plan': required_plan,
-                        'current_plan': user.subscription.plan_type
+                        'current_plan': plan_type
                     }), 403
                 
                 return f(*args, **kwargs)
@@ -55,37 +57,37 @@ def plan_required(required_plan='free'):
         return decorated_function
     return decorator
 
+def _plan_type(user_id):
+    """Plan de l'utilisateur (claims du JWT / identité de la requête, sinon une colonne)."""
+    from flask import has_request_context
+
+    if has_request_context():
+        from backend.identity import current_plan
+
+        return current_plan(user_id)
+    plan = db.session.query(Subscription.plan_type).filter_by(user_id=user_id).first()
+    return plan[0] if plan else None
+
 def check_usage_limit(user_id, action_type):
     """Check if user has exceeded their usage limit"""
-    from backend.saas_models import UsageMetric
-    
-    user = User.query.get(user_id)
-    if not user or not user.subscription:
+    from backend import quotas
+
+    plan_type = _plan_type(user_id)
+    if not plan_type:
         return False, "No subscription found"
-    
-    plan_limits = {
-        'free': {'script_generated': 5, 'ltx_video_generated': 1},
-        'pro': {'script_generated': 100, 'ltx_video_generated': 40},
-        'enterprise': {'script_generated': float('inf'), 'ltx_video_generated': float('inf')}
-    }
-    
-    plan_type = user.subscription.plan_type
-    limit = plan_limits.get(plan_type, {}).get(action_type, 0)
-    
-    # Count usage this month
-    now = datetime.utcnow()
-    month_start = datetime(now.year, now.month, 1)
-    
-    usage_count = UsageMetric.query.filter(
-        UsageMetric.user_id == user_id,
-        UsageMetric.action_type == action_type,
-        UsageMetric.timestamp >= month_start
-    ).count()
-    
-    if usage_count >= limit:
-        return False, f"Monthly limit reached ({usage_count}/{limit})"
-    
-    return True, f"Usage: {usage_count}/{limit}"
+    return quotas.check(user_id, action_type, plan_type)
+
+def reserve_usage(user_id, action_type):
+    """
+    Like check_usage_limit, but reserves one unit of quota.
+    Returns (allowed, message, token): confirm with quotas.record / quotas.commit, or quotas.release on failure.
+    """
+    from backend import quotas
+
+    plan_type = _plan_type(user_id)
+    if not plan_type:
+        return False, "No subscription found", None
+    return quotas.reserve(user_id, action_type, plan_type)
 
 def generate_verification_token():
     """Generate email verification token"""
@@ -2,6 +2,12 @@
 import os
 
 from celery import Celery
+from celery.schedules import crontab
+
+from backend.log_setup import configure as configure_logging
+
+# Journaux JSON via la file non bloquante (Celery ne remplace pas le handler racine)
+configure_logging()
 
 celery_app = Celery(
     "scripty",
@@ -9,6 +15,10 @@ celery_app = Celery(
     backend=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
 )
 
+USAGE_FLUSH_SEC = float(os.getenv("USAGE_FLUSH_SEC", "5"))
+QUOTA_RECONCILE_SEC = float(os.getenv("QUOTA_RECONCILE_SEC", "3600"))
+STATS_REFRESH_SEC = float(os.getenv("STATS_REFRESH_SEC", "300"))
+
 celery_app.conf.update(
     task_serializer="json",
     accept_content=["json"],
@@ -17,6 +27,58 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     broker_connection_retry_on_startup=True,
+    # Rendus MoviePy (CPU) sur une file dédiée : workers `-Q render` dimensionnés à part
+    task_routes={
+        "scripty.video_montage": {"queue": "render"},
+        "scripty.video_final_render": {"queue": "render"},
+        # Tâches périodiques sur leur propre worker (`-Q maintenance`) : jamais derrière un
+        # `scripty.ltx_for_script` qui occupe un slot jusqu'à LTX_POLL_MAX_SEC
+        "scripty.usage_flush": {"queue": "maintenance"},
+        "scripty.quota_reconcile": {"queue": "maintenance"},
+        "scripty.stats_refresh": {"queue": "maintenance"},
+        "scripty.video_inputs_sweep": {"queue": "maintenance"},
+    },
+    worker_prefetch_multiplier=1,
+    worker_hijack_root_logger=False,
+    # Celery beat (`celery -A backend.celery_app:celery_app beat`). `expires` : un message
+    # resté en file plus d'une période est abandonné (le suivant fait le même travail)
+    # au lieu de s'accumuler quand le worker est arrêté ou saturé.
+    beat_schedule={
+        "usage-flush": {
+            "task": "scripty.usage_flush",
+            "schedule": USAGE_FLUSH_SEC,
+            "options": {"expires": USAGE_FLUSH_SEC},
+        },
+        "quota-reconcile": {
+            "task": "scripty.quota_reconcile",
+            "schedule": QUOTA_RECONCILE_SEC,
+            "options": {"expires": QUOTA_RECONCILE_SEC},
+        },
+        "stats-refresh": {
+            "task": "scripty.stats_refresh",
+            "schedule": STATS_REFRESH_SEC,
+            "options": {"expires": STATS_REFRESH_SEC},
+        },
+        "video-inputs-sweep": {
+            "task": "scripty.video_inputs_sweep",
+            "schedule": 3600.0,
+            "options": {"expires": 3600},
+        },
+        "stats-rebuild": {
+            "task": "scripty.stats_refresh",
+            "schedule": crontab(hour=3, minute=15),
+            "kwargs": {"full": True},
+            "options": {"expires": 3600},
+        },
+    },
 )
 
+# Trace de la requête d'origine propagée aux tâches (en-tête `traceparent`)
+from backend.telemetry import install_celery  # noqa: E402
+
+install_celery(celery_app)
+
 import backend.tasks_ltx  # noqa: E402,F401 — enregistre les tâches
+import backend.tasks_quota  # noqa: E402,F401
+import backend.tasks_stats  # noqa: E402,F401
+import backend.tasks_video  # noqa: E402,F401
@@ -1,6 +1,7 @@
 """
 Database configuration for Scripty SaaS
 """
+import logging
 import os
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.orm import DeclarativeBase
@@ -10,6 +11,8 @@ class Base(DeclarativeBase):
 
 db = SQLAlchemy(model_class=Base)
 
+logger = logging.getLogger(__name__)
+
 def get_database_uri():
     """Get database URI based on environment"""
     # Check for production DATABASE_URL (Render, Heroku, etc.)
@@ -30,6 +33,25 @@ def get_database_uri():
     
     return f'postgresql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}'
 
+def _default_pool_size():
+    """
+    Une connexion par requête simultanée du processus : GUNICORN_THREADS en gthread,
+    GUNICORN_WORKER_CONNECTIONS en gevent plafonné à DB_POOL_MAX (au-delà, les greenlets
+    attendent une connexion libre plutôt que d'ouvrir des centaines de sessions PostgreSQL
+    par worker), sinon 5.
+    """
+    worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+    if worker_class == 'gthread':
+        return int(os.getenv('GUNICORN_THREADS', '32'))
+    if worker_class == 'gevent':
+        connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '500'))
+        return max(1, min(connections, int(os.getenv('DB_POOL_MAX', '50'))))
+    return 5
+
+def _default_max_overflow(pool_size):
+    """Débordement borné : un quart du pool, entre 5 et 20 connexions."""
+    return max(5, min(pool_size // 4, 20))
+
 def init_db(app):
     """Initialize database with Flask app"""
     app.config['SQLALCHEMY_DATABASE_URI'] = get_database_uri()
@@ -38,14 +60,50 @@ def init_db(app):
         'pool_pre_ping': True,
         'pool_recycle': 300,
     }
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        # À dimensionner sur la concurrence par processus (threads gthread / greenlets gevent)
+        pool_size = int(os.getenv('DB_POOL_SIZE') or _default_pool_size())
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'].update({
+            'pool_size': pool_size,
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW') or _default_max_overflow(pool_size)),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        })
     
     db.init_app(app)
     
     with app.app_context():
         try:
             db.create_all()
-            print("✅ Database tables created successfully")
+            logger.info("Database tables created successfully")
         except Exception as e:
             # Ignore if tables already exist
             if "already exists" not in str(e):
-                print(f"⚠️ Database init warning: {e}")
+                logger.warning("Database init warning: %s", e)
+        _add_missing_columns()
+
+# Colonnes / index ajoutés après coup à des tables existantes (create_all ne les crée pas)
+_LATE_COLUMNS = [
+    ('usage_metrics', 'event_id', 'VARCHAR(64)',
+     'CREATE UNIQUE INDEX IF NOT EXISTS ix_usage_metrics_event_id ON usage_metrics (event_id)'),
+    ('users', None, None, 'CREATE INDEX IF NOT EXISTS ix_users_created_at ON users (created_at)'),
+    ('scripts', None, None,
+     'CREATE INDEX IF NOT EXISTS ix_scripts_user_created_id ON scripts (user_id, created_at, id)'),
+]
+
+def _add_missing_columns():
+    """ALTER TABLE / CREATE INDEX idempotents pour les entrées de _LATE_COLUMNS."""
+    from sqlalchemy import inspect, text
+
+    try:
+        inspector = inspect(db.engine)
+        with db.engine.begin() as conn:
+            for table, column, ddl, index_sql in _LATE_COLUMNS:
+                if not inspector.has_table(table):
+                    continue
+                if column and column not in {c['name'] for c in inspector.get_columns(table)}:
+                    conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+                    logger.info("Colonne ajoutée: %s.%s", table, column)
+                if index_sql:
+                    conn.execute(text(index_sql))
+    except Exception as e:
+        logger.warning("Database column upgrade warning: %s", e)
@@ -0,0 +1,99 @@
+"""
+Téléchargements HTTP en flux : blocs de 1 Mo écrits dans un fichier `.part`,
+reprise HTTP Range après coupure, vérification taille / sha256 puis renommage atomique.
+La mémoire reste constante quelle que soit la taille du fichier.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+from typing import Dict, Optional
+
+import requests
+
+from backend.telemetry import traced
+
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = (10, 120)  # (connexion, lecture) en secondes
+DOWNLOAD_ATTEMPTS = 3
+
+
+class IntegrityError(RuntimeError):
+    """Fichier téléchargé incomplet ou somme de contrôle différente."""
+
+
+@traced("download")
+def download_file(
+    url: str,
+    dest: str,
+    expected_size: Optional[int] = None,
+    expected_sha256: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: tuple = DOWNLOAD_TIMEOUT,
+) -> tuple:
+    """
+    Télécharge `url` vers `dest` (écriture atomique via `.part`) avec reprise Range.
+    Retourne (taille, sha256). Lève IntegrityError si la taille ou le sha256 ne correspondent pas.
+    """
+    part = dest + ".part"
+    if url.startswith("file://"):
+        shutil.copyfile(url[len("file://"):], part)
+    else:
+        last_error: Optional[Exception] = None
+        for _ in range(DOWNLOAD_ATTEMPTS):
+            try:
+                expected_size = _download_range(url, part, expected_size, headers or {}, timeout)
+                last_error = None
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                last_error = e
+        if last_error:
+            raise last_error
+
+    size = os.path.getsize(part)
+    if size == 0 or (expected_size and size != expected_size):
+        os.remove(part)
+        raise IntegrityError(f"Taille inattendue pour {url}: {size} != {expected_size}")
+    digest = sha256_file(part)
+    if expected_sha256 and digest != expected_sha256.lower():
+        os.remove(part)
+        raise IntegrityError(f"sha256 inattendu pour {url}: {digest} != {expected_sha256}")
+    os.replace(part, dest)
+    return size, digest
+
+
+def _download_range(url: str, part: str, expected_size: Optional[int], headers: Dict[str, str], timeout: tuple) -> Optional[int]:
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    req_headers = dict(headers)
+    if offset:
+        req_headers["Range"] = f"bytes={offset}-"
+    with requests.get(url, stream=True, headers=req_headers, timeout=timeout) as r:
+        if r.status_code == 416:
+            return expected_size or offset
+        r.raise_for_status()
+        if r.status_code == 206:
+            content_range = r.headers.get("Content-Range", "")
+            total = content_range.rsplit("/", 1)[-1]
+            mode = "ab"
+            if total.isdigit():
+                expected_size = int(total)
+        else:
+            # Serveur sans Range : on repart de zéro
+            mode = "wb"
+            length = r.headers.get("Content-Length")
+            if length and length.isdigit():
+                expected_size = int(length)
+        with open(part, mode) as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+    return expected_size
+
+
+def sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,172 @@
+"""
+Profils d'encodage vidéo (aperçu rapide / rendu final) indépendants du matériel.
+
+- preview : basse résolution, preset rapide, pour itérer pendant l'édition.
+- final   : CRF réglé + faststart, rendu en tâche de fond après validation.
+Le format (orientation, cadence) suit `ltx_platform.spec_for_platform`.
+
+Env :
+  VIDEO_CODEC            libx264 (défaut) | libx265 | h264_nvenc | hevc_nvenc | h264_qsv | h264_videotoolbox
+  VIDEO_ENCODE_THREADS   défaut = nombre de CPU
+  VIDEO_FINAL_CRF        défaut 20
+  VIDEO_PREVIEW_CRF      défaut 30
+Lus à chaque rendu (pas à l'import). La qualité s'exprime toujours sur l'échelle CRF de
+x264 (0-51, plus bas = meilleur) et est convertie vers l'échelle de chaque encodeur.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional
+
+from backend.ltx_platform import spec_for_platform
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(high, value))
+
+
+# Paramètres "qualité constante" par encodeur, à partir d'une valeur CRF x264 (0-51).
+# Échelles : x265 ≈ x264 + 4 à qualité perçue égale ; nvenc -cq et qsv -global_quality
+# 1-51 (plus bas = meilleur, -cq n'agit qu'en débit variable sans plafond) ;
+# videotoolbox -q:v 1-100 (plus HAUT = meilleur).
+_QUALITY_PARAMS = {
+    "libx264": lambda crf: ["-crf", str(_clamp(crf, 0, 51))],
+    "libx265": lambda crf: ["-crf", str(_clamp(crf + 4, 0, 51))],
+    "h264_nvenc": lambda crf: ["-rc", "vbr", "-cq", str(_clamp(crf, 1, 51)), "-b:v", "0"],
+    "hevc_nvenc": lambda crf: ["-rc", "vbr", "-cq", str(_clamp(crf + 4, 1, 51)), "-b:v", "0"],
+    "h264_qsv": lambda crf: ["-global_quality", str(_clamp(crf, 1, 51))],
+    "h264_videotoolbox": lambda crf: ["-q:v", str(_clamp(100 - 2 * crf, 1, 100))],
+}
+
+
+# Les presets x264 ne sont pas compris par les encodeurs matériels.
+_X264_PRESETS = ("libx264", "libx265")
+
+
+@dataclass(frozen=True)
+class EncodeProfile:
+    name: str  # preview | final
+    width: int
+    height: int
+    fps: float
+    crf_env: str  # variable d'environnement de la qualité (échelle CRF x264)
+    default_crf: int
+    preset: str
+    faststart: bool
+    audio_bitrate: str
+    format_label: str
+
+    @property
+    def codec(self) -> str:
+        codec = (os.getenv("VIDEO_CODEC") or "libx264").strip()
+        if codec not in _QUALITY_PARAMS:
+            raise ValueError(f"VIDEO_CODEC non supporté: {codec!r} (attendu: {', '.join(_QUALITY_PARAMS)})")
+        return codec
+
+    @property
+    def crf(self) -> int:
+        return int(os.getenv(self.crf_env) or self.default_crf)
+
+    @property
+    def threads(self) -> int:
+        return int(os.getenv("VIDEO_ENCODE_THREADS") or os.cpu_count() or 2)
+
+    @property
+    def resolution(self) -> tuple:
+        return (self.width, self.height)
+
+    def ffmpeg_params(self) -> List[str]:
+        params: List[str] = [*_QUALITY_PARAMS[self.codec](self.crf), "-pix_fmt", "yuv420p"]
+        if self.faststart:
+            params.extend(["-movflags", "+faststart"])
+        return params
+
+    def write_kwargs(self) -> Dict[str, Any]:
+        """Arguments pour `VideoClip.write_videofile` (MoviePy)."""
+        kwargs: Dict[str, Any] = {
+            "fps": self.fps,
+            "codec": self.codec,
+            "audio_codec": "aac",
+            "audio_bitrate": self.audio_bitrate,
+            "threads": self.threads,
+            "ffmpeg_params": self.ffmpeg_params(),
+        }
+        if self.codec in _X264_PRESETS:
+            kwargs["preset"] = self.preset
+        return kwargs
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "crf": self.crf,
+            "preset": self.preset,
+            "codec": self.codec,
+            "faststart": self.faststart,
+            "format_label": self.format_label,
+        }
+
+
+PREVIEW = EncodeProfile(
+    name="preview",
+    width=960,
+    height=540,
+    fps=24.0,
+    crf_env="VIDEO_PREVIEW_CRF",
+    default_crf=30,
+    preset="ultrafast",
+    faststart=True,
+    audio_bitrate="96k",
+    format_label="preview",
+)
+
+FINAL = EncodeProfile(
+    name="final",
+    width=1920,
+    height=1080,
+    fps=30.0,
+    crf_env="VIDEO_FINAL_CRF",
+    default_crf=20,
+    preset="medium",
+    faststart=True,
+    audio_bitrate="192k",
+    format_label="final",
+)
+
+_TIERS = {"preview": PREVIEW, "final": FINAL}
+
+
+def profile_for_platform(platform: Optional[str], tier: str = "final") -> EncodeProfile:
+    """
+    Profil `tier` (preview | final) adapté au réseau : orientation et cadence
+    reprises de `spec_for_platform`, résolution fixée par le tier.
+    """
+    base = _TIERS.get((tier or "final").lower(), FINAL)
+    spec = spec_for_platform(platform)
+    long_side, short_side = max(base.width, base.height), min(base.width, base.height)
+    vertical = spec.height > spec.width
+    width, height = (short_side, long_side) if vertical else (long_side, short_side)
+    fps = min(base.fps, spec.frame_rate) if base.name == "preview" else spec.frame_rate
+    return replace(
+        base,
+        width=width,
+        height=height,
+        fps=fps,
+        format_label=f"{spec.format_label}_{base.name}",
+    )
+
+
+def profile_from_options(options: Dict[str, Any]) -> EncodeProfile:
+    """
+    Résout le profil à partir des options historiques de `VideoMaker.create_video`
+    (`format`: vertical|horizontal) ou des nouvelles (`platform`, `quality`).
+    """
+    profile = options.get("profile")
+    if isinstance(profile, EncodeProfile):
+        return profile
+    platform = options.get("platform")
+    if not platform:
+        platform = "tiktok" if options.get("format", "vertical") == "vertical" else "youtube"
+    return profile_for_platform(platform, options.get("quality") or "final")
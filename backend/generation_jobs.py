@@ -0,0 +1,118 @@
+"""
+Accès à la table `generation_jobs` (suivi des vidéos IA), à la place du JSON
+`Script.extra_metadata["ltx_video"]` réécrit à chaque changement d'état.
+
+- Mises à jour en un `UPDATE … WHERE` sur la ligne du job (pas de copie du JSON du script,
+  pas de mise à jour perdue entre workers concurrents).
+- Les champs sans colonne dédiée vont dans `details` (fusion sous verrou de ligne).
+- Lecture du statut : un accès indexé à cette table, sans charger `Script.content`.
+- Scripts antérieurs à la table : repli en lecture sur l'ancien `extra_metadata["ltx_video"]`.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from backend.database import db
+from backend.saas_models import GenerationJob, Script
+
+KIND_LTX = 'ltx_video'
+ACTIVE_STATUSES = ('queued', 'processing')
+
+_COLUMNS = {c.name for c in GenerationJob.__table__.columns} - {'id', 'user_id', 'script_id', 'kind', 'details', 'created_at'}
+
+
+def _split(patch: dict) -> tuple:
+    columns = {k: v for k, v in patch.items() if k in _COLUMNS}
+    details = {k: v for k, v in patch.items() if k not in _COLUMNS}
+    return columns, details
+
+
+def get(script_id: int, kind: str = KIND_LTX) -> Optional[GenerationJob]:
+    return GenerationJob.query.filter_by(script_id=script_id, kind=kind).first()
+
+
+def view(script_id: int, user_id: Optional[int] = None, kind: str = KIND_LTX) -> Optional[dict]:
+    """Statut du job (dict API) ; `user_id` restreint au propriétaire."""
+    query = GenerationJob.query.filter_by(script_id=script_id, kind=kind)
+    if user_id is not None:
+        query = query.filter_by(user_id=user_id)
+    job = query.first()
+    if job:
+        return job.to_dict()
+    legacy = db.session.query(Script.extra_metadata).filter_by(id=script_id)
+    if user_id is not None:
+        legacy = legacy.filter_by(user_id=user_id)
+    row = legacy.first()
+    return ((row[0] or {}).get(kind) if row else None)
+
+
+def views_for(script_ids: list, kind: str = KIND_LTX) -> dict:
+    """{script_id: statut} en une requête (lots, listes)."""
+    if not script_ids:
+        return {}
+    jobs = GenerationJob.query.filter(GenerationJob.script_id.in_(script_ids), GenerationJob.kind == kind).all()
+    return {job.script_id: job.to_dict() for job in jobs}
+
+
+def ensure(script: Script, kind: str = KIND_LTX, defaults: Optional[dict] = None) -> GenerationJob:
+    """Ligne du job pour ce script (créée au besoin, reprise de l'ancien JSON si présent)."""
+    job = get(script.id, kind)
+    if job:
+        return job
+    legacy = dict((script.extra_metadata or {}).get(kind) or {})
+    columns, details = _split({**(defaults or {}), **legacy})
+    columns.setdefault('status', 'queued')
+    job = GenerationJob(user_id=script.user_id, script_id=script.id, kind=kind, details=details, **columns)
+    db.session.add(job)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Créée entre-temps par un autre worker
+        db.session.rollback()
+        job = get(script.id, kind)
+    return job
+
+
+def update(script_id: int, patch: dict, kind: str = KIND_LTX) -> bool:
+    """
+    Applique `patch` en un UPDATE de la ligne ; les clés hors colonnes sont fusionnées dans `details`.
+    Retourne False si la ligne n'existe pas.
+    """
+    columns, details = _split(patch)
+    query = GenerationJob.query.filter_by(script_id=script_id, kind=kind)
+    if details:
+        job = query.with_for_update().first()
+        if job is None:
+            db.session.rollback()
+            return False
+        job.details = {**(job.details or {}), **details}
+        for key, value in columns.items():
+            setattr(job, key, value)
+        job.updated_at = datetime.utcnow()
+        updated = 1
+    else:
+        updated = query.update({**columns, 'updated_at': datetime.utcnow()}, synchronize_session='fetch')
+    db.session.commit()
+    return bool(updated)
+
+
+def acquire(script: Script, patch: dict, fresh: bool, kind: str = KIND_LTX) -> bool:
+    """
+    Passe le job à `queued` si aucune génération n'est en cours (UPDATE conditionnel :
+    deux requêtes simultanées ne peuvent pas lancer deux rendus). `fresh` : repart de zéro
+    (nouvelle vidéo) au lieu de reprendre à l'étape enregistrée.
+    """
+    job = ensure(script, kind, defaults={'status': 'skipped'})
+    values = {'status': 'queued', 'error': None, 'updated_at': datetime.utcnow(), **_split(patch)[0]}
+    if fresh or job.status == 'completed':
+        values.update({'stage': 'queued', 'runner_job_id': None, 'retries': 0})
+    acquired = GenerationJob.query.filter(
+        GenerationJob.id == job.id,
+        GenerationJob.status.notin_(ACTIVE_STATUSES),
+    ).update(values, synchronize_session='fetch')
+    db.session.commit()
+    details = _split(patch)[1]
+    if acquired and details:
+        update(script.id, details, kind)
+    return bool(acquired)
@@ -1,3 +1,29 @@
+"""
+Configuration gunicorn, pilotée par l'environnement.
+
+Les routes de génération passent l'essentiel de leur temps à attendre des appels
+distants (LLM, TTS, Pexels, Gemini) : un worker `sync` bloque une requête entière par
+processus. Modes de service :
+
+- sync     (défaut) : comportement historique, WORKERS requêtes simultanées.
+- gthread  : WORKERS x THREADS requêtes simultanées ; compatible avec tous les clients
+             (requests, SDK Google / Anthropic, psycopg2, edge-tts). Recommandé.
+- gevent   : greenlets, WORKER_CONNECTIONS requêtes par worker ; sockets patchés au
+             démarrage du worker (pas de preload), psycopg2 rendu coopératif via
+             psycogreen s'il est installé.
+
+Le pool SQLAlchemy (DB_POOL_SIZE / DB_MAX_OVERFLOW, voir database.py) doit suivre la
+concurrence par processus : en gthread, sa taille par défaut est GUNICORN_THREADS ; en
+gevent, GUNICORN_WORKER_CONNECTIONS plafonné à DB_POOL_MAX (défaut 50).
+
+Env :
+  GUNICORN_WORKER_CLASS        défaut sync
+  GUNICORN_WORKERS             défaut min(2 x CPU + 1, 4)
+  GUNICORN_THREADS             défaut 32 (gthread)
+  GUNICORN_WORKER_CONNECTIONS  défaut 500 (gevent)
+  GUNICORN_TIMEOUT             défaut 120
+  PROMETHEUS_MULTIPROC_DIR     métriques agrégées entre workers (voir telemetry.py)
+"""
 import multiprocessing
 import os
 
@@ -7,9 +33,11 @@ bind = f"0.0.0.0:{port}"
 
 # Workers configuration for Render
 # Use fewer workers on Render free tier to avoid memory issues
-workers = min(multiprocessing.cpu_count() * 2 + 1, 4)
-worker_class = "sync"
-timeout = 120  # 2 minutes
+workers = int(os.getenv('GUNICORN_WORKERS', str(min(multiprocessing.cpu_count() * 2 + 1, 4))))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+threads = int(os.getenv('GUNICORN_THREADS', '32')) if worker_class == 'gthread' else 1
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '500'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))  # 2 minutes
 keepalive = 5
 
 # Logging
@@ -20,5 +48,28 @@ loglevel = "info"
 # Graceful timeout
 graceful_timeout = 30
 
-# Preload app for better performance
-preload_app = True
+# Preload app for better performance (sauf gevent : l'app doit être importée après le patch des sockets)
+preload_app = worker_class != 'gevent'
+
+
+def post_fork(server, worker):
+    if worker_class != 'gevent':
+        return
+    try:
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+    except ImportError:
+        server.log.warning("psycogreen absent : les requêtes PostgreSQL bloquent le worker gevent")
+
+
+def when_ready(server):
+    per_worker = threads if worker_class == 'gthread' else worker_connections if worker_class == 'gevent' else 1
+    server.log.info(f"Mode {worker_class} : {workers} worker(s) x {per_worker} = {workers * per_worker} requêtes simultanées")
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
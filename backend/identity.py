@@ -0,0 +1,155 @@
+"""
+Identité de la requête : utilisateur + abonnement chargés en une requête (JOIN) et
+mémorisés sur `flask.g`, plan / rôle admin portés par le JWT.
+
+- Claims `plan` et `adm` ajoutés aux jetons d'accès (`claims_for`). Tant que le compte
+  n'a pas changé depuis l'émission du jeton, `current_plan()` / `current_is_admin()` ne
+  touchent pas la base.
+- Révocation : toute modification d'abonnement ou du rôle admin (événements SQLAlchemy)
+  pose `auth_changed:{user}` dans Redis pour la durée de vie d'un jeton d'accès ; les
+  jetons plus anciens retombent sur la base. Redis indisponible : base de données.
+- Déconnexion : le `jti` du jeton est mis en liste noire Redis jusqu'à son expiration,
+  ainsi que celui du jeton de rafraîchissement associé (claim `rjti` du jeton d'accès) :
+  sans quoi /refresh rendrait un jeton d'accès neuf pendant 7 jours.
+
+Env :
+  JWT_PLAN_CLAIMS   défaut 1 (0 : claims ignorés, toujours la base)
+"""
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Optional
+
+from flask import g, has_request_context
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import joinedload
+
+from backend.redis_client import get_redis_client
+from backend.saas_models import Subscription, User
+
+logger = logging.getLogger(__name__)
+
+ACCESS_TTL = timedelta(hours=1)
+REFRESH_TTL = timedelta(days=7)
+_USE_CLAIMS = os.getenv('JWT_PLAN_CLAIMS', '1') == '1'
+
+
+def claims_for(user: User, refresh_jti: Optional[str] = None) -> dict:
+    """Claims additionnels du jeton d'accès ; `refresh_jti` : jeton de rafraîchissement émis avec lui."""
+    claims = {
+        'plan': user.subscription.plan_type if user.subscription else None,
+        'adm': bool(user.is_admin),
+    }
+    if refresh_jti:
+        claims['rjti'] = refresh_jti
+    return claims
+
+
+def load_user(user_id) -> Optional[User]:
+    """Utilisateur courant (abonnement joint), une requête par requête HTTP au plus."""
+    if not has_request_context():
+        return User.query.options(joinedload(User.subscription)).get(user_id)
+    cache = g.setdefault('_identity_users', {})
+    key = str(user_id)
+    if key not in cache:
+        cache[key] = User.query.options(joinedload(User.subscription)).get(user_id)
+    return cache[key]
+
+
+def current_user() -> Optional[User]:
+    return load_user(get_jwt_identity())
+
+
+def _trusted_claims() -> Optional[dict]:
+    """Claims du jeton s'ils sont encore à jour (vérification Redis mémorisée sur g)."""
+    if not _USE_CLAIMS or not has_request_context():
+        return None
+    if '_identity_claims' in g:
+        return g._identity_claims
+    claims = None
+    payload = get_jwt()
+    if 'plan' in payload:
+        client = get_redis_client()
+        try:
+            changed = client.get(f"auth_changed:{payload['sub']}") if client is not None else None
+            if client is not None and (changed is None or float(changed) < payload.get('iat', 0)):
+                claims = payload
+        except Exception as e:
+            logger.warning("Vérification des claims impossible, lecture en base: %s", e)
+    g._identity_claims = claims
+    return claims
+
+
+def current_plan(user_id=None) -> Optional[str]:
+    """Plan de l'utilisateur courant (claims si à jour, sinon base) ; `user_id` : un autre compte."""
+    if user_id is not None and str(user_id) != str(get_jwt_identity()):
+        plan = Subscription.query.with_entities(Subscription.plan_type).filter_by(user_id=user_id).first()
+        return plan[0] if plan else None
+    claims = _trusted_claims()
+    if claims is not None:
+        return claims['plan']
+    user = current_user()
+    return user.subscription.plan_type if user and user.subscription else None
+
+
+def current_is_admin() -> bool:
+    claims = _trusted_claims()
+    if claims is not None:
+        return bool(claims.get('adm'))
+    user = current_user()
+    return bool(user and user.is_admin)
+
+
+def mark_changed(user_id) -> None:
+    """Les jetons émis avant maintenant ne font plus foi pour le plan / le rôle."""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        # Marge d'une seconde : `iat` est arrondi à la seconde
+        client.set(f"auth_changed:{user_id}", time.time() + 1, ex=int(ACCESS_TTL.total_seconds()))
+    except Exception as e:
+        logger.warning("Invalidation des claims impossible pour %s: %s", user_id, e)
+
+
+def revoke_token(payload: dict) -> None:
+    """Déconnexion : le jeton, et son jeton de rafraîchissement, sont refusés jusqu'à expiration."""
+    client = get_redis_client()
+    if client is None:
+        return
+    ttl = int(payload.get('exp', 0) - time.time())
+    if ttl > 0:
+        client.set(f"jwt_revoked:{payload['jti']}", 1, ex=ttl)
+    if payload.get('rjti'):
+        # Échéance exacte inconnue ici : durée de vie maximale d'un jeton de rafraîchissement
+        client.set(f"jwt_revoked:{payload['rjti']}", 1, ex=int(REFRESH_TTL.total_seconds()))
+
+
+def is_token_revoked(jwt_header, jwt_payload) -> bool:
+    client = get_redis_client()
+    if client is None:
+        return False
+    try:
+        return bool(client.exists(f"jwt_revoked:{jwt_payload['jti']}"))
+    except Exception:
+        return False
+
+
+@event.listens_for(Subscription, 'after_insert')
+@event.listens_for(Subscription, 'after_update')
+@event.listens_for(Subscription, 'after_delete')
+def _subscription_changed(mapper, connection, target):
+    mark_changed(target.user_id)
+
+
+@event.listens_for(User, 'after_update')
+def _user_updated(mapper, connection, target):
+    if inspect(target).attrs.is_admin.history.has_changes():
+        mark_changed(target.id)
+
+
+@event.listens_for(User, 'after_delete')
+def _user_deleted(mapper, connection, target):
+    mark_changed(target.id)
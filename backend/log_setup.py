@@ -0,0 +1,169 @@
+"""
+Journalisation structurée : enregistrements JSON (une ligne par événement) écrits par un
+thread dédié, hors du chemin des requêtes.
+
+- File non bloquante : les handlers `logging` déposent l'enregistrement dans une file
+  bornée (LOG_QUEUE_SIZE) ; un QueueListener écrit sur stdout. File pleine : l'événement
+  est abandonné (compté, signalé au prochain enregistrement écrit) plutôt que de bloquer.
+- Niveaux par logger : LOG_LEVELS="main=INFO,backend.video_maker=DEBUG,urllib3=WARNING".
+- Échantillonnage des événements DEBUG (LOG_DEBUG_SAMPLE) ; un appel peut fixer son propre
+  taux : `logger.debug(..., extra={'sample': 0.01})`.
+- Troncature : message et champs texte au-delà de LOG_MAX_CHARS caractères.
+- Champs : ts, level, logger, msg, trace_id (voir telemetry.py), exception, et tout
+  `extra={...}` passé à l'appel.
+
+LOG_FORMAT=text conserve une sortie lisible (développement), avec la même file.
+
+Env :
+  LOG_LEVEL          défaut INFO
+  LOG_LEVELS         niveaux par logger (voir ci-dessus)
+  LOG_FORMAT         json (défaut) | text
+  LOG_DEBUG_SAMPLE   défaut 0.1 (fraction des DEBUG conservés)
+  LOG_MAX_CHARS      défaut 2000
+  LOG_QUEUE_SIZE     défaut 10000
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from backend.telemetry import current_trace_id
+
+MAX_CHARS = int(os.getenv('LOG_MAX_CHARS', '2000'))
+DEBUG_SAMPLE = float(os.getenv('LOG_DEBUG_SAMPLE', '0.1'))
+
+# Attributs standard d'un LogRecord : tout le reste vient de `extra`
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'trace_id', 'sample'}
+
+_lock = threading.Lock()
+_listener = None
+_handler = None
+_dropped = 0
+
+
+def truncate(value, limit: int = None):
+    """Coupe les textes trop longs en indiquant la taille d'origine."""
+    limit = limit or MAX_CHARS
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]}…[+{len(value) - limit} car.]"
+    return value
+
+
+def _field(value):
+    if isinstance(value, str):
+        return truncate(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = json.dumps(value, ensure_ascii=False, default=str)
+    return value if len(text) <= MAX_CHARS else truncate(text)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': truncate(record.getMessage()),
+        }
+        trace_id = getattr(record, 'trace_id', None)
+        if trace_id:
+            entry['trace_id'] = trace_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = _field(value)
+        if record.exc_text:
+            entry['exception'] = truncate(record.exc_text, MAX_CHARS * 4)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Ne garde qu'une fraction des événements DEBUG (taux global ou `extra={'sample': x}`)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        rate = getattr(record, 'sample', DEBUG_SAMPLE)
+        return rate >= 1 or random.random() < rate
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Tout ce qui dépend du thread appelant est figé ici : message, trace, exception
+        record.trace_id = current_trace_id()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped += 1
+
+
+class _DropReportingHandler(logging.StreamHandler):
+    def emit(self, record: logging.LogRecord) -> None:
+        global _dropped
+        if _dropped:
+            lost, _dropped = _dropped, 0
+            notice = logging.LogRecord('backend.log_setup', logging.WARNING, __file__, 0,
+                                       'Événements de log abandonnés (file pleine)', None, None)
+            notice.dropped = lost
+            super().emit(notice)
+        super().emit(record)
+
+
+def _apply_levels(spec: str) -> None:
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, level = item.partition('=')
+        if level:
+            logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+
+def _restart_after_fork() -> None:
+    """Le thread d'écriture ne survit pas au fork (gunicorn preload, Celery prefork) : nouvelle file."""
+    global _listener
+    if _listener is None:
+        return
+    _handler.queue = queue.Queue(_handler.queue.maxsize)
+    _listener = QueueListener(_handler.queue, *_listener.handlers, respect_handler_level=False)
+    _listener.start()
+
+
+def configure() -> None:
+    """Installe la file et les niveaux sur le logger racine (idempotent)."""
+    global _listener, _handler
+    with _lock:
+        if _listener is not None:
+            return
+        sink = _DropReportingHandler(sys.stdout)
+        if os.getenv('LOG_FORMAT', 'json') == 'text':
+            sink.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        else:
+            sink.setFormatter(JsonFormatter())
+
+        _handler = handler = _NonBlockingQueueHandler(queue.Queue(int(os.getenv('LOG_QUEUE_SIZE', '10000'))))
+        handler.addFilter(SamplingFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+        _apply_levels(os.getenv('LOG_LEVELS', ''))
+
+        _listener = QueueListener(handler.queue, sink, respect_handler_level=False)
+        _listener.start()
+        atexit.register(lambda: _listener.stop())
+        os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,108 @@
+"""
+Lots de génération vidéo IA (plusieurs scripts d'un coup, ex. agences en plan enterprise).
+
+Un lot référence ses scripts dans Redis ; chaque script suit le parcours LTX habituel
+(Celery -> runner). Les scripts sont mis en file groupés par pipeline / résolution pour
+que le runner les enchaîne sans rechargement de modèle. Pas d'endpoint de lot côté runner :
+chaque script est soumis par POST /v1/jobs, avec reprise et déduplication par script
+(voir ltx_workflow.py).
+"""
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from backend import generation_jobs
+from backend.database import db
+from backend.ltx_platform import spec_for_platform
+from backend.redis_client import get_redis_client
+from backend.saas_models import Script
+
+BATCH_MAX = int(os.getenv("LTX_BATCH_MAX", "100"))
+BATCH_TTL = int(os.getenv("LTX_BATCH_TTL_SEC", str(7 * 24 * 3600)))
+
+_TERMINAL = ("completed", "failed")
+
+
+def batch_id_ok(batch_id: str) -> bool:
+    return bool(re.match(r"^[a-f0-9]{16}$", batch_id or ""))
+
+
+def _key(batch_id: str) -> str:
+    return f"ltx_batch:{batch_id}"
+
+
+def _client():
+    client = get_redis_client()
+    if client is None:
+        raise RuntimeError("Redis indisponible pour le suivi des lots")
+    return client
+
+
+def spec_group(platform: str) -> tuple:
+    """Clé de regroupement : scripts rendus avec la même configuration du runner."""
+    spec = spec_for_platform(platform)
+    return (spec.pipeline, spec.width, spec.height)
+
+
+def create_batch(user_id: int, script_ids: List[int], rejected: Dict[int, str]) -> dict:
+    batch = {
+        "batch_id": os.urandom(8).hex(),
+        "user_id": user_id,
+        "script_ids": script_ids,
+        "rejected": {str(k): v for k, v in rejected.items()},
+        "created_at": datetime.utcnow().isoformat() + "Z",
+    }
+    _client().set(_key(batch["batch_id"]), json.dumps(batch), ex=BATCH_TTL)
+    return batch
+
+
+def load_batch(batch_id: str) -> Optional[dict]:
+    if not batch_id_ok(batch_id):
+        return None
+    raw = _client().get(_key(batch_id))
+    return json.loads(raw) if raw else None
+
+
+def batch_progress(batch: dict, user_id: int) -> dict:
+    """Vue agrégée : compte par statut LTX, pourcentage terminé et état de chaque script."""
+    # Titres seulement (pas le contenu des scripts) ; statuts lus dans generation_jobs
+    titles = dict(
+        db.session.query(Script.id, Script.title)
+        .filter(Script.id.in_(batch["script_ids"]), Script.user_id == user_id)
+        .all()
+    )
+    views = generation_jobs.views_for(list(titles))
+    legacy_ids = [sid for sid in titles if sid not in views]
+    if legacy_ids:
+        # Jobs antérieurs à generation_jobs : statut encore dans extra_metadata
+        for sid, meta in db.session.query(Script.id, Script.extra_metadata).filter(Script.id.in_(legacy_ids)):
+            views[sid] = (meta or {}).get("ltx_video") or {}
+    counts: Dict[str, int] = {}
+    items = []
+    for script_id in batch["script_ids"]:
+        ltx = (views.get(script_id) or {}) if script_id in titles else {"status": "missing"}
+        status = ltx.get("status") or "unknown"
+        counts[status] = counts.get(status, 0) + 1
+        items.append(
+            {
+                "script_id": script_id,
+                "title": titles.get(script_id),
+                "status": status,
+                "video_url": ltx.get("video_url"),
+                "error": ltx.get("error"),
+            }
+        )
+    total = len(batch["script_ids"])
+    done = sum(counts.get(s, 0) for s in _TERMINAL)
+    return {
+        "batch_id": batch["batch_id"],
+        "total": total,
+        "counts": counts,
+        "progress": round(100.0 * done / total, 1) if total else 100.0,
+        "finished": done == total,
+        "rejected": batch.get("rejected") or {},
+        "items": items,
+        "created_at": batch.get("created_at"),
+    }
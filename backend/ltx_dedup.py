@@ -0,0 +1,75 @@
+"""
+Cache des rendus LTX terminés, indexé par empreinte (prompt + spec + pipeline + seed).
+
+Un script re-soumis (ou dupliqué) dont l'empreinte correspond à un MP4 déjà enregistré
+dans static/videos est relié à ce fichier sans nouveau job GPU. Stocké dans Redis ;
+sans Redis, la déduplication est simplement désactivée (le runner déduplique aussi).
+
+Env :
+  LTX_SEED           défaut 42 (graine fixe : même prompt + spec -> même vidéo)
+  LTX_DEDUP_TTL_SEC  défaut 2592000 (30 jours)
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from backend.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = "ltx_fp:"
+DEDUP_TTL = int(os.getenv("LTX_DEDUP_TTL_SEC", "2592000"))
+
+
+def default_seed() -> Optional[int]:
+    raw = (os.getenv("LTX_SEED") or "42").strip()
+    return int(raw) if raw.isdigit() else None
+
+
+def fingerprint(prompt: str, spec: Dict[str, Any], pipeline: str, seed: Optional[int], enhance_prompt: bool) -> str:
+    payload = {
+        "prompt": prompt.strip(),
+        "width": spec.get("width"),
+        "height": spec.get("height"),
+        "num_frames": spec.get("num_frames"),
+        "frame_rate": spec.get("frame_rate"),
+        "pipeline": pipeline,
+        "seed": seed,
+        "enhance_prompt": bool(enhance_prompt),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def find(fp: str, video_dir: str) -> Optional[Dict[str, Any]]:
+    """Rendu déjà enregistré pour cette empreinte ({filename, sha256, script_id}) si le fichier existe encore."""
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        raw = client.get(_PREFIX + fp)
+        if not raw:
+            return None
+        record = json.loads(raw)
+        if not os.path.isfile(os.path.join(video_dir, record.get("filename") or "")):
+            client.delete(_PREFIX + fp)
+            return None
+    except Exception as e:
+        logger.warning("Cache LTX indisponible: %s", e)
+        return None
+    return record
+
+
+def remember(fp: str, filename: str, sha256: str, script_id: int) -> None:
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.set(
+            _PREFIX + fp,
+            json.dumps({"filename": filename, "sha256": sha256, "script_id": script_id}),
+            ex=DEDUP_TTL,
+        )
+    except Exception as e:
+        logger.warning("Cache LTX indisponible: %s", e)
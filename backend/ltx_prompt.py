@@ -3,10 +3,14 @@ Build LTX-2 style prompts from a long-form script.
 Tone: fun + marketing-friendly + creator-oriented.
 """
 import re
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 _MAX_WORDS = 200
 
+# Marqueurs de plan produits par les prompts de `generate_script` ([VISUEL], [B-ROLL / VISUEL]…)
+_SCENE_MARKER = re.compile(r"\[\s*(?:B-ROLL|VISUEL)[^\]]*\]\s*[:\-–]?\s*", re.IGNORECASE)
+_OTHER_TAG = re.compile(r"\[[A-ZÉÈ /\-]+\]\s*:?\s*")
+
 
 def _strip_script_markdown(text: str) -> str:
     t = text or ""
@@ -105,3 +109,53 @@ def script_to_ltx_prompt(
             tech += ". "
 
     return f"{prefix} {tech}{core}".strip()
+
+
+def split_script_scenes(script_text: str, max_scenes: int = 10) -> List[str]:
+    """
+    Découpe le script en scènes visuelles : chaque marqueur [VISUEL] / [B-ROLL] ouvre une
+    scène (description du plan + narration qui suit). Sans marqueur, découpe par paragraphes.
+    Au-delà de `max_scenes`, les scènes voisines sont fusionnées.
+    """
+    scenes: List[List[str]] = []
+    current: Optional[List[str]] = None
+    for line in (script_text or "").splitlines():
+        m = _SCENE_MARKER.search(line)
+        if m:
+            current = [line[m.end():]]
+            scenes.append(current)
+        elif current is not None and line.strip() and not line.lstrip().startswith("#"):
+            current.append(_OTHER_TAG.sub("", re.sub(r"^\s*[-*•]\s*", "", line)))
+    texts = [" ".join(part.strip() for part in scene if part.strip()) for scene in scenes]
+    texts = [t for t in texts if len(t.split()) >= 3]
+    if not texts:
+        texts = [p.strip() for p in re.split(r"\n\s*\n", script_text or "") if len(p.split()) >= 5]
+    if not texts:
+        return [script_text or ""]
+    max_scenes = max(1, max_scenes)
+    if len(texts) <= max_scenes:
+        return texts
+    size = len(texts) / max_scenes
+    return [" ".join(texts[int(i * size):int((i + 1) * size)]) for i in range(max_scenes)]
+
+
+def scene_prompts(
+    script_text: str,
+    title: Optional[str] = None,
+    platform: str = "youtube",
+    video_spec: Optional[Dict[str, Any]] = None,
+    language: str = "fr",
+    max_scenes: int = 10,
+) -> List[str]:
+    """Un prompt LTX par scène ; seul le premier garde le style « hook » d'ouverture."""
+    return [
+        script_to_ltx_prompt(
+            scene,
+            title=title,
+            platform=platform,
+            trend_style=(i == 0),
+            video_spec=video_spec,
+            language=language,
+        )
+        for i, scene in enumerate(split_script_scenes(script_text, max_scenes=max_scenes))
+    ]
@@ -6,8 +6,14 @@ Configure Scripty with:
   LTX_RUNNER_TOKEN optional shared secret (Bearer)
 
 Env for polling:
-  LTX_POLL_INTERVAL_SEC  default 5
+  LTX_POLL_INTERVAL_SEC  default 5 (fallback when the runner does not long-poll)
   LTX_POLL_MAX_SEC       default 3600
+  LTX_LONG_POLL_SEC      default 60 (server-side wait per status request)
+
+Push completion:
+  LTX_CALLBACK_BASE_URL  e.g. http://backend:5001 — the runner POSTs the final status to
+                         {base}/api/video/ltx/callback/<script_id>
+  LTX_CALLBACK_TOKEN     shared secret sent back as Bearer by the runner
 """
 import os
 import time
@@ -15,8 +21,20 @@ from typing import Any, Dict, Optional
 
 import requests
 
+from backend.downloads import download_file
+from backend.telemetry import inject, traced
+
 DEFAULT_POLL_INTERVAL = int(os.getenv("LTX_POLL_INTERVAL_SEC", "5"))
 DEFAULT_POLL_MAX = int(os.getenv("LTX_POLL_MAX_SEC", "3600"))
+DEFAULT_LONG_POLL = int(os.getenv("LTX_LONG_POLL_SEC", "60"))
+
+
+class LtxJobFailed(RuntimeError):
+    """Le runner a terminé le job en échec (erreur de rendu, pas une erreur réseau)."""
+
+
+# Connexions HTTP réutilisées entre les appels (keep-alive)
+_session = requests.Session()
 
 
 def _base() -> str:
@@ -31,10 +49,11 @@ def _headers() -> Dict[str, str]:
     token = (os.getenv("LTX_RUNNER_TOKEN") or "").strip()
     if token:
         h["Authorization"] = f"Bearer {token}"
-    return h
+    return inject(h)
 
 
-def submit_job(
+@traced("ltx_submit", provider="ltx")
+def create_job(
     prompt: str,
     pipeline: str = "two_stage",
     enhance_prompt: bool = True,
@@ -44,14 +63,25 @@ def submit_job(
     height: Optional[int] = None,
     num_frames: Optional[int] = None,
     frame_rate: Optional[float] = None,
-) -> str:
-    """POST /v1/jobs -> job_id."""
+    encode_profile: str = "final",
+    callback_url: Optional[str] = None,
+    tier: str = "free",
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    POST /v1/jobs -> réponse du runner ({job_id, status, deduplicated?, ...}).
+    `callback_url` : webhook appelé par le runner en fin de job ;
+    `tier` : plan de l'utilisateur (priorité dans la file du runner) ;
+    `seed` : graine du rendu (à spec identique, même MP4 : le runner déduplique).
+    """
     payload: Dict[str, Any] = {
         "prompt": prompt,
         "pipeline": pipeline,
         "enhance_prompt": enhance_prompt,
         "negative_prompt": negative_prompt or "",
         "platform": platform,
+        "encode_profile": encode_profile,
+        "tier": tier if tier in ("free", "pro", "enterprise") else "free",
     }
     if width is not None:
         payload["width"] = width
@@ -61,8 +91,13 @@ def submit_job(
         payload["num_frames"] = num_frames
     if frame_rate is not None:
         payload["frame_rate"] = frame_rate
+    if seed is not None:
+        payload["seed"] = seed
+    if callback_url:
+        payload["callback_url"] = callback_url
+        payload["callback_token"] = (os.getenv("LTX_CALLBACK_TOKEN") or "").strip()
 
-    r = requests.post(
+    r = _session.post(
         f"{_base()}/v1/jobs",
         json=payload,
         headers=_headers(),
@@ -70,47 +105,114 @@ def submit_job(
     )
     r.raise_for_status()
     data = r.json()
-    job_id = data.get("job_id")
-    if not job_id:
+    if not data.get("job_id"):
         raise RuntimeError(f"LTX runner returned no job_id: {data}")
-    return str(job_id)
+    return data
+
+
+def submit_job(prompt: str, **kwargs: Any) -> str:
+    """POST /v1/jobs -> job_id (voir `create_job`)."""
+    return str(create_job(prompt, **kwargs)["job_id"])
+
 
+def callbacks_enabled() -> bool:
+    """Webhooks de fin de job actifs (URL de base et secret partagé configurés)."""
+    return bool((os.getenv("LTX_CALLBACK_BASE_URL") or "").strip() and (os.getenv("LTX_CALLBACK_TOKEN") or "").strip())
 
-def get_job(job_id: str) -> Dict[str, Any]:
-    r = requests.get(
+
+def callback_url_for(script_id: int) -> Optional[str]:
+    """URL du webhook de fin de job pour ce script, ou None si les callbacks sont désactivés."""
+    if not callbacks_enabled():
+        return None
+    base = os.getenv("LTX_CALLBACK_BASE_URL").strip().rstrip("/")
+    return f"{base}/api/video/ltx/callback/{int(script_id)}"
+
+
+def get_job(job_id: str, wait: Optional[float] = None) -> Dict[str, Any]:
+    """GET /v1/jobs/{id} ; `wait` > 0 : long-poll côté runner jusqu'à la fin du job."""
+    params = {"wait": wait} if wait else None
+    r = _session.get(
         f"{_base()}/v1/jobs/{job_id}",
         headers=_headers(),
-        timeout=60,
+        params=params,
+        timeout=60 + (wait or 0),
     )
     r.raise_for_status()
     return r.json()
 
 
-def download_result(job_id: str) -> bytes:
-    r = requests.get(
+@traced("ltx_download", provider="ltx")
+def download_result(
+    job_id: str,
+    dest_path: str,
+    expected_sha256: Optional[str] = None,
+    expected_size: Optional[int] = None,
+) -> str:
+    """
+    GET /v1/jobs/{id}/file en flux vers `dest_path` (fichier `.part`, reprise Range,
+    renommage atomique) ; vérifie le sha256 annoncé par le runner. Retourne le sha256.
+    """
+    headers = _headers()
+    headers.pop("Content-Type", None)
+    headers["Accept"] = "video/mp4"
+    _, digest = download_file(
         f"{_base()}/v1/jobs/{job_id}/file",
-        headers=_headers(),
-        timeout=600,
+        dest_path,
+        expected_size=expected_size,
+        expected_sha256=expected_sha256,
+        headers=headers,
     )
-    r.raise_for_status()
-    return r.content
-
-
+    return digest
+
+
+def ack_result(job_id: str) -> bool:
+    """
+    POST /v1/jobs/{id}/ack : le MP4 a été téléchargé et vérifié, le runner peut le supprimer.
+    Best-effort : sans ack, la sortie expire de toute façon (LTX_OUTPUT_TTL_SEC côté runner).
+    """
+    try:
+        r = _session.post(f"{_base()}/v1/jobs/{job_id}/ack", headers=_headers(), timeout=15)
+        return r.status_code == 200
+    except requests.RequestException:
+        return False
+
+
+def cancel_job(job_id: str) -> bool:
+    """
+    POST /v1/jobs/{id}/cancel : le job n'est plus attendu (retiré de la file du runner, ou
+    sortie supprimée, si aucune requête dédupliquée n'y est rattachée). Best-effort.
+    """
+    try:
+        r = _session.post(f"{_base()}/v1/jobs/{job_id}/cancel", headers=_headers(), timeout=15)
+        return r.status_code == 200
+    except requests.RequestException:
+        return False
+
+
+@traced("ltx_render", provider="ltx")
 def wait_for_job(
     job_id: str,
     poll_interval: Optional[int] = None,
     poll_max: Optional[int] = None,
 ) -> Dict[str, Any]:
+    """
+    Attend la fin du job par long-poll (réponse immédiate à la fin du rendu).
+    Repli sur un sondage à intervalle fixe si le runner répond sans attendre.
+    """
     interval = poll_interval if poll_interval is not None else DEFAULT_POLL_INTERVAL
     max_wait = poll_max if poll_max is not None else DEFAULT_POLL_MAX
     deadline = time.time() + max_wait
     last: Dict[str, Any] = {}
     while time.time() < deadline:
-        last = get_job(job_id)
+        wait = max(1, min(DEFAULT_LONG_POLL, int(deadline - time.time())))
+        started = time.time()
+        last = get_job(job_id, wait=wait)
         status = last.get("status")
         if status == "completed":
             return last
         if status == "failed":
-            raise RuntimeError(last.get("error") or "LTX job failed")
-        time.sleep(interval)
+            raise LtxJobFailed(last.get("error") or "LTX job failed")
+        if time.time() - started < min(wait, interval):
+            # Runner sans long-poll : éviter de boucler à vide
+            time.sleep(interval)
     raise TimeoutError(f"LTX job {job_id} did not finish within {max_wait}s; last={last}")
@@ -1,24 +1,61 @@
 """
 Orchestrate LTX text-to-video after a script exists: build prompt, call GPU runner, store MP4.
+
+Machine à états persistée dans la table `generation_jobs` (colonne `stage`) :
+  queued -> submitted -> rendered -> downloaded -> stored
+Chaque étape est idempotente ; une reprise repart de la dernière étape atteinte.
+
+Deux phases quand LTX_CALLBACK_BASE_URL est défini :
+  1. submit_ltx_for_script  : prompt + POST au runner, le worker Celery est libéré ;
+  2. finalize_ltx_for_script : déclenchée par le webhook du runner (ou la réconciliation),
+     télécharge et enregistre le MP4.
+
+Un rendu identique (même empreinte prompt + spec + seed, voir ltx_dedup) déjà enregistré
+est réutilisé sans nouveau job GPU.
+
+Mode segmenté (run_segmented_ltx_for_script) : une scène par marqueur [VISUEL] / [B-ROLL],
+un job runner par scène (exécutés en parallèle sur les slots du runner), clips assemblés
+avec ffmpeg concat. Les jobs des segments sont enregistrés dès leur soumission (reprise
+sans nouveau rendu) et annulés auprès du runner si la vidéo échoue définitivement.
+Clips en cours dans LTX_SEGMENT_DIR (défaut {tmp}/ltx_segments).
 """
 import os
 import re
+import shutil
+import tempfile
 from datetime import datetime
 from typing import Optional
 
+import requests
+
+from backend import generation_jobs, ltx_dedup, quotas
 from backend.database import db
 from backend.ltx_platform import spec_for_platform
-from backend.ltx_prompt import script_to_ltx_prompt
-from backend.ltx_runner_client import download_result, submit_job, wait_for_job
-from backend.saas_models import Script, UsageMetric
+from backend.ltx_prompt import scene_prompts, script_to_ltx_prompt
+from backend.ltx_runner_client import (
+    LtxJobFailed,
+    ack_result,
+    callback_url_for,
+    cancel_job,
+    create_job,
+    download_result,
+    get_job,
+    wait_for_job,
+)
+from backend.downloads import IntegrityError, sha256_file
+from backend.saas_models import Script
+from backend.telemetry import traced
+from backend.video_concat import concat_videos
+
+MAX_SEGMENTS = int(os.getenv("LTX_MAX_SEGMENTS", "10"))
+SEGMENT_DIR = os.getenv("LTX_SEGMENT_DIR") or os.path.join(tempfile.gettempdir(), "ltx_segments")
 
 
 def _merge_script_meta(script: Script, patch: dict) -> None:
-    base = dict(script.extra_metadata or {})
-    cur = dict(base.get("ltx_video") or {})
-    cur.update(patch)
-    base["ltx_video"] = cur
-    script.extra_metadata = base
+    """Met à jour la ligne `generation_jobs` du script (UPDATE ciblé, commité)."""
+    if not generation_jobs.update(script.id, patch):
+        generation_jobs.ensure(script)
+        generation_jobs.update(script.id, patch)
 
 
 def _static_video_dir() -> str:
@@ -33,109 +70,523 @@ def _safe_filename(script_id: int, token: str) -> str:
     return f"ltx_{script_id}_{t}.mp4"
 
 
-def run_ltx_pipeline_for_script(
-    script_id: int,
-    pipeline: Optional[str] = None,
-    enhance_prompt: bool = True,
-) -> None:
-    """
-    Worker entry (Celery ou thread) : charge le script, envoie au runner LTX, enregistre le MP4.
-    """
-    script = Script.query.get(script_id)
-    if not script:
-        return
-
-    spec = spec_for_platform(script.platform)
-    effective_pipeline = pipeline or spec.pipeline
-    spec_dict = spec.to_dict()
+def _script_language(script: Script) -> str:
     extra = dict(script.extra_metadata or {})
     # language can come from settings metadata or user profile payload
-    lang = (
+    return (
         extra.get("ai_language")
         or (extra.get("profile") or {}).get("language")
         or (extra.get("custom_options") or {}).get("language")
         or "fr"
     )
 
-    try:
+
+def _plan_tier(script: Script) -> str:
+    sub = script.user.subscription if script.user else None
+    return sub.plan_type if sub else "free"
+
+
+# Étapes persistées dans ltx_video["stage"]. Chaque étape est idempotente : une reprise
+# (retry Celery, webhook rejoué, re-soumission par l'utilisateur) repart de la dernière
+# étape atteinte, sans repayer un rendu GPU déjà produit.
+STAGES = ("queued", "submitted", "rendered", "downloaded", "stored")
+
+# Erreurs passagères : l'étape en cours peut être rejouée telle quelle
+_TRANSIENT = (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, IntegrityError)
+
+
+class TransientLtxError(RuntimeError):
+    """Échec passager d'une étape (réseau, runner indisponible) : à rejouer plus tard."""
+
+
+def _stage_at_least(ltx: dict, stage: str) -> bool:
+    current = ltx.get("stage") if ltx.get("stage") in STAGES else "queued"
+    return STAGES.index(current) >= STAGES.index(stage)
+
+
+def _ltx_meta(script: Script) -> dict:
+    return generation_jobs.view(script.id) or {}
+
+
+def _set_stage(script: Script, stage: str, patch: Optional[dict] = None) -> dict:
+    """Enregistre l'étape atteinte (point de reprise) ; retourne les métadonnées à jour."""
+    _merge_script_meta(script, {"stage": stage, f"{stage}_at": datetime.utcnow().isoformat() + "Z", **(patch or {})})
+    return _ltx_meta(script)
+
+
+def _record_usage(script: Script, extra: dict) -> None:
+    """Vidéo enregistrée : journalise l'usage et confirme la réservation de quota."""
+    token = _ltx_meta(script).get("quota_reservation")
+    quotas.record(script.user_id, "ltx_video_generated", extra, token)
+    if token:
+        _merge_script_meta(script, {"quota_reservation": None})
+    else:
+        db.session.commit()  # événement ajouté à la session si le stream est indisponible
+
+
+def _mark_failed(script_id: int, error: Exception) -> None:
+    """Échec définitif : l'étape et le runner_job_id sont conservés pour une reprise manuelle."""
+    db.session.rollback()
+    script = Script.query.get(script_id)
+    if script:
+        _release_segments(script)
+        # Une vidéo échouée ne consomme pas de quota (la relance en réserve un nouveau)
+        quotas.release(script.user_id, "ltx_video_generated", _ltx_meta(script).get("quota_reservation"))
         _merge_script_meta(
             script,
             {
-                "status": "processing",
-                "started_at": datetime.utcnow().isoformat() + "Z",
-                "video_format": spec_dict,
-                "platform": script.platform,
+                "status": "failed",
+                "error": str(error),
+                "failed_at": datetime.utcnow().isoformat() + "Z",
+                "quota_reservation": None,
             },
         )
-        db.session.commit()
 
-        prompt = script_to_ltx_prompt(
-            script.content,
-            title=script.title,
-            platform=script.platform,
-            trend_style=True,
-            video_spec=spec_dict,
-            language=lang,
+
+def _handle_error(script_id: int, error: Exception, retry_transient: bool) -> None:
+    """Erreur passagère + retry demandé : lève TransientLtxError (état intact) ; sinon marque l'échec."""
+    if retry_transient and isinstance(error, _TRANSIENT + (TransientLtxError,)):
+        db.session.rollback()
+        script = Script.query.get(script_id)
+        if script:
+            ltx = _ltx_meta(script)
+            _merge_script_meta(script, {"last_error": str(error), "retries": int(ltx.get("retries") or 0) + 1})
+        raise TransientLtxError(str(error)) from error
+    _mark_failed(script_id, error)
+
+
+def _rewind(script: Script, reason: str) -> None:
+    """Le runner n'a plus le job ni sa sortie : la prochaine reprise re-soumet."""
+    _merge_script_meta(script, {"stage": "queued", "runner_job_id": None, "rewound": reason})
+
+
+# --- Étapes -------------------------------------------------------------------------
+
+
+def _step_submit(script: Script, pipeline: Optional[str], enhance_prompt: bool, use_callback: bool) -> Optional[dict]:
+    """
+    queued -> submitted. Retourne le job runner ({job_id, status…}), ou None si un rendu
+    identique déjà enregistré a été relié au script (étape `stored` atteinte directement).
+    """
+    spec = spec_for_platform(script.platform)
+    effective_pipeline = pipeline or spec.pipeline
+    spec_dict = spec.to_dict()
+    lang = _script_language(script)
+
+    _merge_script_meta(
+        script,
+        {
+            "status": "processing",
+            "started_at": datetime.utcnow().isoformat() + "Z",
+            "video_format": spec_dict,
+            "platform": script.platform,
+        },
+    )
+
+    prompt = script_to_ltx_prompt(
+        script.content,
+        title=script.title,
+        platform=script.platform,
+        trend_style=True,
+        video_spec=spec_dict,
+        language=lang,
+    )
+    seed = ltx_dedup.default_seed()
+    fp = ltx_dedup.fingerprint(prompt, spec_dict, effective_pipeline, seed, enhance_prompt)
+
+    ltx = _ltx_meta(script)
+    if ltx.get("runner_job_id") and ltx.get("fingerprint") == fp and _stage_at_least(ltx, "submitted"):
+        # Reprise : job déjà soumis pour ce même prompt / spec, on ne le repaie pas
+        return {"job_id": ltx["runner_job_id"], "status": "resumed"}
+
+    existing = ltx_dedup.find(fp, _static_video_dir())
+    if existing:
+        _set_stage(
+            script,
+            "stored",
+            {
+                "status": "completed",
+                "filename": existing["filename"],
+                "sha256": existing.get("sha256"),
+                "video_url": f"/api/video/ltx/result/{script.id}",
+                "fingerprint": fp,
+                "deduplicated_from": existing.get("script_id"),
+                "prompt_preview": prompt[:400],
+                "pipeline_used": effective_pipeline,
+                "language_used": lang,
+                "completed_at": datetime.utcnow().isoformat() + "Z",
+            },
+        )
+        _record_usage(
+            script,
+            {"script_id": script.id, "pipeline": effective_pipeline, "platform": script.platform, "deduplicated": True},
+        )
+        return None
+
+    runner_job = create_job(
+        prompt,
+        pipeline=effective_pipeline,
+        enhance_prompt=enhance_prompt,
+        platform=script.platform,
+        width=spec.width,
+        height=spec.height,
+        num_frames=spec.num_frames,
+        frame_rate=spec.frame_rate,
+        callback_url=callback_url_for(script.id) if use_callback else None,
+        tier=_plan_tier(script),
+        seed=seed,
+    )
+    _set_stage(
+        script,
+        "submitted",
+        {
+            "runner_job_id": str(runner_job["job_id"]),
+            "fingerprint": fp,
+            "seed": seed,
+            "prompt_preview": prompt[:400],
+            "pipeline_used": effective_pipeline,
+            "language_used": lang,
+        },
+    )
+    return runner_job
+
+
+def _runner_job(script: Script, job_id: str, wait: bool) -> dict:
+    """Statut du job runner ; job perdu ou rendu en échec -> retour à `queued` (re-soumission)."""
+    try:
+        return wait_for_job(job_id) if wait else get_job(job_id)
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+            _rewind(script, "runner job unknown")
+            raise TransientLtxError(f"LTX job {job_id} inconnu du runner") from e
+        raise
+    except LtxJobFailed:
+        _rewind(script, "runner job failed")
+        raise
+
+
+def _step_rendered(script: Script, job_id: str, runner_job: Optional[dict], wait: bool) -> None:
+    """submitted -> rendered : le runner a terminé ; mémorise taille + sha256 annoncés."""
+    if _stage_at_least(_ltx_meta(script), "rendered"):
+        return
+    if not (runner_job and runner_job.get("status") == "completed" and runner_job.get("sha256")):
+        runner_job = _runner_job(script, job_id, wait)
+    if runner_job.get("status") == "failed":
+        _rewind(script, "runner job failed")
+        raise RuntimeError(runner_job.get("error") or "LTX job failed")
+    if runner_job.get("status") != "completed":
+        raise RuntimeError(f"LTX job {job_id} not finished (status={runner_job.get('status')})")
+    _set_stage(script, "rendered", {"runner_sha256": runner_job.get("sha256"), "runner_size_bytes": runner_job.get("size_bytes")})
+
+
+def _step_download(script: Script, job_id: str) -> None:
+    """
+    rendered -> downloaded. Nom de fichier dérivé du job : une reprise complète le même
+    `.part` (Range) au lieu de tout re-télécharger.
+    """
+    ltx = _ltx_meta(script)
+    fname = _safe_filename(script.id, job_id)
+    out_path = os.path.join(_static_video_dir(), fname)
+    if _stage_at_least(ltx, "downloaded") and os.path.isfile(os.path.join(_static_video_dir(), ltx.get("filename") or "")):
+        return
+    try:
+        # Écriture en flux : la mémoire du worker reste constante quelle que soit la taille du MP4
+        sha256 = download_result(
+            job_id,
+            out_path,
+            expected_sha256=ltx.get("runner_sha256"),
+            expected_size=ltx.get("runner_size_bytes"),
         )
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code in (404, 410):
+            _rewind(script, "runner output removed")
+            raise TransientLtxError(f"Sortie du job {job_id} supprimée par le runner") from e
+        raise
+    _set_stage(script, "downloaded", {"filename": fname, "sha256": sha256})
+
+
+@traced("ltx_store", provider="ltx")
+def _step_store(script: Script, job_id: str) -> None:
+    """downloaded -> stored : vidéo publiée, runner acquitté, usage compté (une seule fois)."""
+    ltx = _ltx_meta(script)
+    if _stage_at_least(ltx, "stored"):
+        return
+    ltx = _set_stage(
+        script,
+        "stored",
+        {
+            "status": "completed",
+            "video_url": f"/api/video/ltx/result/{script.id}",
+            "error": None,
+            "completed_at": datetime.utcnow().isoformat() + "Z",
+        },
+    )
+    # Copie locale enregistrée : libère le disque du runner
+    ack_result(job_id)
+    if ltx.get("fingerprint"):
+        ltx_dedup.remember(ltx["fingerprint"], ltx["filename"], ltx["sha256"], script.id)
+    _record_usage(
+        script,
+        {"script_id": script.id, "pipeline": ltx.get("pipeline_used"), "platform": script.platform},
+    )
 
-        job_id = submit_job(
+
+def _complete(script: Script, job_id: str, runner_job: Optional[dict], wait: bool) -> None:
+    _step_rendered(script, job_id, runner_job, wait)
+    _step_download(script, job_id)
+    _step_store(script, job_id)
+
+
+# --- Points d'entrée ----------------------------------------------------------------
+
+
+def submit_ltx_for_script(
+    script_id: int,
+    pipeline: Optional[str] = None,
+    enhance_prompt: bool = True,
+    use_callback: bool = True,
+    retry_transient: bool = False,
+) -> Optional[str]:
+    """
+    Phase 1 : construit le prompt et soumet le job au runner ; retourne le runner_job_id.
+    Avec `use_callback`, le runner notifiera la fin via webhook (voir `callback_url_for`).
+    Retourne None si rien n'est à attendre : échec, ou rendu identique déjà disponible
+    (script relié au MP4 existant, ou finalisé aussitôt si le runner l'a encore).
+    `retry_transient` : lève TransientLtxError sur erreur passagère au lieu de marquer l'échec.
+    """
+    script = Script.query.get(script_id)
+    if not script:
+        return None
+    try:
+        runner_job = _step_submit(script, pipeline, enhance_prompt, use_callback)
+        if runner_job is None:
+            return None
+        job_id = str(runner_job["job_id"])
+        if runner_job.get("status") == "resumed" and not _stage_at_least(_ltx_meta(script), "rendered"):
+            # Reprise : le webhook a pu partir pendant l'échec précédent
+            runner_job = _runner_job(script, job_id, wait=False)
+        if _stage_at_least(_ltx_meta(script), "rendered") or runner_job.get("status") in ("completed", "failed"):
+            # Rendu déjà disponible (reprise ou dédupliqué par le runner) : pas de webhook à attendre
+            _complete(script, job_id, runner_job, wait=False)
+            return None
+        return job_id
+    except Exception as e:
+        _handle_error(script_id, e, retry_transient)
+        return None
+
+
+def finalize_ltx_for_script(
+    script_id: int,
+    job_id: str,
+    runner_job: Optional[dict] = None,
+    retry_transient: bool = False,
+) -> None:
+    """
+    Phase 2 : le job runner est terminé ; télécharge et enregistre le MP4.
+    Idempotent : ignore un job qui n'est plus celui du script ou déjà enregistré, et reprend
+    à l'étape atteinte (ex. re-téléchargement sans nouveau rendu).
+    """
+    script = Script.query.get(script_id)
+    if not script:
+        return
+    ltx = _ltx_meta(script)
+    if ltx.get("runner_job_id") != job_id or ltx.get("status") != "processing":
+        return
+    try:
+        _complete(script, job_id, runner_job, wait=False)
+    except Exception as e:
+        _handle_error(script_id, e, retry_transient)
+
+
+def run_ltx_pipeline_for_script(
+    script_id: int,
+    pipeline: Optional[str] = None,
+    enhance_prompt: bool = True,
+    retry_transient: bool = False,
+) -> None:
+    """
+    Worker entry (Celery ou thread) en une passe : soumet (ou reprend le job déjà soumis),
+    attend (long-poll), télécharge puis enregistre le MP4.
+    """
+    script = Script.query.get(script_id)
+    if not script:
+        return
+    try:
+        runner_job = _step_submit(script, pipeline, enhance_prompt, use_callback=False)
+        if runner_job is None:
+            return
+        _complete(script, str(runner_job["job_id"]), runner_job, wait=True)
+    except Exception as e:
+        _handle_error(script_id, e, retry_transient)
+
+
+def _segment_dir(script_id: int) -> str:
+    """Clips téléchargés, conservés entre deux reprises (téléchargement `.part` repris en Range)."""
+    d = os.path.join(SEGMENT_DIR, str(script_id))
+    os.makedirs(d, exist_ok=True)
+    return d
+
+
+def _forget_segment_jobs(segments: list) -> list:
+    """Segments sans leurs jobs runner (acquittés ou annulés) : une relance re-soumet."""
+    return [{k: v for k, v in seg.items() if k not in ("runner_job_id", "fingerprint", "sha256")} for seg in segments]
+
+
+def _release_segments(script: Script) -> None:
+    """Échec définitif d'une vidéo segmentée : les jobs frères ne sont plus attendus par le runner."""
+    segments = _ltx_meta(script).get("segments") or []
+    job_ids = [seg["runner_job_id"] for seg in segments if seg.get("runner_job_id")]
+    for job_id in job_ids:
+        cancel_job(job_id)
+    if job_ids:
+        _merge_script_meta(script, {"segments": _forget_segment_jobs(segments)})
+    shutil.rmtree(os.path.join(SEGMENT_DIR, str(script.id)), ignore_errors=True)
+
+
+def _submit_segments(script: Script, prompts: list, pipeline: str, enhance_prompt: bool, seed: Optional[int]) -> list:
+    """
+    Un job runner par scène. Chaque job est enregistré dès sa création : une reprise
+    réutilise les jobs de même empreinte au lieu de payer à nouveau leur rendu.
+    """
+    spec = spec_for_platform(script.platform)
+    spec_dict = spec.to_dict()
+    ltx = _ltx_meta(script)
+    previous = (ltx.get("segments") or []) if ltx.get("mode") == "segmented" else []
+    tier = _plan_tier(script)
+    segments = []
+    for i, prompt in enumerate(prompts):
+        fp = ltx_dedup.fingerprint(prompt, spec_dict, pipeline, seed, enhance_prompt)
+        prev = previous[i] if i < len(previous) else {}
+        if prev.get("runner_job_id") and prev.get("fingerprint") == fp:
+            segments.append(prev)
+            continue
+        if prev.get("runner_job_id"):
+            cancel_job(prev["runner_job_id"])  # scène modifiée depuis la soumission
+        runner_job = create_job(
             prompt,
-            pipeline=effective_pipeline,
+            pipeline=pipeline,
             enhance_prompt=enhance_prompt,
             platform=script.platform,
             width=spec.width,
             height=spec.height,
             num_frames=spec.num_frames,
             frame_rate=spec.frame_rate,
+            tier=tier,
+            seed=seed,
+        )
+        segments.append(
+            {"index": i, "runner_job_id": str(runner_job["job_id"]), "fingerprint": fp, "prompt_preview": prompt[:200]}
         )
-        _merge_script_meta(script, {"runner_job_id": job_id})
-        db.session.commit()
+        _merge_script_meta(script, {"segments": segments + previous[len(segments):]})
+    for stale in previous[len(prompts):]:
+        if stale.get("runner_job_id"):
+            cancel_job(stale["runner_job_id"])
+    return segments
 
-        wait_for_job(job_id)
-        script = Script.query.get(script_id)
-        if not script:
-            return
-        blob = download_result(job_id)
 
-        token = os.urandom(8).hex()
-        fname = _safe_filename(script.id, token)
-        out_dir = _static_video_dir()
-        out_path = os.path.join(out_dir, fname)
-        with open(out_path, "wb") as f:
-            f.write(blob)
+def _download_segments(script: Script, segments: list) -> list:
+    """Attend chaque job puis télécharge son clip ; les clips déjà vérifiés ne sont pas repris."""
+    work_dir = _segment_dir(script.id)
+    clips = []
+    for seg in segments:
+        clip = os.path.join(work_dir, f"segment_{seg['index']:03d}.mp4")
+        if not (seg.get("sha256") and os.path.isfile(clip)):
+            job_id = seg["runner_job_id"]
+            try:
+                runner_job = wait_for_job(job_id)
+                seg["sha256"] = download_result(
+                    job_id, clip, expected_sha256=runner_job.get("sha256"), expected_size=runner_job.get("size_bytes")
+                )
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code in (404, 410):
+                    # Job ou sortie perdus par le runner : ce segment seul sera re-soumis
+                    seg.pop("runner_job_id", None)
+                    _merge_script_meta(script, {"segments": segments})
+                    raise TransientLtxError(f"Segment {seg['index']} ({job_id}) perdu par le runner") from e
+                raise
+        clips.append(clip)
+        _merge_script_meta(script, {"segments": segments, "segments_done": len(clips)})
+    return clips
+
 
-        rel = f"/api/video/ltx/result/{script.id}"
+def run_segmented_ltx_for_script(
+    script_id: int,
+    pipeline: Optional[str] = None,
+    enhance_prompt: bool = True,
+    max_segments: Optional[int] = None,
+    retry_transient: bool = False,
+) -> None:
+    """
+    Vidéo longue : un job runner par scène, soumis d'un coup (le runner les répartit sur
+    ses slots), puis clips téléchargés et assemblés (copie des flux si leurs specs sont
+    identiques). Étapes persistées comme en mode simple : une reprise réutilise les jobs
+    déjà soumis et les clips déjà téléchargés ; un échec définitif annule les jobs frères.
+    """
+    script = Script.query.get(script_id)
+    if not script:
+        return
+    if _stage_at_least(_ltx_meta(script), "stored"):
+        return
+
+    spec = spec_for_platform(script.platform)
+    effective_pipeline = pipeline or spec.pipeline
+    spec_dict = spec.to_dict()
+    lang = _script_language(script)
+    try:
+        prompts = scene_prompts(
+            script.content,
+            title=script.title,
+            platform=script.platform,
+            video_spec=spec_dict,
+            language=lang,
+            max_scenes=max_segments or MAX_SEGMENTS,
+        )
+        seed = ltx_dedup.default_seed()
         _merge_script_meta(
             script,
+            {
+                "status": "processing",
+                "mode": "segmented",
+                "started_at": datetime.utcnow().isoformat() + "Z",
+                "video_format": spec_dict,
+                "platform": script.platform,
+                "pipeline_used": effective_pipeline,
+                "language_used": lang,
+                "seed": seed,
+            },
+        )
+        segments = _submit_segments(script, prompts, effective_pipeline, enhance_prompt, seed)
+        _set_stage(script, "submitted", {"segments": segments, "segments_done": 0})
+
+        clips = _download_segments(script, segments)
+        _set_stage(script, "downloaded")
+
+        fname = _safe_filename(script.id, os.urandom(8).hex())
+        out_path = os.path.join(_static_video_dir(), fname)
+        stream_copy = concat_videos(clips, out_path)
+        _set_stage(
+            script,
+            "stored",
             {
                 "status": "completed",
                 "filename": fname,
-                "video_url": rel,
-                "prompt_preview": prompt[:400],
+                "sha256": sha256_file(out_path),
+                "video_url": f"/api/video/ltx/result/{script.id}",
+                "stitched_without_reencode": stream_copy,
+                "duration_sec": round(len(clips) * spec.num_frames / spec.frame_rate, 1),
+                "error": None,
                 "completed_at": datetime.utcnow().isoformat() + "Z",
-                "pipeline_used": effective_pipeline,
-                "language_used": lang,
+                "segments": _forget_segment_jobs(segments),
             },
         )
-        script.updated_at = datetime.utcnow()
-        db.session.commit()
+        # Vidéo enregistrée : clips locaux et sorties du runner libérés
+        for seg in segments:
+            ack_result(seg["runner_job_id"])
+        shutil.rmtree(_segment_dir(script.id), ignore_errors=True)
 
-        UsageMetric.log_action(
-            script.user_id,
-            "ltx_video_generated",
-            {"script_id": script.id, "pipeline": effective_pipeline, "platform": script.platform},
+        _record_usage(
+            script,
+            {"script_id": script.id, "pipeline": effective_pipeline, "platform": script.platform, "segments": len(clips)},
         )
     except Exception as e:
-        db.session.rollback()
-        script = Script.query.get(script_id)
-        if script:
-            _merge_script_meta(
-                script,
-                {
-                    "status": "failed",
-                    "error": str(e),
-                    "failed_at": datetime.utcnow().isoformat() + "Z",
-                },
-            )
-            script.updated_at = datetime.utcnow()
-            db.session.commit()
+        _handle_error(script_id, e, retry_transient)
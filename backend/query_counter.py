@@ -0,0 +1,95 @@
+"""
+Comptage des requêtes SQL (détection des N+1).
+
+- `count_queries()` : contexte qui compte les requêtes exécutées dans le thread courant.
+- `assert_max_queries(n)` : idem, lève AssertionError au-delà de `n` (harnais de
+  non-régression : appeler un endpoint avec le client de test Flask dans ce contexte,
+  voir benchmarks/query_budget.py).
+- DB_QUERY_COUNT=1 : chaque réponse porte l'en-tête `X-DB-Queries` (et un log si la
+  requête dépasse DB_QUERY_WARN).
+
+Env :
+  DB_QUERY_COUNT   défaut 0
+  DB_QUERY_WARN    défaut 20
+"""
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import event
+
+from backend.database import db
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class QueryCount:
+    def __init__(self):
+        self.count = 0
+        self.statements: List[str] = []
+
+    def __repr__(self):
+        return f"<QueryCount {self.count}>"
+
+
+def _stack() -> list:
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+
+def _on_execute(conn, cursor, statement, parameters, context, executemany):
+    for counter in _stack():
+        counter.count += 1
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCount()
+    _stack().append(counter)
+    try:
+        yield counter
+    finally:
+        _stack().remove(counter)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        detail = '\n'.join(f"  {i + 1}. {s.splitlines()[0][:160]}" for i, s in enumerate(counter.statements))
+        raise AssertionError(f"{counter.count} requêtes SQL (max {limit}):\n{detail}")
+
+
+def install(app) -> None:
+    """Branche le compteur sur le moteur de l'application (et l'en-tête de debug si activé)."""
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _on_execute)
+
+    if os.getenv('DB_QUERY_COUNT', '0') != '1':
+        return
+    from flask import g, request
+
+    warn_at = int(os.getenv('DB_QUERY_WARN', '20'))
+
+    @app.before_request
+    def _start_count():
+        g._query_count_cm = count_queries()
+        g._query_count = g._query_count_cm.__enter__()
+
+    @app.after_request
+    def _report_count(response):
+        counter = getattr(g, '_query_count', None)
+        if counter is not None:
+            g._query_count_cm.__exit__(None, None, None)
+            response.headers['X-DB-Queries'] = str(counter.count)
+            if counter.count > warn_at:
+                logger.warning("%s %s: %d requêtes SQL", request.method, request.path, counter.count,
+                               extra={'queries': counter.count})
+        return response
@@ -0,0 +1,248 @@
+"""
+Quotas mensuels (scripts, vidéos IA) : compteurs Redis atomiques au lieu d'un
+`COUNT(*)` sur `usage_metrics` à chaque requête.
+
+- `quota:{user}:{action}:{AAAAMM}`      consommations confirmées (INCR), initialisé une fois
+                                         depuis `usage_metrics` si absent.
+- `quota_res:{user}:{action}:{AAAAMM}`  réservations en cours (hash jeton -> horodatage).
+
+Une génération réserve une unité avant de démarrer (`reserve`, vérification + réservation
+en un script Lua, sans course entre deux requêtes), la confirme à la fin (`commit`) ou la
+libère en cas d'échec (`release`) : un échec ne consomme pas de quota. Les réservations
+abandonnées (worker tué) expirent après QUOTA_RESERVATION_TTL_SEC.
+
+`reconcile` (tâche Celery beat) réaligne les compteurs sur `usage_metrics` (après
+insertion des événements encore dans le stream, voir `usage_events`).
+Redis indisponible : repli sur le comptage SQL (comportement historique).
+
+Env :
+  QUOTA_RESERVATION_TTL_SEC  défaut 21600 (6 h)
+  QUOTA_RECONCILE_SEC        défaut 3600 (période de la tâche de réconciliation)
+"""
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+from backend import usage_events
+from backend.database import db
+from backend.redis_client import get_redis_client
+from backend.saas_models import UsageMetric
+
+logger = logging.getLogger(__name__)
+
+PLAN_LIMITS = {
+    'free': {'script_generated': 5, 'ltx_video_generated': 1},
+    'pro': {'script_generated': 100, 'ltx_video_generated': 40},
+    'enterprise': {'script_generated': float('inf'), 'ltx_video_generated': float('inf')},
+}
+
+RESERVATION_TTL = int(os.getenv('QUOTA_RESERVATION_TTL_SEC', str(6 * 3600)))
+_KEY_TTL = 40 * 24 * 3600  # couvre le mois courant + marge
+
+# KEYS: compteur, hash des réservations ; ARGV: limite (-1 = illimité), jeton, maintenant, ttl réservation, ttl clés
+_RESERVE = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+local now = tonumber(ARGV[3])
+local entries = redis.call('HGETALL', KEYS[2])
+for i = 1, #entries, 2 do
+  if tonumber(entries[i + 1]) < now - tonumber(ARGV[4]) then
+    redis.call('HDEL', KEYS[2], entries[i])
+  end
+end
+local pending = redis.call('HLEN', KEYS[2])
+local limit = tonumber(ARGV[1])
+if limit >= 0 and used + pending >= limit then
+  return {0, used, pending}
+end
+redis.call('HSET', KEYS[2], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+return {1, used, pending + 1}
+"""
+
+# Confirme : retire le jeton (s'il existe encore) puis compte une consommation
+_COMMIT = """
+if ARGV[1] ~= '' then
+  redis.call('HDEL', KEYS[2], ARGV[1])
+end
+local used = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return used
+"""
+
+# Réconciliation : le compteur ne descend jamais (les INCR de _COMMIT arrivés après le
+# GROUP BY sont conservés), il monte au compte SQL s'il est en retard
+_RAISE_TO = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '-1')
+local target = tonumber(ARGV[1])
+if target > current then
+  redis.call('SET', KEYS[1], target)
+  current = target
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return current
+"""
+
+
+def limit_for(plan_type: Optional[str], action_type: str) -> float:
+    return PLAN_LIMITS.get(plan_type or 'free', {}).get(action_type, 0)
+
+
+def _month(now: Optional[datetime] = None) -> str:
+    now = now or datetime.utcnow()
+    return f"{now.year:04d}{now.month:02d}"
+
+
+def _month_start(now: Optional[datetime] = None) -> datetime:
+    now = now or datetime.utcnow()
+    return datetime(now.year, now.month, 1)
+
+
+def _keys(user_id: int, action_type: str, month: str) -> Tuple[str, str]:
+    return f"quota:{user_id}:{action_type}:{month}", f"quota_res:{user_id}:{action_type}:{month}"
+
+
+def _db_count(user_id: int, action_type: str) -> int:
+    return UsageMetric.query.filter(
+        UsageMetric.user_id == user_id,
+        UsageMetric.action_type == action_type,
+        UsageMetric.timestamp >= _month_start(),
+    ).count()
+
+
+def _seed(client, key: str, user_id: int, action_type: str) -> None:
+    """Initialise le compteur depuis usage_metrics (une fois par mois et par action)."""
+    if client.exists(key):
+        return
+    client.set(key, _db_count(user_id, action_type), ex=_KEY_TTL, nx=True)
+
+
+def usage(user_id: int, action_type: str) -> int:
+    """Consommations confirmées ce mois-ci."""
+    client = get_redis_client()
+    if client is not None:
+        key, _ = _keys(user_id, action_type, _month())
+        try:
+            _seed(client, key, user_id, action_type)
+            return int(client.get(key) or 0)
+        except Exception as e:
+            logger.warning("Quota Redis indisponible, comptage SQL: %s", e)
+    return _db_count(user_id, action_type)
+
+
+def check(user_id: int, action_type: str, plan_type: Optional[str]) -> Tuple[bool, str]:
+    """Vérification sans réservation (consommations confirmées + réservations en cours)."""
+    limit = limit_for(plan_type, action_type)
+    client = get_redis_client()
+    count = None
+    if client is not None:
+        key, res_key = _keys(user_id, action_type, _month())
+        try:
+            _seed(client, key, user_id, action_type)
+            count = int(client.get(key) or 0) + int(client.hlen(res_key))
+        except Exception as e:
+            logger.warning("Quota Redis indisponible, comptage SQL: %s", e)
+    if count is None:
+        count = _db_count(user_id, action_type)
+    if count >= limit:
+        return False, f"Monthly limit reached ({count}/{limit})"
+    return True, f"Usage: {count}/{limit}"
+
+
+def reserve(user_id: int, action_type: str, plan_type: Optional[str]) -> Tuple[bool, str, Optional[str]]:
+    """
+    Réserve une unité de quota : (autorisé, message, jeton). Le jeton est à passer à
+    `commit` ou `release` ; None si Redis est indisponible (vérification SQL seule).
+    """
+    limit = limit_for(plan_type, action_type)
+    client = get_redis_client()
+    if client is not None:
+        month = _month()
+        key, res_key = _keys(user_id, action_type, month)
+        token = f"{month}:{uuid.uuid4().hex}"
+        try:
+            _seed(client, key, user_id, action_type)
+            ok, used, pending = client.eval(
+                _RESERVE, 2, key, res_key,
+                -1 if limit == float('inf') else int(limit), token, int(time.time()), RESERVATION_TTL, _KEY_TTL,
+            )
+            count = int(used) + int(pending)
+            if not ok:
+                return False, f"Monthly limit reached ({count}/{limit})", None
+            return True, f"Usage: {count}/{limit}", token
+        except Exception as e:
+            logger.warning("Quota Redis indisponible, comptage SQL: %s", e)
+    count = _db_count(user_id, action_type)
+    if count >= limit:
+        return False, f"Monthly limit reached ({count}/{limit})", None
+    return True, f"Usage: {count}/{limit}", None
+
+
+def release(user_id: int, action_type: str, token: Optional[str]) -> None:
+    """Génération échouée ou abandonnée : la réservation ne consomme pas de quota."""
+    if not token:
+        return
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        client.hdel(_keys(user_id, action_type, token.split(':', 1)[0])[1], token)
+    except Exception as e:
+        logger.warning("Libération de quota impossible: %s", e)
+
+
+def commit(user_id: int, action_type: str, token: Optional[str] = None) -> None:
+    """Compte une consommation (mois courant) et retire la réservation correspondante."""
+    client = get_redis_client()
+    if client is None:
+        return
+    key, _ = _keys(user_id, action_type, _month())
+    res_key = _keys(user_id, action_type, token.split(':', 1)[0])[1] if token else key
+    try:
+        _seed(client, key, user_id, action_type)
+        client.eval(_COMMIT, 2, key, res_key, token or '', _KEY_TTL)
+    except Exception as e:
+        logger.warning("Compteur de quota non mis à jour (réconciliation à venir): %s", e)
+
+
+def record(user_id: int, action_type: str, extra_metadata: Optional[dict] = None, token: Optional[str] = None) -> None:
+    """
+    Journalise l'action (stream d'usage, sans COMMIT) puis confirme la consommation du quota.
+    Le jeton de réservation sert d'identifiant de dédoublonnage de l'événement.
+    """
+    usage_events.emit(user_id, action_type, extra_metadata, event_id=f"{action_type}:{token}" if token else None)
+    commit(user_id, action_type, token)
+
+
+def _db_counts() -> list:
+    """(user_id, action_type, consommations) du mois courant, un GROUP BY."""
+    return (
+        db.session.query(UsageMetric.user_id, UsageMetric.action_type, db.func.count(UsageMetric.id))
+        .filter(UsageMetric.timestamp >= _month_start())
+        .group_by(UsageMetric.user_id, UsageMetric.action_type)
+        .all()
+    )
+
+
+def reconcile() -> dict:
+    """
+    Réaligne les compteurs du mois sur usage_metrics (un GROUP BY). Un écart transitoire
+    (action journalisée mais compteur pas encore incrémenté) est corrigé au passage suivant.
+    Le compteur n'est jamais abaissé : une consommation confirmée entre le GROUP BY et
+    l'écriture Redis reste comptée (max(compteur, compte SQL), atomique côté Redis).
+    """
+    client = get_redis_client()
+    if client is None:
+        return {'updated': 0}
+    usage_events.flush()  # compter aussi les événements encore dans le stream
+    month = _month()
+    updated = 0
+    pipe = client.pipeline()
+    for user_id, action_type, count in _db_counts():
+        key, _ = _keys(user_id, action_type, month)
+        pipe.eval(_RAISE_TO, 1, key, int(count), _KEY_TTL)
+        updated += 1
+    pipe.execute()
+    return {'updated': updated}
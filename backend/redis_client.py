@@ -2,11 +2,26 @@
 import os
 import redis
 
+# Un client (et son pool de connexions) par processus, partagé entre threads / greenlets
+_clients = {}
+
 def get_redis_client():
     """Returns a configured Redis client."""
     redis_url = os.getenv('REDIS_URL', 'redis://redis:6379/0')
+    key = (os.getpid(), redis_url)
+    if key in _clients:
+        return _clients[key]
     try:
-        return redis.from_url(redis_url, decode_responses=True)
+        # Pool bloquant : au-delà de REDIS_MAX_CONNECTIONS, attente d'une connexion libre plutôt qu'une erreur
+        pool = redis.BlockingConnectionPool.from_url(
+            redis_url,
+            decode_responses=True,
+            max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', '100')),
+            timeout=20,
+        )
+        client = redis.Redis(connection_pool=pool)
     except Exception as e:
         print(f"⚠️ Redis connection failed: {e}")
         return None
+    _clients[key] = client
+    return client
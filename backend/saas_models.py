@@ -65,6 +65,11 @@ class Script(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Liste par utilisateur, plus récents d'abord (pagination keyset, voir script_listing)
+    __table_args__ = (db.Index('ix_scripts_user_created_id', 'user_id', 'created_at', 'id'),)
+
+    generation_jobs = db.relationship('GenerationJob', backref='script', lazy='dynamic', cascade='all, delete-orphan', passive_deletes=True)
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -76,6 +81,54 @@ class Script(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
 
+class GenerationJob(db.Model):
+    """Suivi d'une génération longue (vidéo IA LTX) : une ligne par script et par type."""
+    __tablename__ = 'generation_jobs'
+    __table_args__ = (
+        db.Index('ix_generation_jobs_user_status', 'user_id', 'status'),
+        db.UniqueConstraint('script_id', 'kind', name='uq_generation_jobs_script_kind'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    script_id = db.Column(db.Integer, db.ForeignKey('scripts.id', ondelete='CASCADE'), nullable=False)
+    kind = db.Column(db.String(30), nullable=False, default='ltx_video')
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, processing, completed, failed, skipped
+    stage = db.Column(db.String(20), default='queued')  # queued, submitted, rendered, downloaded, stored
+    mode = db.Column(db.String(20))
+    runner_job_id = db.Column(db.String(64), index=True)
+    fingerprint = db.Column(db.String(64))
+    seed = db.Column(db.Integer)
+    pipeline_used = db.Column(db.String(20))
+    platform = db.Column(db.String(20))
+    filename = db.Column(db.String(255))
+    sha256 = db.Column(db.String(64))
+    video_url = db.Column(db.String(255))
+    error = db.Column(db.Text)
+    retries = db.Column(db.Integer, default=0)
+    details = db.Column(db.JSON)  # segments, format vidéo, aperçu du prompt, horodatages d'étapes…
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        data = dict(self.details or {})
+        data.update({
+            'status': self.status,
+            'stage': self.stage,
+            'mode': self.mode,
+            'runner_job_id': self.runner_job_id,
+            'fingerprint': self.fingerprint,
+            'seed': self.seed,
+            'pipeline_used': self.pipeline_used,
+            'platform': self.platform,
+            'filename': self.filename,
+            'sha256': self.sha256,
+            'video_url': self.video_url,
+            'error': self.error,
+            'retries': self.retries,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        })
+        return {k: v for k, v in data.items() if v is not None}
+
 class SocialAccount(db.Model):
     __tablename__ = 'social_accounts'
     id = db.Column(db.Integer, primary_key=True)
@@ -103,12 +156,31 @@ class UsageMetric(db.Model):
     action_type = db.Column(db.String(50), nullable=False)
     extra_metadata = db.Column(db.JSON)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Identifiant de dédoublonnage (ingestion par lots, au moins une fois)
+    event_id = db.Column(db.String(64), unique=True, index=True)
     
     @staticmethod
-    def log_action(user_id, action_type, extra_metadata=None):
-        metric = UsageMetric(user_id=user_id, action_type=action_type, extra_metadata=extra_metadata or {})
-        db.session.add(metric)
-        db.session.commit()
+    def log_action(user_id, action_type, extra_metadata=None, event_id=None):
+        """Journalise l'événement via le stream d'usage (inséré par lots, sans COMMIT ici)."""
+        from backend.usage_events import emit
+
+        return emit(user_id, action_type, extra_metadata, event_id)
+
+class DailyStat(db.Model):
+    """Agrégat quotidien pour le tableau de bord admin (recalculé par `admin_stats.refresh`)."""
+    __tablename__ = 'stats_daily'
+    day = db.Column(db.Date, primary_key=True)
+    signups = db.Column(db.Integer, nullable=False, default=0)
+    scripts = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class PlanStat(db.Model):
+    """Utilisateurs par plan (`none` : sans abonnement) et statut de vérification."""
+    __tablename__ = 'stats_plans'
+    plan_type = db.Column(db.String(20), primary_key=True)
+    email_verified = db.Column(db.Boolean, primary_key=True)
+    users = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -117,7 +189,7 @@ class User(db.Model):
     password_hash = db.Column(db.String(255), nullable=False)
     name = db.Column(db.String(100))
     is_admin = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     email_verified = db.Column(db.Boolean, default=False)
     verification_token = db.Column(db.String(100))
     phone_number = db.Column(db.String(20))  # Numéro pour Mobile Money
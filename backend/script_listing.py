@@ -0,0 +1,119 @@
+"""
+Liste des scripts en mode résumé : pagination par curseur (keyset) sur
+`(user_id, created_at, id)` et projection des seules colonnes affichées.
+
+- Pas d'OFFSET : une page profonde coûte autant que la première (index composite
+  `ix_scripts_user_created_id`).
+- Pas de `content` complet ni de `extra_metadata` : un extrait et le statut vidéo.
+- Total optionnel : `exact` (COUNT) ou `estimate` (estimation du planificateur PostgreSQL,
+  COUNT ailleurs).
+
+Env :
+  SCRIPT_EXCERPT_CHARS   défaut 200
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import and_, func, or_, text
+
+from backend.database import db
+from backend.generation_jobs import KIND_LTX
+from backend.saas_models import GenerationJob, Script
+
+EXCERPT_CHARS = int(os.getenv('SCRIPT_EXCERPT_CHARS', '200'))
+MAX_LIMIT = 100
+
+
+def encode_cursor(created_at: datetime, script_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), script_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Lève ValueError si le curseur est invalide."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, script_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(script_id)
+    except Exception as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def _estimated_count(user_id: int, platform: Optional[str]) -> int:
+    if db.engine.dialect.name != 'postgresql':
+        return _exact_count(user_id, platform)
+    sql = 'EXPLAIN (FORMAT JSON) SELECT 1 FROM scripts WHERE user_id = :user_id'
+    params = {'user_id': user_id}
+    if platform:
+        sql += ' AND platform = :platform'
+        params['platform'] = platform
+    plan = db.session.execute(text(sql), params).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _exact_count(user_id: int, platform: Optional[str]) -> int:
+    query = db.session.query(func.count(Script.id)).filter(Script.user_id == user_id)
+    if platform:
+        query = query.filter(Script.platform == platform)
+    return query.scalar()
+
+
+def list_summaries(
+    user_id: int,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    platform: Optional[str] = None,
+    with_total: Optional[str] = None,
+) -> dict:
+    """Page de résumés (plus récents d'abord) ; `next_cursor` vaut None sur la dernière page."""
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    query = (
+        db.session.query(
+            Script.id,
+            Script.title,
+            Script.platform,
+            Script.created_at,
+            Script.updated_at,
+            func.substr(Script.content, 1, EXCERPT_CHARS).label('excerpt'),
+            GenerationJob.status.label('video_status'),
+            GenerationJob.video_url,
+        )
+        .outerjoin(GenerationJob, and_(GenerationJob.script_id == Script.id, GenerationJob.kind == KIND_LTX))
+        .filter(Script.user_id == user_id)
+    )
+    if platform:
+        query = query.filter(Script.platform == platform)
+    if cursor:
+        created_at, script_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(Script.created_at < created_at, and_(Script.created_at == created_at, Script.id < script_id))
+        )
+    rows = query.order_by(Script.created_at.desc(), Script.id.desc()).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    result = {
+        'scripts': [
+            {
+                'id': r.id,
+                'title': r.title,
+                'platform': r.platform,
+                'created_at': r.created_at.isoformat(),
+                'updated_at': r.updated_at.isoformat() if r.updated_at else None,
+                'excerpt': r.excerpt,
+                'video_status': r.video_status,
+                'video_url': r.video_url,
+            }
+            for r in rows
+        ],
+        'next_cursor': encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+    }
+    if with_total == 'exact':
+        result['total'] = _exact_count(user_id, platform)
+    elif with_total == 'estimate':
+        result['total_estimate'] = _estimated_count(user_id, platform)
+    return result
@@ -0,0 +1,175 @@
+"""
+Recherche plein texte dans les scripts d'un utilisateur (titre + contenu).
+
+- PostgreSQL : colonne générée `scripts.search_vector` (tsvector français + anglais, titre
+  pondéré A, contenu B) et index GIN ; classement `ts_rank_cd`, extraits `ts_headline`.
+- SQLite (développement) : table FTS5 externe `scripts_fts` tenue à jour par triggers ;
+  classement `bm25`, extraits `snippet()`.
+- Autres moteurs : repli ILIKE (sans classement).
+
+Les extraits sont échappés (HTML) ; les termes trouvés sont entourés de <mark>.
+Index et triggers créés au démarrage par `install` (idempotent, sans migration).
+"""
+import html
+import logging
+import re
+from typing import Optional
+
+from sqlalchemy import text
+
+from backend.database import db
+from backend.saas_models import Script
+
+logger = logging.getLogger(__name__)
+
+MAX_LIMIT = 50
+_START, _STOP = '\x02', '\x03'
+
+_PG_SETUP = [
+    """ALTER TABLE scripts ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('french', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(content, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_scripts_search_vector ON scripts USING GIN (search_vector)",
+]
+
+_SQLITE_SETUP = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS scripts_fts USING fts5(
+        title, content, content='scripts', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS scripts_fts_ai AFTER INSERT ON scripts BEGIN
+        INSERT INTO scripts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS scripts_fts_ad AFTER DELETE ON scripts BEGIN
+        INSERT INTO scripts_fts(scripts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS scripts_fts_au AFTER UPDATE OF title, content ON scripts BEGIN
+        INSERT INTO scripts_fts(scripts_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO scripts_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END""",
+]
+
+
+def install(app) -> None:
+    """Crée l'index de recherche du moteur courant (au démarrage)."""
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        try:
+            with db.engine.begin() as conn:
+                if dialect == 'postgresql':
+                    for sql in _PG_SETUP:
+                        conn.execute(text(sql))
+                elif dialect == 'sqlite':
+                    existed = conn.execute(
+                        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scripts_fts'")
+                    ).first()
+                    for sql in _SQLITE_SETUP:
+                        conn.execute(text(sql))
+                    if not existed:
+                        # Indexe les scripts antérieurs à la table FTS
+                        conn.execute(text("INSERT INTO scripts_fts(scripts_fts) VALUES ('rebuild')"))
+        except Exception as e:
+            logger.warning("Index de recherche non créé (%s): %s", dialect, e)
+
+
+def _highlight(snippet: Optional[str]) -> str:
+    escaped = html.escape(snippet or '')
+    return escaped.replace(_START, '<mark>').replace(_STOP, '</mark>')
+
+
+def _fts5_query(q: str) -> str:
+    """Termes de l'utilisateur en requête FTS5 sûre : tous requis, dernier en préfixe."""
+    words = re.findall(r'\w+', q)
+    if not words:
+        return ''
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _search_postgres(user_id: int, q: str, limit: int, platform: Optional[str]) -> list:
+    sql = f"""
+        WITH query AS (
+            SELECT websearch_to_tsquery('french', :q) || websearch_to_tsquery('english', :q) AS tsq
+        ), hits AS (
+            SELECT s.id, ts_rank_cd(s.search_vector, query.tsq) AS rank
+            FROM scripts s, query
+            WHERE s.user_id = :user_id AND s.search_vector @@ query.tsq
+            {'AND s.platform = :platform' if platform else ''}
+            ORDER BY rank DESC, s.created_at DESC
+            LIMIT :limit
+        )
+        SELECT s.id, s.title, s.platform, s.created_at, hits.rank,
+               ts_headline('french', s.content, query.tsq,
+                           'StartSel=' || chr(2) || ', StopSel=' || chr(3) || ', MaxWords=35, MinWords=15, MaxFragments=2')
+                   AS snippet
+        FROM hits JOIN scripts s ON s.id = hits.id, query
+        ORDER BY hits.rank DESC, s.created_at DESC
+    """
+    params = {'q': q, 'user_id': user_id, 'limit': limit, 'platform': platform}
+    return db.session.execute(text(sql), params).mappings().all()
+
+
+def _search_sqlite(user_id: int, q: str, limit: int, platform: Optional[str]) -> list:
+    match = _fts5_query(q)
+    if not match:
+        return []
+    sql = f"""
+        SELECT s.id, s.title, s.platform, s.created_at,
+               -bm25(scripts_fts, 10.0, 1.0) AS rank,
+               snippet(scripts_fts, 1, char(2), char(3), '…', 24) AS snippet
+        FROM scripts_fts JOIN scripts s ON s.id = scripts_fts.rowid
+        WHERE scripts_fts MATCH :match AND s.user_id = :user_id
+        {'AND s.platform = :platform' if platform else ''}
+        ORDER BY bm25(scripts_fts, 10.0, 1.0)
+        LIMIT :limit
+    """
+    params = {'match': match, 'user_id': user_id, 'limit': limit, 'platform': platform}
+    return db.session.execute(text(sql), params).mappings().all()
+
+
+def _search_like(user_id: int, q: str, limit: int, platform: Optional[str]) -> list:
+    pattern = f'%{q}%'
+    query = Script.query.filter(
+        Script.user_id == user_id,
+        Script.title.ilike(pattern) | Script.content.ilike(pattern),
+    )
+    if platform:
+        query = query.filter(Script.platform == platform)
+    rows = []
+    for s in query.order_by(Script.created_at.desc()).limit(limit).all():
+        pos = s.content.lower().find(q.lower())
+        start = max(pos - 80, 0) if pos >= 0 else 0
+        excerpt = s.content[start:start + 200]
+        snippet = re.sub(re.escape(q), lambda m: f'{_START}{m.group(0)}{_STOP}', excerpt, flags=re.I)
+        rows.append({'id': s.id, 'title': s.title, 'platform': s.platform, 'created_at': s.created_at,
+                     'rank': None, 'snippet': snippet})
+    return rows
+
+
+def search_scripts(user_id: int, q: str, limit: int = 20, platform: Optional[str] = None) -> list:
+    """Scripts de l'utilisateur correspondant à `q`, du plus pertinent au moins pertinent."""
+    q = (q or '').strip()
+    if not q:
+        return []
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        rows = _search_postgres(user_id, q, limit, platform)
+    elif dialect == 'sqlite':
+        rows = _search_sqlite(user_id, q, limit, platform)
+    else:
+        rows = _search_like(user_id, q, limit, platform)
+    return [
+        {
+            'id': r['id'],
+            'title': r['title'],
+            'platform': r['platform'],
+            'created_at': r['created_at'].isoformat() if hasattr(r['created_at'], 'isoformat') else r['created_at'],
+            'rank': round(float(r['rank']), 4) if r['rank'] is not None else None,
+            'snippet': _highlight(r['snippet']),
+        }
+        for r in rows
+    ]
@@ -5,9 +5,12 @@ import os
 
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from backend import generation_jobs, quotas
 from backend.database import db
-from backend.saas_models import Script, UsageMetric
-from backend.auth_utils import check_usage_limit, get_current_user
+from backend.saas_models import Script
+from backend.auth_utils import get_current_user, reserve_usage
+from backend.script_listing import list_summaries
+from backend.script_search import search_scripts
 from datetime import datetime
 import sys
 
@@ -24,6 +27,19 @@ def list_scripts():
     try:
         user = get_current_user()
         
+        # Mode résumé : curseur keyset + projection (?view=summary&cursor=...&limit=20&with_total=estimate|exact)
+        if request.args.get('view') == 'summary' or request.args.get('cursor'):
+            try:
+                return jsonify(list_summaries(
+                    user.id,
+                    limit=request.args.get('limit', 20, type=int),
+                    cursor=request.args.get('cursor'),
+                    platform=request.args.get('platform'),
+                    with_total=request.args.get('with_total'),
+                )), 200
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+        
         # Pagination
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
@@ -48,6 +64,26 @@ def list_scripts():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@scripts_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_user_scripts():
+    """Full-text search in the current user's scripts (?q=...&limit=20&platform=)"""
+    try:
+        user = get_current_user()
+        q = request.args.get('q', '')
+        if not q.strip():
+            return jsonify({'error': 'q is required'}), 400
+        results = search_scripts(
+            user.id,
+            q,
+            limit=request.args.get('limit', 20, type=int),
+            platform=request.args.get('platform'),
+        )
+        return jsonify({'query': q, 'results': results}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @scripts_bp.route('/<int:script_id>', methods=['GET'])
 @jwt_required()
 def get_script(script_id):
@@ -68,14 +104,12 @@ def get_script(script_id):
 @jwt_required()
 def create_script():
     """Generate and save a new script"""
+    # Réservations de quota (libérées si la génération échoue)
+    script_token = ltx_token = None
+    user = None
     try:
         user = get_current_user()
         
-        # Check usage limit
-        can_generate, message = check_usage_limit(user.id, 'script_generated')
-        if not can_generate:
-            return jsonify({'error': message, 'upgrade_required': True}), 403
-        
         data = request.get_json()
         topic = data.get('topic')
         platform = data.get('platform', 'youtube')
@@ -91,26 +125,31 @@ def create_script():
         if not topic:
             return jsonify({'error': 'Topic is required'}), 400
 
+        # Check usage limit
+        can_generate, message, script_token = reserve_usage(user.id, 'script_generated')
+        if not can_generate:
+            return jsonify({'error': message, 'upgrade_required': True}), 403
+
         metadata = dict(data.get('metadata') or {})
         ltx_notice = None
-        will_start_ltx = False
+        ltx_job = None
         if auto_ltx_video and runner_configured:
-            can_ltx, ltx_msg = check_usage_limit(user.id, 'ltx_video_generated')
+            can_ltx, ltx_msg, ltx_token = reserve_usage(user.id, 'ltx_video_generated')
             if can_ltx:
-                metadata['ltx_video'] = {
+                ltx_job = {
                     'status': 'queued',
                     'queued_at': datetime.utcnow().isoformat() + 'Z',
+                    'quota_reservation': ltx_token,
                 }
-                will_start_ltx = True
             else:
-                metadata['ltx_video'] = {'status': 'skipped', 'reason': ltx_msg}
+                ltx_job = {'status': 'skipped', 'reason': ltx_msg}
                 ltx_notice = ltx_msg
         elif auto_ltx_video:
-            metadata['ltx_video'] = {
+            ltx_job = {
                 'status': 'skipped',
                 'reason': 'LTX_RUNNER_URL not configured',
             }
-            ltx_notice = metadata['ltx_video']['reason']
+            ltx_notice = ltx_job['reason']
 
         # Generate script using main.py function
         script_content = generate_script(
@@ -125,6 +164,8 @@ def create_script():
         )
 
         if not script_content:
+            quotas.release(user.id, 'script_generated', script_token)
+            quotas.release(user.id, 'ltx_video_generated', ltx_token)
             return jsonify({'error': 'Script generation failed'}), 500
 
         # Save script
@@ -137,37 +178,35 @@ def create_script():
         )
 
         db.session.add(script)
-
-        # Log usage
-        UsageMetric.log_action(
-            user_id=user.id,
-            action_type='script_generated',
-            extra_metadata={'platform': platform, 'topic': topic}
-        )
-
         db.session.commit()
 
-        if will_start_ltx:
+        # Quota consommé seulement une fois le script enregistré (jeton gardé jusque-là,
+        # libéré par le bloc except si le COMMIT échoue)
+        quotas.record(user.id, 'script_generated', {'platform': platform, 'topic': topic}, script_token)
+        db.session.commit()  # événement d'usage écrit en SQL si le stream Redis est indisponible
+        script_token = None
+
+        if ltx_job:
+            generation_jobs.ensure(script, defaults=ltx_job)
+        if ltx_job and ltx_job['status'] == 'queued':
             try:
                 from backend.tasks_ltx import enqueue_ltx_for_script
 
                 enqueue_ltx_for_script(script.id)
             except Exception as exc:
-                script = Script.query.get(script.id)
-                if script:
-                    meta = dict(script.extra_metadata or {})
-                    meta["ltx_video"] = {
-                        "status": "failed",
-                        "error": f"Impossible de lancer la file d'attente: {exc}",
-                    }
-                    script.extra_metadata = meta
-                    script.updated_at = datetime.utcnow()
-                    db.session.commit()
-                payload["ltx_notice"] = str(exc)
+                quotas.release(user.id, 'ltx_video_generated', ltx_token)
+                generation_jobs.update(script.id, {
+                    'status': 'failed',
+                    'error': f"Impossible de lancer la file d'attente: {exc}",
+                    'quota_reservation': None,
+                })
+                ltx_notice = str(exc)
+            ltx_token = None
 
         payload = {
             'message': 'Script created successfully',
             'script': script.to_dict(),
+            'ltx_video': generation_jobs.view(script.id) if ltx_job else None,
         }
         if ltx_notice:
             payload['ltx_notice'] = ltx_notice
@@ -175,6 +214,9 @@ def create_script():
         
     except Exception as e:
         db.session.rollback()
+        if user:
+            quotas.release(user.id, 'script_generated', script_token)
+            quotas.release(user.id, 'ltx_video_generated', ltx_token)
         print(f"Script creation error: {e}")
         return jsonify({'error': 'Script creation failed', 'message': str(e)}), 500
 
@@ -237,25 +279,10 @@ def get_usage():
     try:
         user = get_current_user()
         
-        # Current month usage
-        now = datetime.utcnow()
-        month_start = datetime(now.year, now.month, 1)
-        
-        script_count = UsageMetric.query.filter(
-            UsageMetric.user_id == user.id,
-            UsageMetric.action_type == 'script_generated',
-            UsageMetric.timestamp >= month_start
-        ).count()
-        
-        # Get plan limits
-        plan_limits = {
-            'free': 5,
-            'pro': 100,
-            'enterprise': float('inf')
-        }
-        
+        # Current month usage (compteur Redis, repli SQL)
+        script_count = quotas.usage(user.id, 'script_generated')
         plan_type = user.subscription.plan_type if user.subscription else 'free'
-        limit = plan_limits.get(plan_type, 5)
+        limit = quotas.limit_for(plan_type, 'script_generated')
         
         return jsonify({
             'current_usage': script_count,
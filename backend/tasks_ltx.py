@@ -1,18 +1,112 @@
-"""Tâches Celery : génération vidéo LTX après script."""
+"""
+Tâches Celery : génération vidéo LTX après script.
+
+Avec LTX_CALLBACK_BASE_URL + LTX_CALLBACK_TOKEN, la génération se fait en deux phases : la tâche soumet le job
+puis libère le worker ; le webhook du runner déclenche `ltx_finalize_task`. Une tâche de
+réconciliation différée rattrape les callbacks perdus.
+
+Erreur réseau passagère : la tâche est rejouée (LTX_STEP_RETRIES, backoff exponentiel) et
+reprend à l'étape enregistrée par `ltx_workflow` (pas de nouveau rendu GPU).
+"""
+import os
+
 from backend.celery_app import celery_app
 
+RECONCILE_AFTER = int(os.getenv("LTX_RECONCILE_AFTER_SEC", "600"))
+RECONCILE_MAX_ROUNDS = int(os.getenv("LTX_POLL_MAX_SEC", "3600")) // max(RECONCILE_AFTER, 1) + 1
+STEP_RETRIES = int(os.getenv("LTX_STEP_RETRIES", "3"))
+
+
+def _retry_or_fail(task, script_id: int, exc: Exception) -> None:
+    """Rejoue la tâche (reprise à l'étape atteinte) ou marque l'échec après STEP_RETRIES essais."""
+    from backend.ltx_workflow import _mark_failed
+
+    if task.request.retries < STEP_RETRIES:
+        raise task.retry(exc=exc, countdown=30 * 2 ** task.request.retries, max_retries=STEP_RETRIES)
+    _mark_failed(int(script_id), exc)
+
 
 @celery_app.task(name="scripty.ltx_for_script", bind=True, max_retries=0)
-def ltx_for_script_task(self, script_id: int) -> None:
-    """Exécuté dans le worker Celery (contexte Flask requis)."""
+def ltx_for_script_task(self, script_id: int, segmented: bool = False) -> None:
+    """
+    Exécuté dans le worker Celery (contexte Flask requis). `segmented` : vidéo longue, une
+    scène par job runner (le worker attend les segments puis les assemble).
+    """
     from backend.app_saas import app
 
     with app.app_context():
-        from backend.ltx_workflow import run_ltx_pipeline_for_script
+        from backend.ltx_runner_client import callbacks_enabled
+        from backend.ltx_workflow import (
+            TransientLtxError,
+            run_ltx_pipeline_for_script,
+            run_segmented_ltx_for_script,
+            submit_ltx_for_script,
+        )
+
+        try:
+            if segmented:
+                run_segmented_ltx_for_script(int(script_id), pipeline=None, enhance_prompt=True, retry_transient=True)
+                return
+            if not callbacks_enabled():
+                run_ltx_pipeline_for_script(int(script_id), pipeline=None, enhance_prompt=True, retry_transient=True)
+                return
+            job_id = submit_ltx_for_script(int(script_id), pipeline=None, enhance_prompt=True, retry_transient=True)
+        except TransientLtxError as e:
+            _retry_or_fail(self, script_id, e)
+            return
+        if job_id:
+            ltx_reconcile_task.apply_async(args=[int(script_id), job_id, 1], countdown=RECONCILE_AFTER)
 
-        run_ltx_pipeline_for_script(int(script_id), pipeline=None, enhance_prompt=True)
 
+@celery_app.task(name="scripty.ltx_finalize", bind=True, max_retries=0)
+def ltx_finalize_task(self, script_id: int, job_id: str, runner_job: dict = None) -> None:
+    """Phase 2 : téléchargement + enregistrement du MP4 (déclenchée par le webhook)."""
+    from backend.app_saas import app
+
+    with app.app_context():
+        from backend import generation_jobs
+        from backend.ltx_workflow import TransientLtxError, finalize_ltx_for_script
 
-def enqueue_ltx_for_script(script_id: int) -> None:
+        try:
+            finalize_ltx_for_script(int(script_id), job_id, runner_job, retry_transient=True)
+        except TransientLtxError as e:
+            ltx = generation_jobs.view(int(script_id)) or {}
+            if not ltx.get("runner_job_id"):
+                # Le runner a perdu le job ou sa sortie : re-soumission
+                ltx_for_script_task.apply_async(args=[int(script_id)], countdown=30)
+                return
+            _retry_or_fail(self, script_id, e)
+
+
+@celery_app.task(name="scripty.ltx_reconcile", bind=True, max_retries=0)
+def ltx_reconcile_task(self, script_id: int, job_id: str, round_no: int = 1) -> None:
+    """Filet de sécurité si le webhook n'arrive pas : court long-poll, puis finalise ou se replanifie."""
+    from backend.app_saas import app
+
+    with app.app_context():
+        from backend.ltx_runner_client import get_job
+        from backend import generation_jobs
+        from backend.ltx_workflow import _mark_failed, finalize_ltx_for_script
+
+        ltx = generation_jobs.view(int(script_id)) or {}
+        if ltx.get("runner_job_id") != job_id or ltx.get("status") != "processing":
+            return  # déjà finalisé par le webhook
+        try:
+            runner_job = get_job(job_id, wait=30)
+        except Exception as e:
+            runner_job = {"status": "unknown", "error": str(e)}
+        if runner_job.get("status") in ("completed", "failed"):
+            finalize_ltx_for_script(int(script_id), job_id, runner_job)
+        elif round_no >= RECONCILE_MAX_ROUNDS:
+            _mark_failed(int(script_id), TimeoutError(f"LTX job {job_id} did not finish in time"))
+        else:
+            ltx_reconcile_task.apply_async(args=[int(script_id), job_id, round_no + 1], countdown=RECONCILE_AFTER)
+
+
+def enqueue_ltx_for_script(script_id: int, segmented: bool = False) -> None:
     """Enfile la génération LTX (lève si Celery/Redis indisponible)."""
-    ltx_for_script_task.delay(int(script_id))
+    ltx_for_script_task.delay(int(script_id), bool(segmented))
+
+
+def enqueue_ltx_finalize(script_id: int, job_id: str, runner_job: dict = None) -> None:
+    ltx_finalize_task.delay(int(script_id), job_id, runner_job)
@@ -0,0 +1,27 @@
+"""
+Tâches Celery périodiques (Celery beat, voir `celery_app.beat_schedule`) :
+insertion par lots du journal d'usage et réconciliation des compteurs de quota Redis.
+"""
+from backend.celery_app import celery_app
+
+
+@celery_app.task(name="scripty.usage_flush")
+def usage_flush_task() -> dict:
+    from backend.app_saas import app
+
+    with app.app_context():
+        from backend.usage_events import flush
+
+        return flush()
+
+
+@celery_app.task(name="scripty.quota_reconcile")
+def quota_reconcile_task() -> dict:
+    from backend.app_saas import app
+
+    with app.app_context():
+        from backend.quotas import reconcile
+
+        result = reconcile()
+        print(f"📊 Quotas réconciliés: {result['updated']} compteur(s)")
+        return result
@@ -0,0 +1,15 @@
+"""
+Tâches Celery beat : rafraîchissement des agrégats du tableau de bord admin
+(voir `admin_stats`) — incrémental toutes les STATS_REFRESH_SEC, reconstruction complète la nuit.
+"""
+from backend.celery_app import celery_app
+
+
+@celery_app.task(name="scripty.stats_refresh")
+def stats_refresh_task(full: bool = False) -> dict:
+    from backend.app_saas import app
+
+    with app.app_context():
+        from backend.admin_stats import refresh
+
+        return refresh(full=bool(full))
@@ -0,0 +1,185 @@
+"""
+Tâches Celery : montages vidéo (stock + voix), routées sur la file `render`
+pour que les workers de rendu se dimensionnent indépendamment de l'API.
+"""
+import os
+import random
+import time
+from datetime import datetime
+
+from backend.celery_app import celery_app
+from backend.telemetry import span
+
+# Répartition de la progression (%) entre les étapes
+_PREPARE_SPAN = (5.0, 40.0)
+_ASSEMBLY_SPAN = (40.0, 99.0)
+
+
+def _claimable(task, manifest: dict, expected: str, running: tuple) -> bool:
+    """
+    Le manifeste peut-il être pris par cette tâche ? Normalement seulement à l'état
+    `expected` ; avec acks_late, un message relivré après la mort d'un worker trouve le
+    rendu dans un état intermédiaire (`running`) : on le reprend depuis le début.
+    """
+    if not manifest:
+        return False
+    status = manifest.get("status")
+    if status == expected:
+        return True
+    redelivered = (task.request.delivery_info or {}).get("redelivered")
+    return bool(redelivered) and status in running
+
+
+def _cleanup_if_terminal(render_id: str, fallback: dict) -> None:
+    """Supprime les entrées (voix TTS, stocks hors cache) dès que le rendu est dans un état terminal."""
+    from backend.video_renders import TERMINAL_STATUSES, cleanup_inputs, load_render
+
+    manifest = load_render(render_id) or fallback
+    if manifest.get("status") in TERMINAL_STATUSES:
+        cleanup_inputs(manifest)
+
+
+def _render(render_id: str, manifest: dict, quality: str) -> str:
+    """Assemble le manifeste avec le profil `quality` ; retourne l'URL publique."""
+    from backend.video_maker import VideoMaker
+    from backend.video_renders import VIDEO_DIR, set_progress
+
+    start, end = _ASSEMBLY_SPAN
+    last = {"pct": -1.0}
+
+    def on_progress(fraction: float) -> None:
+        pct = start + (end - start) * fraction
+        if pct - last["pct"] >= 2:
+            last["pct"] = pct
+            set_progress(render_id, "assembling", pct)
+
+    set_progress(render_id, "assembling", start)
+    maker = VideoMaker(output_dir=VIDEO_DIR)
+    with span("render", provider="moviepy", model=quality, platform=manifest.get("platform")):
+        video = maker.create_video(
+            assets=list(manifest["assets"]),
+            audio_path=manifest["audio_path"],
+            subtitles=manifest.get("subtitles") or [],
+            options={
+                "platform": manifest.get("platform"),
+                "quality": quality,
+                "shuffle": False,
+                "filename": f"video_{render_id}_{quality}.mp4",
+                "progress_callback": on_progress,
+            },
+        )
+    return f"/static/videos/{os.path.basename(video)}"
+
+
+@celery_app.task(name="scripty.video_montage", bind=True, max_retries=0, acks_late=True)
+def video_montage_task(self, render_id: str) -> None:
+    """TTS + stocks en parallèle, puis assemblage (aperçu ou final selon les paramètres)."""
+    from backend.video_pipeline import StageTimings, prepare_inputs
+    from backend.video_renders import RenderCancelled, cleanup_inputs, load_render, set_progress, update_render
+
+    manifest = load_render(render_id)
+    if not _claimable(self, manifest, "queued", ("preparing", "assembling")):
+        return
+    if manifest.get("status") != "queued":
+        # Reprise : les entrées partielles de la tentative interrompue sont refaites
+        cleanup_inputs(manifest)
+    params = manifest.get("params") or {}
+    quality = params.get("quality", "preview")
+    try:
+        update_render(render_id, {"status": "preparing"})
+        set_progress(render_id, "preparing", _PREPARE_SPAN[0])
+        timings = StageTimings()
+        orientation = "portrait" if manifest.get("platform") != "youtube" else "landscape"
+        audio_path, assets = prepare_inputs(
+            params.get("script_text", ""),
+            params.get("keywords", [])[:3],
+            orientation,
+            timings,
+        )
+        # Chemins enregistrés avant tout contrôle : le nettoyage final doit les connaître
+        manifest = update_render(render_id, {"assets": assets, "audio_path": audio_path})
+        if not assets:
+            raise RuntimeError("Aucune vidéo trouvée sur Pexels")
+
+        # Ordre des stocks figé une fois pour toutes : le rendu final reprend l'aperçu à l'identique
+        random.shuffle(assets)
+        manifest = update_render(render_id, {"assets": assets, "status": "assembling"})
+
+        with timings.stage("assembly"):
+            video_url = _render(render_id, manifest, quality)
+
+        done = {"stage": "done", "progress": 100, "timings": timings.to_dict()}
+        if quality == "final":
+            update_render(
+                render_id,
+                {**done, "status": "completed", "final_url": video_url, "completed_at": datetime.utcnow().isoformat() + "Z"},
+            )
+        else:
+            update_render(
+                render_id,
+                {**done, "status": "preview_ready", "preview_url": video_url, "preview_ready_at": time.time()},
+            )
+    except RenderCancelled:
+        update_render(render_id, {"status": "cancelled", "stage": "cancelled"})
+    except Exception as e:
+        update_render(render_id, {"status": "failed", "stage": "failed", "error": str(e)})
+    finally:
+        # Aperçu prêt : les entrées restent pour le rendu final ; sinon, plus rien n'en a besoin
+        _cleanup_if_terminal(render_id, manifest)
+
+
+@celery_app.task(name="scripty.video_final_render", bind=True, max_retries=0, acks_late=True)
+def video_final_render_task(self, render_id: str) -> None:
+    """Ré-encode le manifeste `render_id` avec le profil final (CRF + faststart)."""
+    from backend.video_renders import RenderCancelled, load_render, update_render
+
+    manifest = load_render(render_id)
+    if not _claimable(self, manifest, "final_queued", ("rendering_final",)):
+        return
+    update_render(render_id, {"status": "rendering_final"})
+    try:
+        final_url = _render(render_id, manifest, "final")
+        update_render(
+            render_id,
+            {
+                "status": "completed",
+                "stage": "done",
+                "progress": 100,
+                "final_url": final_url,
+                "completed_at": datetime.utcnow().isoformat() + "Z",
+            },
+        )
+    except RenderCancelled:
+        update_render(render_id, {"status": "cancelled", "stage": "cancelled"})
+    except Exception as e:
+        update_render(render_id, {"status": "failed", "stage": "failed", "error": str(e)})
+    finally:
+        _cleanup_if_terminal(render_id, manifest)
+
+
+@celery_app.task(name="scripty.video_inputs_sweep")
+def video_inputs_sweep_task() -> dict:
+    """Beat : supprime les entrées des aperçus jamais validés (VIDEO_PREVIEW_INPUT_TTL_SEC)."""
+    from backend.video_renders import expire_stale_previews
+
+    return expire_stale_previews()
+
+
+def task_id_for(render_id: str, phase: str) -> str:
+    """Id Celery déterministe : l'API peut révoquer une tâche sans le stocker."""
+    return f"{phase}-{render_id}"
+
+
+def enqueue_montage(render_id: str) -> None:
+    """Enfile le montage complet (lève si Celery/Redis indisponible)."""
+    video_montage_task.apply_async(args=[render_id], task_id=task_id_for(render_id, "montage"))
+
+
+def enqueue_final_render(render_id: str) -> None:
+    """Enfile le rendu final (lève si Celery/Redis indisponible)."""
+    video_final_render_task.apply_async(args=[render_id], task_id=task_id_for(render_id, "final"))
+
+
+def revoke(render_id: str) -> None:
+    """Empêche les tâches encore en file de démarrer (les tâches en cours s'arrêtent via le drapeau d'annulation)."""
+    celery_app.control.revoke([task_id_for(render_id, "montage"), task_id_for(render_id, "final")])
@@ -0,0 +1,310 @@
+"""
+Traces et métriques du pipeline de génération (où passent les secondes d'une requête).
+
+- `span(stage, provider=, model=, platform=)` / `@traced(...)` : span OpenTelemetry
+  (si le SDK est installé) et histogramme Prometheus
+  `scripty_stage_duration_seconds{stage, provider, model, platform, outcome}`.
+- `install(app)` : route `/metrics` (format Prometheus), histogramme
+  `scripty_http_request_duration_seconds` par route, en-tête `X-Trace-Id`, reprise du
+  `traceparent` entrant.
+- `install_celery(celery_app)` : le contexte de trace (W3C `traceparent`) part dans les
+  en-têtes du message à la publication et est restauré dans le worker ; chaque tâche est
+  un span `task:<nom>`.
+
+Sans OpenTelemetry, des identifiants W3C sont générés localement et propagés de la même
+façon (journaux, Celery). Sans prometheus_client, aucune métrique n'est collectée.
+
+Env :
+  METRICS_ENABLED              défaut 1
+  METRICS_TOKEN                optionnel : `Authorization: Bearer <token>` requis sur /metrics
+  METRICS_PORT                 workers Celery : port du serveur /metrics (défaut : aucun)
+  PROMETHEUS_MULTIPROC_DIR     dossier partagé entre processus gunicorn / celery
+  OTEL_EXPORTER_OTLP_ENDPOINT  export OTLP des spans (SDK + exporter requis)
+  OTEL_SERVICE_NAME            défaut scripty-api
+"""
+import functools
+import inspect
+import logging
+import os
+import re
+import time
+from contextlib import ExitStack, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Optional
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import propagate, trace
+except ImportError:
+    trace = None
+
+try:
+    import prometheus_client
+    from prometheus_client import Histogram
+except ImportError:
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+# (trace_id, span_id) du span courant, hex W3C
+_current: ContextVar[Optional[tuple]] = ContextVar('scripty_trace', default=None)
+
+# Plateformes connues ; toute autre valeur (saisie libre) est regroupée sous `other`
+_PLATFORMS = ('youtube', 'tiktok', 'instagram', 'facebook')
+_STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120, 300, 600)
+
+if prometheus_client is not None and _ENABLED:
+    STAGE_SECONDS = Histogram(
+        'scripty_stage_duration_seconds',
+        "Durée d'une étape du pipeline (appel fournisseur, recherche, rendu...)",
+        ['stage', 'provider', 'model', 'platform', 'outcome'],
+        buckets=_STAGE_BUCKETS,
+    )
+    HTTP_SECONDS = Histogram(
+        'scripty_http_request_duration_seconds',
+        'Durée des requêtes HTTP par route',
+        ['method', 'endpoint', 'status'],
+        buckets=_STAGE_BUCKETS,
+    )
+else:
+    STAGE_SECONDS = HTTP_SECONDS = None
+
+
+def _setup_tracer():
+    """Tracer OpenTelemetry ; SDK + export OTLP configurés si l'endpoint est fourni."""
+    if trace is None:
+        return None
+    if os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT'):
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+            provider = TracerProvider(
+                resource=Resource.create({'service.name': os.getenv('OTEL_SERVICE_NAME', 'scripty-api')})
+            )
+            provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+            trace.set_tracer_provider(provider)
+        except ImportError:
+            logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT défini mais SDK / exporter OpenTelemetry absents")
+    return trace.get_tracer('scripty')
+
+
+_tracer = _setup_tracer()
+
+
+class Span:
+    """Span en cours : identifiants W3C, issue (`ok` / `error`) et attributs."""
+
+    __slots__ = ('trace_id', 'span_id', 'outcome', '_otel')
+
+    def __init__(self, trace_id: str, span_id: str, otel_span=None):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.outcome = 'ok'
+        self._otel = otel_span
+
+    def set(self, **attrs) -> None:
+        if self._otel is not None:
+            for key, value in attrs.items():
+                if value is not None:
+                    self._otel.set_attribute(f'scripty.{key}', value)
+
+    def fail(self, error: Optional[BaseException] = None) -> None:
+        self.outcome = 'error'
+        if self._otel is not None and error is not None:
+            self._otel.record_exception(error)
+
+
+def current_trace_id() -> Optional[str]:
+    ctx = _current.get()
+    return ctx[0] if ctx else None
+
+
+def traceparent() -> Optional[str]:
+    ctx = _current.get()
+    return f"00-{ctx[0]}-{ctx[1]}-01" if ctx else None
+
+
+@contextmanager
+def span(stage: str, provider: Optional[str] = None, model: Optional[str] = None,
+         platform: Optional[str] = None, **attrs):
+    """Chronomètre une étape ; une exception qui traverse le bloc marque l'issue `error`."""
+    parent = _current.get()
+    start = time.perf_counter()
+    labels = {'provider': provider, 'model': model, 'platform': platform}
+    otel_cm = (
+        _tracer.start_as_current_span(stage, attributes={f'scripty.{k}': v for k, v in {**labels, **attrs}.items() if v is not None})
+        if _tracer is not None else nullcontext()
+    )
+    with otel_cm as otel_span:
+        trace_id, span_id = (parent[0] if parent else os.urandom(16).hex()), os.urandom(8).hex()
+        if otel_span is not None:
+            ctx = otel_span.get_span_context()
+            if ctx.is_valid:
+                trace_id, span_id = format(ctx.trace_id, '032x'), format(ctx.span_id, '016x')
+        current = Span(trace_id, span_id, otel_span)
+        token = _current.set((trace_id, span_id))
+        try:
+            yield current
+        except Exception:
+            current.fail()
+            raise
+        finally:
+            _current.reset(token)
+            if STAGE_SECONDS is not None:
+                STAGE_SECONDS.labels(
+                    stage=stage,
+                    provider=provider or '',
+                    model=model or '',
+                    platform=(platform if platform in _PLATFORMS else 'other') if platform else '',
+                    outcome=current.outcome,
+                ).observe(time.perf_counter() - start)
+
+
+def traced(stage: str, provider: Optional[str] = None, model: Optional[str] = None):
+    """
+    Décorateur : la fonction entière est un span `stage`. Plateforme lue dans l'argument
+    `platform`, sinon `script.platform`.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        wants_platform = 'platform' in signature.parameters or 'script' in signature.parameters
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            platform = None
+            if wants_platform:
+                try:
+                    bound = signature.bind_partial(*args, **kwargs)
+                    bound.apply_defaults()
+                    arguments = bound.arguments
+                    platform = arguments.get('platform') or getattr(arguments.get('script'), 'platform', None)
+                except TypeError:
+                    pass
+            with span(stage, provider=provider, model=model, platform=platform):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def continue_trace(carrier: Optional[dict]):
+    """Reprend le contexte de trace transporté par `carrier` (en-têtes HTTP / Celery)."""
+    carrier = carrier or {}
+    match = _TRACEPARENT.match(str(carrier.get('traceparent') or ''))
+    token = _current.set((match.group(1), match.group(2))) if match else None
+    otel_token = otel_context.attach(propagate.extract(carrier)) if trace is not None else None
+    try:
+        yield
+    finally:
+        if otel_token is not None:
+            otel_context.detach(otel_token)
+        if token is not None:
+            _current.reset(token)
+
+
+def inject(carrier: dict) -> dict:
+    """Ajoute le contexte de trace courant à `carrier` (en-têtes sortants)."""
+    if trace is not None:
+        propagate.inject(carrier)
+    if 'traceparent' not in carrier and traceparent():
+        carrier['traceparent'] = traceparent()
+    return carrier
+
+
+def _registry():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import CollectorRegistry, multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return prometheus_client.REGISTRY
+
+
+def install(app) -> None:
+    """Route /metrics et mesure des requêtes HTTP."""
+    from flask import Response, g, request
+
+    @app.before_request
+    def _telemetry_start():
+        g._telemetry = stack = ExitStack()
+        stack.enter_context(continue_trace({'traceparent': request.headers.get('traceparent')}))
+        g._telemetry_span = stack.enter_context(span('http', method=request.method))
+        g._telemetry_start = time.perf_counter()
+
+    @app.after_request
+    def _telemetry_headers(response):
+        trace_id = current_trace_id()
+        if trace_id:
+            response.headers['X-Trace-Id'] = trace_id
+        if HTTP_SECONDS is not None and '_telemetry_start' in g:
+            endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+            if endpoint != '/metrics':
+                HTTP_SECONDS.labels(
+                    method=request.method, endpoint=endpoint, status=str(response.status_code)
+                ).observe(time.perf_counter() - g._telemetry_start)
+        if response.status_code >= 500 and '_telemetry_span' in g:
+            g._telemetry_span.fail()
+        return response
+
+    @app.teardown_request
+    def _telemetry_end(error=None):
+        stack = g.pop('_telemetry', None)
+        if stack is not None:
+            if error is not None and '_telemetry_span' in g:
+                g._telemetry_span.fail(error)
+            stack.close()
+
+    if prometheus_client is None or not _ENABLED:
+        return
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        token = os.getenv('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized', status=401)
+        return Response(prometheus_client.generate_latest(_registry()), mimetype=prometheus_client.CONTENT_TYPE_LATEST)
+
+
+def install_celery(celery_app) -> None:
+    """Propagation de la trace vers les tâches Celery et span par tâche."""
+    from celery import signals
+
+    running = {}
+
+    @signals.before_task_publish.connect(weak=False)
+    def _publish(headers=None, **kwargs):
+        if headers is not None:
+            inject(headers)
+
+    @signals.task_prerun.connect(weak=False)
+    def _prerun(task_id=None, task=None, **kwargs):
+        stack = ExitStack()
+        stack.enter_context(continue_trace({'traceparent': getattr(task.request, 'traceparent', None)}))
+        running[task_id] = (stack, stack.enter_context(span(f'task:{task.name}')))
+
+    @signals.task_failure.connect(weak=False)
+    def _failure(task_id=None, exception=None, **kwargs):
+        if task_id in running:
+            running[task_id][1].fail(exception)
+
+    @signals.task_postrun.connect(weak=False)
+    def _postrun(task_id=None, **kwargs):
+        entry = running.pop(task_id, None)
+        if entry is not None:
+            entry[0].close()
+
+    @signals.worker_init.connect(weak=False)
+    def _metrics_server(**kwargs):
+        port = os.getenv('METRICS_PORT')
+        if port and prometheus_client is not None and _ENABLED:
+            prometheus_client.start_http_server(int(port), registry=_registry())
+            logger.info("Métriques Celery sur :%s/metrics", port)
@@ -4,6 +4,8 @@ import requests
 import google.generativeai as genai
 from datetime import datetime
 
+from backend.telemetry import span
+
 class ThumbnailGenerator:
     """
     Générateur de miniatures YouTube via IA.
@@ -53,7 +55,8 @@ class ThumbnailGenerator:
         """
         
         try:
-            response = self.model.generate_content(prompt)
+            with span('llm', provider='gemini', model=getattr(self.model, 'model_name', None)):
+                response = self.model.generate_content(prompt)
             image_prompt = response.text.strip()
             # Nettoyage si jamais Gemini parle trop
             if '"' in image_prompt:
@@ -78,7 +81,8 @@ class ThumbnailGenerator:
             # width=1280, height=720 : Format YouTube standard 16:9
             url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=1280&height=720&model=flux&seed={int(time.time())}&nologo=true"
             
-            response = requests.get(url, timeout=30)
+            with span('image', provider='pollinations', model='flux'):
+                response = requests.get(url, timeout=30)
             
             if response.status_code == 200:
                 filename = f"thumb_{int(time.time())}.jpg"
@@ -0,0 +1,153 @@
+"""
+Journal d'usage asynchrone : les événements (`usage_metrics`) sont ajoutés à un stream
+Redis par les requêtes, puis insérés par lots par une tâche Celery beat, au lieu d'un
+INSERT + COMMIT par événement dans le chemin de la requête.
+
+- Au moins une fois : lecture par groupe de consommateurs, XACK seulement après le COMMIT
+  du lot ; les messages non acquittés (worker tué) sont repris après USAGE_CLAIM_IDLE_SEC.
+- Dédoublonnage : chaque événement porte un `event_id` unique (index unique, insertion
+  `ON CONFLICT DO NOTHING`) ; un lot rejoué n'insère rien deux fois.
+- Contre-pression : stream au-delà de USAGE_STREAM_MAX_LEN, ou Redis indisponible →
+  l'événement est ajouté à la transaction SQL de l'appelant (commité avec elle).
+
+Env :
+  USAGE_STREAM_MAX_LEN   défaut 100000
+  USAGE_FLUSH_SEC        défaut 5 (période de la tâche d'insertion)
+  USAGE_FLUSH_BATCH      défaut 500 (événements par INSERT)
+  USAGE_CLAIM_IDLE_SEC   défaut 60
+"""
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from backend.database import db
+from backend.redis_client import get_redis_client
+from backend.saas_models import UsageMetric
+
+logger = logging.getLogger(__name__)
+
+STREAM = "usage_events"
+GROUP = "usage_flushers"
+STREAM_MAX_LEN = int(os.getenv("USAGE_STREAM_MAX_LEN", "100000"))
+FLUSH_BATCH = int(os.getenv("USAGE_FLUSH_BATCH", "500"))
+CLAIM_IDLE_MS = int(os.getenv("USAGE_CLAIM_IDLE_SEC", "60")) * 1000
+_MAX_BATCHES_PER_RUN = 20
+
+
+def _add_to_session(user_id: int, action_type: str, extra_metadata: Optional[dict], event_id: str) -> None:
+    db.session.add(
+        UsageMetric(user_id=user_id, action_type=action_type, extra_metadata=extra_metadata or {}, event_id=event_id)
+    )
+
+
+def emit(user_id: int, action_type: str, extra_metadata: Optional[dict] = None, event_id: Optional[str] = None) -> str:
+    """
+    Enregistre un événement d'usage (sans COMMIT) ; retourne son `event_id`.
+    Un `event_id` stable rend l'appel idempotent (rejeu d'une tâche).
+    """
+    event_id = event_id or uuid.uuid4().hex
+    client = get_redis_client()
+    if client is not None:
+        try:
+            if client.xlen(STREAM) < STREAM_MAX_LEN:
+                client.xadd(
+                    STREAM,
+                    {
+                        "event_id": event_id,
+                        "user_id": int(user_id),
+                        "action_type": action_type,
+                        "metadata": json.dumps(extra_metadata or {}),
+                        "ts": time.time(),
+                    },
+                )
+                return event_id
+            logger.warning("Stream d'usage saturé (>%d), écriture SQL directe", STREAM_MAX_LEN)
+        except Exception as e:
+            logger.warning("Stream d'usage indisponible, écriture SQL directe: %s", e)
+    _add_to_session(user_id, action_type, extra_metadata, event_id)
+    return event_id
+
+
+def _ensure_group(client) -> None:
+    try:
+        client.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+    except Exception as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _row(fields: dict) -> dict:
+    return {
+        "event_id": fields["event_id"],
+        "user_id": int(fields["user_id"]),
+        "action_type": fields["action_type"],
+        "extra_metadata": json.loads(fields.get("metadata") or "{}"),
+        "timestamp": datetime.utcfromtimestamp(float(fields["ts"])),
+    }
+
+
+def _insert(rows: List[dict]) -> None:
+    """INSERT multi-lignes, doublons d'event_id ignorés."""
+    table = UsageMetric.__table__
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        seen = {
+            r[0]
+            for r in db.session.query(UsageMetric.event_id).filter(UsageMetric.event_id.in_([r["event_id"] for r in rows]))
+        }
+        rows = [r for r in rows if r["event_id"] not in seen]
+        if rows:
+            db.session.execute(table.insert(), rows)
+        return
+    db.session.execute(insert(table).values(rows).on_conflict_do_nothing(index_elements=["event_id"]))
+
+
+def _read(client, consumer: str) -> list:
+    """Messages abandonnés par un autre consommateur d'abord, puis nouveaux messages."""
+    try:
+        claimed = client.xautoclaim(STREAM, GROUP, consumer, min_idle_time=CLAIM_IDLE_MS, start_id="0-0", count=FLUSH_BATCH)
+        if claimed and claimed[1]:
+            return claimed[1]
+    except Exception as e:
+        logger.warning("XAUTOCLAIM indisponible: %s", e)
+    result = client.xreadgroup(GROUP, consumer, {STREAM: ">"}, count=FLUSH_BATCH)
+    return result[0][1] if result else []
+
+
+def flush() -> dict:
+    """Insère les événements en attente par lots ; retourne le nombre d'événements traités."""
+    client = get_redis_client()
+    if client is None:
+        return {"flushed": 0}
+    _ensure_group(client)
+    consumer = f"{socket.gethostname()}-{os.getpid()}"
+    flushed = 0
+    for _ in range(_MAX_BATCHES_PER_RUN):
+        messages = _read(client, consumer)
+        if not messages:
+            break
+        # Entrées supprimées entre-temps (champs vides) : simplement acquittées
+        rows = [_row(fields) for _, fields in messages if fields]
+        if rows:
+            try:
+                _insert(rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise  # messages non acquittés : repris au prochain passage
+        ids = [msg_id for msg_id, _ in messages]
+        client.xack(STREAM, GROUP, *ids)
+        client.xdel(STREAM, *ids)
+        flushed += len(rows)
+        if len(messages) < FLUSH_BATCH:
+            break
+    return {"flushed": flushed}
@@ -5,6 +5,8 @@ import logging
 import google.generativeai as genai
 from yt_dlp import YoutubeDL
 
+from backend.telemetry import span, traced
+
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,6 +16,10 @@ class VideoAnalyst:
         self.api_key = os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             logger.warning("⚠️ GEMINI_API_KEY manquant. L'analyse vidéo ne fonctionnera pas.")
+        elif os.getenv("GEMINI_API_BASE"):
+            # Point d'accès alternatif (bouchon local des benchmarks)
+            genai.configure(api_key=self.api_key, transport="rest",
+                            client_options={"api_endpoint": os.getenv("GEMINI_API_BASE").strip()})
         else:
             genai.configure(api_key=self.api_key)
             
@@ -21,6 +27,7 @@ class VideoAnalyst:
         self.temp_dir = os.path.join(os.getcwd(), "temp_videos")
         os.makedirs(self.temp_dir, exist_ok=True)
 
+    @traced('download', provider='yt_dlp')
     def download_video(self, url: str, progress_callback=None) -> str:
         """
         Télécharge une vidéo depuis une URL (YouTube, TikTok, FB, etc.) via yt-dlp.
@@ -65,6 +72,7 @@ class VideoAnalyst:
             if progress_callback: progress_callback(f"❌ Erreur de téléchargement: {str(e)}")
             raise e
 
+    @traced('upload', provider='gemini')
     def upload_to_gemini(self, video_path: str, progress_callback=None):
         """
         Upload le fichier vidéo sur les serveurs Gemini pour analyse.
@@ -124,7 +132,8 @@ class VideoAnalyst:
                     logger.info(f"Tentative avec le modèle : {model_name}")
                     if progress_callback: progress_callback(f"🤖 Interrogation de {model_name.split('/')[-1]}...")
                     model = genai.GenerativeModel(model_name=model_name)
-                    response = model.generate_content([video_file, system_prompt, query])
+                    with span('llm', provider='gemini', model=model_name):
+                        response = model.generate_content([video_file, system_prompt, query])
                     logger.info(f"✅ Succès avec {model_name}")
                     break
                 except Exception as e:
@@ -1,68 +1,180 @@
+import json
+import logging
 import os
 import requests
 import random
 
+from backend.asset_cache import AssetCache, orientation_of
+from backend.downloads import download_file
+from backend.telemetry import traced
+
+logger = logging.getLogger(__name__)
+
+
+class PexelsProvider:
+    """Recherche de vidéos de stock sur l'API Pexels."""
+
+    name = "pexels"
+
+    def __init__(self, api_key: str = None):
+        self.api_key = api_key or os.getenv('PEXELS_API_KEY')
+        self.base_url = os.getenv('PEXELS_API_BASE', 'https://api.pexels.com').rstrip('/')
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    @traced('asset_search', provider='pexels')
+    def search(self, query: str, duration_min: int = 5, orientation: str = 'landscape', per_page: int = 15) -> list:
+        """
+        Retourne les candidats MP4 HD (dicts normalisés) correspondant à la requête.
+        Lève requests.HTTPError si Pexels ne répond pas 200 (quota 429, 5xx…) : une erreur
+        ne doit pas passer pour « aucun résultat » (et finir dans le cache de requêtes).
+        """
+        headers = {'Authorization': self.api_key}
+        params = {'query': query, 'per_page': per_page, 'orientation': orientation}
+        response = requests.get(f"{self.base_url}/videos/search", headers=headers, params=params, timeout=10)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"Erreur Pexels: {response.status_code}", response=response)
+
+        candidates = []
+        for video in response.json().get('videos', []):
+            # Trouver le fichier vidéo MP4 HD
+            video_files = video.get('video_files', [])
+            hd_files = [v for v in video_files if v.get('quality') == 'hd' and v.get('file_type') == 'video/mp4']
+            if not hd_files or video.get('duration', 0) < duration_min:
+                continue
+            # Prendre le meilleur fichier HD disponible
+            best_file = sorted(hd_files, key=lambda x: (x.get('width') or 0) * (x.get('height') or 0), reverse=True)[0]
+            width, height = best_file.get('width'), best_file.get('height')
+            tags = video.get('tags') or [w for w in (video.get('url') or '').rstrip('/').split('/')[-1].split('-') if w.isalpha()]
+            candidates.append({
+                'provider': self.name,
+                'video_id': str(video['id']),
+                'url': best_file['link'],
+                'duration': video.get('duration'),
+                'width': width,
+                'height': height,
+                'orientation': orientation_of(width, height),
+                'tags': tags,
+            })
+        return candidates
+
+
+class LocalFixtureProvider:
+    """
+    Fournisseur hors-ligne (dev / tests) : un dossier de MP4 décrit par `index.json`
+    [{"id": "...", "file": "clip.mp4", "duration": 8, "width": 1080, "height": 1920, "tags": ["business"]}]
+    """
+
+    name = "local"
+
+    def __init__(self, fixture_dir: str = None):
+        self.fixture_dir = os.path.abspath(fixture_dir or os.getenv('ASSET_FIXTURE_DIR', os.path.join('fixtures', 'videos')))
+
+    def available(self) -> bool:
+        return os.path.isfile(os.path.join(self.fixture_dir, 'index.json'))
+
+    def search(self, query: str, duration_min: int = 5, orientation: str = 'landscape', per_page: int = 15) -> list:
+        with open(os.path.join(self.fixture_dir, 'index.json'), 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        words = set(query.lower().split())
+        candidates = []
+        for entry in entries:
+            tags = [t.lower() for t in entry.get('tags', [])]
+            width, height = entry.get('width'), entry.get('height')
+            if words and not words & set(tags):
+                continue
+            if entry.get('duration', 0) < duration_min or orientation_of(width, height) != orientation:
+                continue
+            candidates.append({
+                'provider': self.name,
+                'video_id': str(entry['id']),
+                'url': 'file://' + os.path.join(self.fixture_dir, entry['file']),
+                'duration': entry.get('duration'),
+                'width': width,
+                'height': height,
+                'orientation': orientation_of(width, height),
+                'tags': tags,
+            })
+        return candidates[:per_page]
+
+
+def get_provider(name: str = None):
+    name = (name or os.getenv('VIDEO_ASSET_PROVIDER') or 'pexels').strip().lower()
+    if name == 'local':
+        return LocalFixtureProvider()
+    return PexelsProvider()
+
+
 class VideoAssetManager:
-    """Gère la récupération de ressources vidéo (Stock Footage) via Pexels/Pixabay."""
-    
-    def __init__(self):
+    """Gère la récupération de ressources vidéo (Stock Footage) via Pexels/Pixabay, avec cache disque."""
+
+    def __init__(self, provider=None, cache: AssetCache = None):
         self.pexels_api_key = os.getenv('PEXELS_API_KEY')
         self.pixabay_api_key = os.getenv('PIXABAY_API_KEY')
-    
+        self.provider = provider or get_provider()
+        self.cache = cache or AssetCache()
+
+    def available(self) -> bool:
+        return self.provider.available()
+
+    def search_videos(self, query: str, duration_min: int = 5, orientation: str = 'landscape') -> list:
+        """
+        Candidats pour la requête, servis depuis le cache de requêtes tant que le TTL court.
+        Une erreur du fournisseur renvoie [] sans rien mettre en cache.
+        """
+        key = self.cache.query_key(self.provider.name, query, orientation, duration_min)
+        cached = self.cache.get_query(key)
+        if cached is not None:
+            return cached
+        try:
+            results = self.provider.search(query, duration_min=duration_min, orientation=orientation)
+        except Exception as e:
+            logger.warning("Recherche %s impossible: %s", self.provider.name, e)
+            return []
+        self.cache.put_query(key, results)
+        return results
+
+    def pick(self, candidates: list):
+        """Choix aléatoire, en privilégiant les vidéos déjà présentes sur disque."""
+        if not candidates:
+            return None
+        cached = self.cache.cached_ids(self.provider.name, [c['video_id'] for c in candidates])
+        pool = [c for c in candidates if c['video_id'] in cached] or candidates
+        return random.choice(pool)
+
+    def fetch_video(self, query: str, duration_min: int = 5, orientation: str = 'landscape') -> str:
+        """Cherche puis retourne le chemin local (cache) d'une vidéo pertinente, ou None."""
+        candidate = self.pick(self.search_videos(query, duration_min=duration_min, orientation=orientation))
+        if not candidate:
+            return None
+        try:
+            return self.cache.fetch(candidate)
+        except Exception as e:
+            logger.warning("Erreur téléchargement asset: %s", e)
+            return None
+
     def search_video(self, query: str, duration_min: int = 5, orientation: str = 'landscape') -> str:
         """
         Cherche une vidéo pertinente sur Pexels.
         Retourne l'URL de téléchargement ou None.
-        
+
         Args:
             query: Mots-clés de recherche (en anglais idéalement)
             duration_min: Durée minimale souhaitée (en secondes)
             orientation: 'landscape', 'portrait', or 'square'
         """
-        if not self.pexels_api_key:
-            print("❌ PEXELS_API_KEY manquant.")
+        if not self.provider.available():
+            logger.error("Fournisseur %s non configuré (PEXELS_API_KEY manquant ?).", self.provider.name)
             return None
-            
-        headers = {'Authorization': self.pexels_api_key}
-        url = f"https://api.pexels.com/videos/search?query={query}&per_page=5&orientation={orientation}"
-        
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                videos = data.get('videos', [])
-                
-                # Filtrer par durée et qualité
-                valid_videos = []
-                for video in videos:
-                    # Trouver le fichier vidéo MP4 HD
-                    video_files = video.get('video_files', [])
-                    hd_files = [v for v in video_files if v['quality'] == 'hd' and v['file_type'] == 'video/mp4']
-                    
-                    if hd_files and video['duration'] >= duration_min:
-                        # Prendre le meilleur fichier HD disponible
-                        best_file = sorted(hd_files, key=lambda x: x['width'] * x['height'], reverse=True)[0]
-                        valid_videos.append(best_file['link'])
-                
-                if valid_videos:
-                    return random.choice(valid_videos)
-            else:
-                print(f"Erreur Pexels: {response.status_code}")
-                
-        except Exception as e:
-            print(f"Exception Pexels: {e}")
-            
-        return None
+        candidate = self.pick(self.search_videos(query, duration_min=duration_min, orientation=orientation))
+        return candidate['url'] if candidate else None
 
     def download_asset(self, url: str, target_path: str):
-        """Télécharge le fichier vidéo localement."""
+        """Télécharge le fichier vidéo localement (blocs de 1 Mo, reprise, vérification de taille)."""
         try:
-            with requests.get(url, stream=True) as r:
-                r.raise_for_status()
-                with open(target_path, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
+            download_file(url, target_path)
             return target_path
         except Exception as e:
-            print(f"Erreur téléchargement asset: {e}")
+            logger.warning("Erreur téléchargement asset: %s", e)
             return None
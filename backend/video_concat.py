@@ -0,0 +1,111 @@
+"""
+Assemblage de clips MP4 bout à bout avec ffmpeg (démultiplexeur concat).
+
+Chaque clip est inspecté avec ffprobe (codec, résolution, cadence, format de pixels,
+disposition audio). Specs identiques : copie des flux, sans ré-encodage. Sinon (ou si un
+clip ne peut pas être inspecté), ré-encodage H.264 avec le profil final, chaque clip étant
+ramené à la spec du premier (mise à l'échelle avec bandes, cadence, audio stéréo 48 kHz).
+"""
+import json
+import logging
+import os
+import subprocess
+import tempfile
+from typing import List, Optional
+
+from backend.encode_profiles import FINAL
+from backend.telemetry import traced
+
+logger = logging.getLogger(__name__)
+
+
+def _ffmpeg() -> str:
+    return os.getenv("FFMPEG_BINARY", "ffmpeg")
+
+
+def _ffprobe() -> str:
+    return os.getenv("FFPROBE_BINARY", "ffprobe")
+
+
+def _run(cmd: List[str]) -> None:
+    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=int(os.getenv("VIDEO_CONCAT_TIMEOUT_SEC", "1800")))
+    if proc.returncode != 0:
+        raise RuntimeError((proc.stderr or proc.stdout or "ffmpeg concat failed").strip()[-4000:])
+
+
+def _probe(path: str) -> Optional[dict]:
+    """Spec des flux du clip (ce qui doit être identique pour une copie), ou None si illisible."""
+    cmd = [_ffprobe(), "-v", "error", "-show_streams", "-of", "json", path]
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        streams = (json.loads(proc.stdout or "{}").get("streams") or []) if proc.returncode == 0 else []
+    except (OSError, subprocess.TimeoutExpired, ValueError) as e:
+        logger.warning("ffprobe impossible sur %s: %s", path, e)
+        return None
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        return None
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    return {
+        "codec": video.get("codec_name"),
+        "profile": video.get("profile"),
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "fps": video.get("r_frame_rate"),
+        "pix_fmt": video.get("pix_fmt"),
+        "audio": None
+        if audio is None
+        else (audio.get("codec_name"), audio.get("sample_rate"), audio.get("channels"), audio.get("channel_layout")),
+    }
+
+
+def _fps_value(rate: Optional[str]) -> str:
+    """`r_frame_rate` ffprobe ("24000/1001") réutilisable tel quel par le filtre fps."""
+    return rate if rate and rate != "0/0" else "24"
+
+
+def _reencode_args(first: Optional[dict]) -> List[str]:
+    """Ré-encodage vers la spec du premier clip : les clips hétérogènes deviennent concaténables."""
+    args: List[str] = []
+    if first and first.get("width") and first.get("height"):
+        w, h = first["width"], first["height"]
+        args += [
+            "-vf",
+            f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,"
+            f"setsar=1,fps={_fps_value(first.get('fps'))},format=yuv420p",
+        ]
+    preset = FINAL.write_kwargs().get("preset")
+    args += ["-c:v", FINAL.codec, *(["-preset", preset] if preset else []), *FINAL.ffmpeg_params()]
+    return args + ["-c:a", "aac", "-ar", "48000", "-ac", "2"]
+
+
+@traced("concat", provider="ffmpeg")
+def concat_videos(paths: List[str], output_path: str) -> bool:
+    """
+    Concatène `paths` dans `output_path` (écriture `.part` puis renommage atomique).
+    Retourne True si les flux ont été copiés sans ré-encodage.
+    """
+    if not paths:
+        raise ValueError("Aucun clip à assembler")
+    specs = [_probe(path) for path in paths]
+    copy = specs[0] is not None and all(spec == specs[0] for spec in specs)
+    if not copy:
+        logger.info("Clips de specs différentes (ou illisibles), ré-encodage: %s", specs)
+    part = output_path + ".part.mp4"
+    fd, list_path = tempfile.mkstemp(suffix=".txt")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for path in paths:
+                escaped = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+        base = [_ffmpeg(), "-y", "-f", "concat", "-safe", "0", "-i", list_path]
+        if copy:
+            _run(base + ["-c", "copy", "-movflags", "+faststart", part])
+        else:
+            _run(base + _reencode_args(specs[0]) + ["-movflags", "+faststart", part])
+        os.replace(part, output_path)
+        return copy
+    finally:
+        os.remove(list_path)
+        if os.path.exists(part):
+            os.remove(part)
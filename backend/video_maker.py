@@ -1,8 +1,34 @@
+import logging
 import os
+
+from backend.encode_profiles import profile_from_options
+
+logger = logging.getLogger(__name__)
+
 try:
     from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip, AudioFileClip, concatenate_videoclips
 except ImportError:
-    print("MoviePy not installed or ImageMagick missing.")
+    logger.warning("MoviePy not installed or ImageMagick missing.")
+
+try:
+    from proglog import ProgressBarLogger
+except ImportError:
+    ProgressBarLogger = None
+
+
+def _progress_logger(callback):
+    """Logger proglog qui remonte la fraction de frames encodées à `callback` (ou 'bar' par défaut)."""
+    if not callback or ProgressBarLogger is None:
+        return 'bar'
+
+    class _RenderProgressLogger(ProgressBarLogger):
+        def bars_callback(self, bar, attr, value, old_value=None):
+            if bar == 't' and attr == 'index':
+                total = self.bars[bar].get('total') or 0
+                if total:
+                    callback(min(value / total, 1.0))
+
+    return _RenderProgressLogger()
 
 class VideoMaker:
     """Moteur d'assemblage vidéo utilisant MoviePy."""
@@ -14,23 +40,30 @@ class VideoMaker:
     def create_video(self, assets: list, audio_path: str, subtitles: list, options: dict) -> str:
         """
         Assemble la vidéo finale.
+
+        options: `format` (vertical|horizontal) ou `platform` + `quality` (preview|final),
+        voir `encode_profiles.profile_from_options` ; `progress_callback(fraction)` optionnel
+        (peut lever une exception pour interrompre l'encodage).
         """
+        profile = profile_from_options(options)
         try:
             # 1. Charger Audio
             audio_clip = AudioFileClip(audio_path)
             duration = audio_clip.duration
-            print(f"🎵 Durée audio: {duration}s")
+            logger.info(f"🎵 Durée audio: {duration}s")
 
             # 2. Préparer les clips vidéo
             clips = []
             current_duration = 0
             
-            # Format cible (Vertical 9:16 ou Horizontal 16:9)
-            target_res = (1080, 1920) if options.get('format', 'vertical') == 'vertical' else (1920, 1080)
+            # Format cible (Vertical 9:16 ou Horizontal 16:9), résolution selon le profil
+            target_res = profile.resolution
             target_ratio = target_res[0] / target_res[1]
 
             import random
-            random.shuffle(assets) # Mélanger les stocks
+            # Ordre figé par le manifeste : l'aperçu et le rendu final doivent être identiques
+            if options.get('shuffle', True):
+                random.shuffle(assets) # Mélanger les stocks
             
             # Boucler sur les assets jusqu'à remplir la durée
             while current_duration < duration:
@@ -67,11 +100,12 @@ class VideoMaker:
 
             # 4. Ajouter les Sous-titres (si présents)
             if subtitles:
-                print(f"📝 Ajout de {len(subtitles)} sous-titres...")
+                logger.info(f"📝 Ajout de {len(subtitles)} sous-titres...")
                 subtitle_clips = []
                 
                 # Style des sous-titres
                 fontsize = 70 if target_res[0] < target_res[1] else 50 # Plus gros en vertical
+                fontsize = int(fontsize * max(target_res) / 1920)
                 
                 for sub in subtitles:
                     # sub = {'text': "Mot", 'start': 0.5, 'end': 0.9}
@@ -87,17 +121,14 @@ class VideoMaker:
                 final_video_clip = base_video
 
             # 4. Export
-            filename = f"video_{os.urandom(4).hex()}.mp4"
+            filename = options.get('filename') or f"video_{os.urandom(4).hex()}.mp4"
             output_path = os.path.join(self.output_dir, filename)
             
-            # Threads=2 pour éviter de bloquer le CPU sur petit serveur
+            logger.info(f"🎞️ Encodage profil {profile.name} ({profile.width}x{profile.height} @ {profile.fps}fps, {profile.codec})")
             final_video_clip.write_videofile(
-                output_path, 
-                fps=30, 
-                codec='libx264', 
-                audio_codec='aac', 
-                threads=4,
-                preset='ultrafast' # Pour le test
+                output_path,
+                logger=_progress_logger(options.get('progress_callback')),
+                **profile.write_kwargs()
             )
             
             # Cleanup
@@ -108,5 +139,5 @@ class VideoMaker:
             return output_path
 
         except Exception as e:
-            print(f"❌ Erreur assemblage vidéo: {e}")
+            logger.error(f"❌ Erreur assemblage vidéo: {e}")
             raise e
@@ -0,0 +1,97 @@
+"""
+Pipeline montage (stock + voix) en étapes concurrentes :
+
+    TTS ───────────────────────────────┐
+    recherche kw1 → téléchargement kw1 ├──> assemblage
+    recherche kw2 → téléchargement kw2 ┘
+
+Les étapes indépendantes se chevauchent sous une concurrence bornée
+(VIDEO_PIPELINE_CONCURRENCY, défaut 4) ; l'assemblage démarre dès que
+toutes ses entrées sont prêtes. Les durées par étape sont retournées.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from backend.audio_generator import AudioGenerator
+from backend.video_assets import VideoAssetManager
+
+
+class StageTimings:
+    """Chronométrage thread-safe des étapes ; offsets relatifs au début du pipeline."""
+
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._stages[name] = {
+                    "start_ms": round((start - self._t0) * 1000, 1),
+                    "duration_ms": round((end - start) * 1000, 1),
+                }
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            stages = dict(self._stages)
+        stages["total"] = {"start_ms": 0.0, "duration_ms": round((time.perf_counter() - self._t0) * 1000, 1)}
+        return stages
+
+
+def _max_workers() -> int:
+    return max(1, int(os.getenv("VIDEO_PIPELINE_CONCURRENCY", "4")))
+
+
+def prepare_inputs(
+    script_text: str,
+    keywords: List[str],
+    orientation: str,
+    timings: StageTimings,
+    asset_manager: Optional[VideoAssetManager] = None,
+    temp_dir: str = "temp",
+) -> tuple:
+    """
+    Lance la synthèse vocale et la recherche/téléchargement des stocks en parallèle.
+    Retourne (audio_path, assets) ; les assets suivent l'ordre des mots-clés.
+    """
+    asset_manager = asset_manager or VideoAssetManager()
+    os.makedirs(temp_dir, exist_ok=True)
+    audio_path = os.path.join(temp_dir, f"audio_{os.urandom(4).hex()}.mp3")
+
+    def tts() -> str:
+        with timings.stage("tts"):
+            return AudioGenerator().generate_sync(script_text[:1000], audio_path)
+
+    def asset_for(kw: str) -> Optional[str]:
+        # Recherche puis téléchargement enchaînés : le téléchargement de kw1
+        # n'attend pas la recherche de kw2.
+        with timings.stage(f"search:{kw}"):
+            candidate = asset_manager.pick(asset_manager.search_videos(kw, duration_min=5, orientation=orientation))
+        if not candidate:
+            return None
+        with timings.stage(f"download:{kw}"):
+            try:
+                return asset_manager.cache.fetch(candidate)
+            except Exception as e:
+                print(f"Erreur téléchargement asset ({kw}): {e}")
+                return None
+
+    with ThreadPoolExecutor(max_workers=_max_workers(), thread_name_prefix="video-pipeline") as pool:
+        audio_future = pool.submit(tts)
+        asset_futures = [pool.submit(asset_for, kw) for kw in keywords]
+        assets = [p for p in (f.result() for f in asset_futures) if p]
+        audio_future.result()
+
+    return audio_path, assets
@@ -0,0 +1,190 @@
+"""
+Rendus montage (stock + voix) exécutés par les workers Celery de la file `render`.
+
+L'état de chaque rendu (étape, progression, URLs, demande d'annulation) est stocké
+dans Redis pour être lu par l'API comme par les workers. Le manifeste est un hash (un
+champ JSON par clé) : chaque écriture ne touche que ses champs (HSET), si bien que la
+progression envoyée par le thread de rendu n'écrase jamais un statut posé par l'API.
+    queued → preparing → assembling → preview_ready → final_queued → rendering_final → completed
+                                                      (ou failed / cancelled)
+"""
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Optional
+
+import redis
+
+from backend.redis_client import get_redis_client
+
+VIDEO_DIR = os.path.join("static", "videos")
+RENDER_TTL = int(os.getenv("VIDEO_RENDER_TTL_SEC", str(7 * 24 * 3600)))
+# Aperçu jamais validé : entrées (voix TTS, stocks hors cache) supprimées passé ce délai
+PREVIEW_INPUT_TTL = int(os.getenv("VIDEO_PREVIEW_INPUT_TTL_SEC", str(48 * 3600)))
+
+TERMINAL_STATUSES = ("completed", "failed", "cancelled", "expired")
+
+_redis = None
+
+
+class RenderCancelled(Exception):
+    """Levée dans le worker quand l'utilisateur annule le rendu."""
+
+
+def _client():
+    global _redis
+    if _redis is None:
+        _redis = get_redis_client()
+    if _redis is None:
+        raise RuntimeError("Redis indisponible pour le suivi des rendus")
+    return _redis
+
+
+def render_id_ok(render_id: str) -> bool:
+    return bool(re.match(r"^[a-f0-9]{16}$", render_id or ""))
+
+
+def _key(render_id: str) -> str:
+    return f"video_render:{render_id}:state"
+
+
+def _cancel_key(render_id: str) -> str:
+    return f"video_render:{render_id}:cancel"
+
+
+def create_render(user_id: int, platform: str, params: Optional[dict] = None) -> dict:
+    render_id = os.urandom(8).hex()
+    manifest = {
+        "render_id": render_id,
+        "user_id": user_id,
+        "platform": platform,
+        "params": params or {},
+        "assets": [],
+        "audio_path": None,
+        "subtitles": [],
+        "status": "queued",
+        "stage": "queued",
+        "progress": 0,
+        "created_at": datetime.utcnow().isoformat() + "Z",
+    }
+    _write(manifest)
+    return manifest
+
+
+def _decode(raw: dict) -> Optional[dict]:
+    return {field: json.loads(value) for field, value in raw.items()} if raw else None
+
+
+def load_render(render_id: str) -> Optional[dict]:
+    if not render_id_ok(render_id):
+        return None
+    return _decode(_client().hgetall(_key(render_id)))
+
+
+def update_render(render_id: str, patch: dict) -> dict:
+    """Écrit les seuls champs de `patch` (atomique) ; retourne le manifeste complet."""
+    _, _, raw = _write({"render_id": render_id, **patch}, fetch=True)
+    return _decode(raw)
+
+
+def transition(render_id: str, expected: str, patch: dict) -> Optional[dict]:
+    """
+    Applique `patch` seulement si le statut est encore `expected` (WATCH / MULTI) ;
+    retourne le manifeste à jour, ou None si le statut a changé entre-temps.
+    """
+    key = _key(render_id)
+    with _client().pipeline(transaction=True) as pipe:
+        try:
+            pipe.watch(key)
+            status = pipe.hget(key, "status")
+            if status is None or json.loads(status) != expected:
+                return None
+            pipe.multi()
+            pipe.hset(key, mapping={field: json.dumps(value) for field, value in patch.items()})
+            pipe.expire(key, RENDER_TTL)
+            pipe.hgetall(key)
+            return _decode(pipe.execute()[-1])
+        except redis.WatchError:
+            return None
+
+
+def expire_stale_previews(max_age: Optional[int] = None) -> dict:
+    """Aperçus en attente de validation depuis plus de `max_age` s : entrées supprimées, statut `expired`."""
+    max_age = PREVIEW_INPUT_TTL if max_age is None else max_age
+    client = _client()
+    expired = 0
+    for key in client.scan_iter(match=_key("*"), count=200):
+        render_id = key.split(":")[1]
+        status, ready_at = client.hmget(key, "status", "preview_ready_at")
+        if status is None or json.loads(status) != "preview_ready":
+            continue
+        if ready_at is not None and time.time() - json.loads(ready_at) < max_age:
+            continue
+        # Sans horodatage (rendu antérieur au champ), l'aperçu est traité comme expiré
+        manifest = transition(render_id, "preview_ready", {"status": "expired", "stage": "expired"})
+        if manifest is not None:
+            cleanup_inputs(manifest)
+            expired += 1
+    return {"expired": expired}
+
+
+def set_progress(render_id: str, stage: str, progress: float) -> None:
+    """Met à jour l'étape courante ; lève RenderCancelled si une annulation est demandée."""
+    check_cancel(render_id)
+    update_render(render_id, {"stage": stage, "progress": round(max(0.0, min(progress, 100.0)), 1)})
+
+
+def _write(fields: dict, fetch: bool = False) -> list:
+    key = _key(fields["render_id"])
+    pipe = _client().pipeline(transaction=True)
+    pipe.hset(key, mapping={field: json.dumps(value) for field, value in fields.items()})
+    pipe.expire(key, RENDER_TTL)
+    if fetch:
+        pipe.hgetall(key)
+    return pipe.execute()
+
+
+def request_cancel(render_id: str) -> None:
+    _client().set(_cancel_key(render_id), "1", ex=RENDER_TTL)
+
+
+def check_cancel(render_id: str) -> None:
+    if _client().get(_cancel_key(render_id)):
+        raise RenderCancelled(render_id)
+
+
+def public_view(manifest: dict) -> dict:
+    """Champs exposés au client (sans chemins locaux)."""
+    return {
+        k: manifest.get(k)
+        for k in (
+            "render_id",
+            "platform",
+            "status",
+            "stage",
+            "progress",
+            "preview_url",
+            "final_url",
+            "timings",
+            "error",
+            "created_at",
+            "approved_at",
+            "completed_at",
+        )
+        if manifest.get(k) is not None
+    }
+
+
+def cleanup_inputs(manifest: dict) -> None:
+    """Supprime les fichiers temporaires (audio + stocks hors cache) une fois le rendu final terminé."""
+    from backend.asset_cache import AssetCache
+
+    cache = AssetCache()
+    for path in [manifest.get("audio_path"), *manifest.get("assets", [])]:
+        if path and os.path.isfile(path) and not cache.owns(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -1,3 +1,4 @@
+import hmac
 import os
 import re
 from datetime import datetime
@@ -5,13 +6,13 @@ from datetime import datetime
 from flask import Blueprint, jsonify, request, send_file
 from flask_jwt_extended import jwt_required
 
-from backend.auth_utils import check_usage_limit, get_current_user
+from backend import generation_jobs, quotas
+from backend.auth_utils import get_current_user, reserve_usage
 from backend.database import db
 from backend.saas_models import Script
 
-from .audio_generator import AudioGenerator
 from .video_assets import VideoAssetManager
-from .video_maker import VideoMaker
+from .video_renders import TERMINAL_STATUSES, cleanup_inputs, create_render, load_render, public_view, request_cancel, transition, update_render
 
 video_bp = Blueprint("video", __name__)
 
@@ -20,42 +21,41 @@ def _ltx_filename_ok(fn: str) -> bool:
     return bool(re.match(r"^ltx_\d+_[a-f0-9]+\.mp4$", fn))
 
 
-def _queue_ltx_generation(script: Script, user) -> dict:
-    """Met le script en file Celery pour vidéo IA (format déduit du `script.platform`)."""
+def _queue_ltx_generation(script: Script, user, segmented: bool = False) -> dict:
+    """
+    Met le script en file Celery pour vidéo IA (format déduit du `script.platform`).
+    `segmented` : une scène par marqueur [VISUEL] / [B-ROLL], clips assemblés (vidéo longue).
+    """
     if not os.getenv("LTX_RUNNER_URL"):
         raise ValueError("LTX_RUNNER_URL is not configured")
-    can, msg = check_usage_limit(user.id, "ltx_video_generated")
+    # Réservée ici, confirmée quand la vidéo est enregistrée, libérée si elle échoue
+    can, msg, token = reserve_usage(user.id, "ltx_video_generated")
     if not can:
         raise PermissionError(msg)
-    ltx = (script.extra_metadata or {}).get("ltx_video") or {}
-    if ltx.get("status") in ("queued", "processing"):
+    # Nouvelle vidéo après un succès : pas de reprise de l'ancien job (un échec, lui, reprend à son étape)
+    acquired = generation_jobs.acquire(
+        script,
+        {
+            "mode": "segmented" if segmented else "auto",
+            "queued_at": datetime.utcnow().isoformat() + "Z",
+            "quota_reservation": token,
+        },
+        fresh=False,
+    )
+    if not acquired:
+        quotas.release(user.id, "ltx_video_generated", token)
         raise RuntimeError("ALREADY_RUNNING")
-    meta = dict(script.extra_metadata or {})
-    meta["ltx_video"] = {
-        **ltx,
-        "status": "queued",
-        "mode": "auto",
-        "queued_at": datetime.utcnow().isoformat() + "Z",
-    }
-    script.extra_metadata = meta
-    script.updated_at = datetime.utcnow()
-    db.session.commit()
     try:
         from backend.tasks_ltx import enqueue_ltx_for_script
 
-        enqueue_ltx_for_script(script.id)
+        enqueue_ltx_for_script(script.id, segmented=segmented)
     except Exception as exc:
-        meta = dict(script.extra_metadata or {})
-        meta["ltx_video"] = {
-            **(meta.get("ltx_video") or {}),
-            "status": "failed",
-            "error": f"File d'attente indisponible: {exc}",
-        }
-        script.extra_metadata = meta
-        script.updated_at = datetime.utcnow()
-        db.session.commit()
+        quotas.release(user.id, "ltx_video_generated", token)
+        generation_jobs.update(
+            script.id, {"status": "failed", "error": f"File d'attente indisponible: {exc}", "quota_reservation": None}
+        )
         raise RuntimeError(str(exc)) from exc
-    return meta["ltx_video"]
+    return generation_jobs.view(script.id)
 
 
 @video_bp.route("/config", methods=["GET"])
@@ -72,26 +72,29 @@ def video_config():
 @video_bp.route("/auto", methods=["POST"])
 @jwt_required()
 def video_auto():
-    """Une action simple : générer la vidéo IA pour ce script (format = réseau du script)."""
+    """
+    Une action simple : générer la vidéo IA pour ce script (format = réseau du script).
+    `segmented: true` : vidéo longue assemblée à partir d'un clip par scène.
+    """
     user = get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 401
-    script_id = (request.get_json() or {}).get("script_id")
+    data = request.get_json() or {}
+    script_id = data.get("script_id")
     if not script_id:
         return jsonify({"error": "script_id is required"}), 400
     script = Script.query.filter_by(id=script_id, user_id=user.id).first()
     if not script:
         return jsonify({"error": "Script not found"}), 404
     try:
-        meta = _queue_ltx_generation(script, user)
+        meta = _queue_ltx_generation(script, user, segmented=bool(data.get("segmented")))
     except ValueError as e:
         return jsonify({"error": str(e)}), 503
     except PermissionError as e:
         return jsonify({"error": str(e), "upgrade_required": True}), 403
     except RuntimeError as e:
         if str(e) == "ALREADY_RUNNING":
-            ltx = (script.extra_metadata or {}).get("ltx_video") or {}
-            return jsonify({"error": "Une génération est déjà en cours", "ltx_video": ltx}), 409
+            return jsonify({"error": "Une génération est déjà en cours", "ltx_video": generation_jobs.view(script.id)}), 409
         return jsonify({"error": str(e)}), 503
     return jsonify({"message": "Vidéo en cours de génération", "script_id": script_id, "ltx_video": meta}), 202
 
@@ -100,62 +103,117 @@ def video_auto():
 @jwt_required()
 def generate_video():
     """
-    Génère une vidéo complète à partir d'un script (stock + voix + montage).
+    Met en file un montage complet à partir d'un script (stock + voix + montage).
+
+    Le rendu tourne sur un worker Celery (file `render`) ; suivre la progression via
+    GET /renders/<render_id>. Par défaut un aperçu basse résolution (`quality: "preview"`)
+    est produit ; le rendu final est lancé via POST /renders/<render_id>/approve.
     """
     data = request.json
+    user = get_current_user()
+    if not user:
+        return jsonify({"error": "User not found"}), 401
 
     script_text = data.get("script_text", "")
     keywords = data.get("keywords", ["business", "technology"])
+    platform = data.get("platform", "tiktok")
+    quality = data.get("quality", "preview")
+    if quality not in ("preview", "final"):
+        return jsonify({"error": "quality must be 'preview' or 'final'"}), 400
 
     if not script_text:
         return jsonify({"error": "Script manquant"}), 400
 
-    if not os.getenv("PEXELS_API_KEY"):
+    if not VideoAssetManager().available():
         return jsonify({"error": "Clé API Pexels manquante dans le .env"}), 503
 
     try:
-        print("🔊 Génération Audio...")
-        audio_gen = AudioGenerator()
-        audio_filename = f"audio_{os.urandom(4).hex()}.mp3"
-        audio_path = os.path.join("temp", audio_filename)
-        os.makedirs("temp", exist_ok=True)
-        audio_gen.generate_sync(script_text[:1000], audio_path)
-
-        print("🎥 Recherche Assets Pexels...")
-        asset_manager = VideoAssetManager()
-        assets = []
-        for kw in keywords[:3]:
-            vid_url = asset_manager.search_video(kw, duration_min=5, orientation="portrait")
-            if vid_url:
-                local_vid = os.path.join("temp", f"vid_{kw}_{os.urandom(2).hex()}.mp4")
-                asset_manager.download_asset(vid_url, local_vid)
-                assets.append(local_vid)
-
-        if not assets:
-            return jsonify({"error": "Aucune vidéo trouvée sur Pexels"}), 404
-
-        print("🎬 Assemblage Final...")
-        maker = VideoMaker(output_dir="static/videos")
-        final_video = maker.create_video(
-            assets=assets,
-            audio_path=audio_path,
-            subtitles=[],
-            options={"format": "vertical"},
+        render = create_render(
+            user.id,
+            platform,
+            params={"script_text": script_text, "keywords": keywords[:3], "quality": quality},
         )
+        from backend.tasks_video import enqueue_montage
 
-        video_url = f"/static/videos/{os.path.basename(final_video)}"
+        enqueue_montage(render["render_id"])
+    except Exception as e:
+        print(f"Erreur Génération Vidéo: {e}")
+        return jsonify({"error": f"File d'attente indisponible: {e}"}), 503
 
-        return jsonify(
+    return (
+        jsonify(
             {
-                "status": "success",
-                "video_url": video_url,
-                "message": "Vidéo générée avec succès",
+                "status": "queued",
+                "render": public_view(render),
+                "status_url": f"/api/video/renders/{render['render_id']}",
+                "message": "Vidéo en cours de génération",
             }
-        )
+        ),
+        202,
+    )
 
-    except Exception as e:
-        print(f"Erreur Génération Vidéo: {e}")
-        return jsonify({"error": str(e)}), 500
+
+def _own_render(render_id: str, user):
+    render = load_render(render_id)
+    if not render or render.get("user_id") != user.id:
+        return None
+    return render
+
+
+@video_bp.route("/renders/<render_id>", methods=["GET"])
+@jwt_required()
+def render_status(render_id: str):
+    render = _own_render(render_id, get_current_user())
+    if not render:
+        return jsonify({"error": "Render not found"}), 404
+    return jsonify({"render": public_view(render)}), 200
+
+
+@video_bp.route("/renders/<render_id>/approve", methods=["POST"])
+@jwt_required()
+def approve_render(render_id: str):
+    """Valide l'aperçu : lance le rendu final (haute qualité) en tâche de fond."""
+    render = _own_render(render_id, get_current_user())
+    if not render:
+        return jsonify({"error": "Render not found"}), 404
+    # Transition atomique : l'aperçu a pu expirer (entrées supprimées) entre la lecture et la validation
+    approved = transition(
+        render_id,
+        "preview_ready",
+        {"status": "final_queued", "stage": "queued", "progress": 0, "approved_at": datetime.utcnow().isoformat() + "Z"},
+    )
+    if approved is None:
+        return jsonify({"error": "Render is not awaiting approval", "render": public_view(load_render(render_id) or render)}), 409
+    render = approved
+    try:
+        from backend.tasks_video import enqueue_final_render
+
+        enqueue_final_render(render_id)
+    except Exception as exc:
+        update_render(render_id, {"status": "preview_ready"})
+        return jsonify({"error": f"File d'attente indisponible: {exc}"}), 503
+    return jsonify({"message": "Rendu final en cours", "render": public_view(render)}), 202
+
+
+@video_bp.route("/renders/<render_id>/cancel", methods=["POST"])
+@jwt_required()
+def cancel_render(render_id: str):
+    """Annule un rendu en file ou en cours (arrêt à la prochaine étape / au prochain lot de frames)."""
+    render = _own_render(render_id, get_current_user())
+    if not render:
+        return jsonify({"error": "Render not found"}), 404
+    if render.get("status") in TERMINAL_STATUSES + ("preview_ready",):
+        return jsonify({"error": "Render is not running", "render": public_view(render)}), 409
+
+    request_cancel(render_id)
+    if render.get("status") in ("queued", "final_queued"):
+        from backend.tasks_video import revoke
+
+        revoke(render_id)
+        render = update_render(render_id, {"status": "cancelled", "stage": "cancelled"})
+        # Rendu final jamais démarré : les entrées gardées depuis l'aperçu ne serviront plus
+        cleanup_inputs(render)
+    return jsonify({"message": "Annulation demandée", "render": public_view(render)}), 202
 
 
 @video_bp.route("/ltx/start", methods=["POST"])
@@ -169,10 +227,124 @@ def ltx_start():
 @jwt_required()
 def ltx_status(script_id: int):
     user = get_current_user()
-    script = Script.query.filter_by(id=script_id, user_id=user.id).first()
-    if not script:
+    # Accès indexé à generation_jobs, sans charger le contenu du script
+    exists = db.session.query(Script.id).filter_by(id=script_id, user_id=user.id).first()
+    if not exists:
         return jsonify({"error": "Script not found"}), 404
-    return jsonify({"ltx_video": (script.extra_metadata or {}).get("ltx_video")}), 200
+    return jsonify({"ltx_video": generation_jobs.view(script_id, user.id)}), 200
+
+
+@video_bp.route("/ltx/batch", methods=["POST"])
+@jwt_required()
+def ltx_batch():
+    """
+    Vidéo IA pour un lot de scripts : {script_ids: [...], segmented?}. Les scripts sont mis en file
+    groupés par pipeline / résolution ; suivi agrégé via GET /ltx/batch/<batch_id>.
+    """
+    from backend.ltx_batches import BATCH_MAX, create_batch, spec_group
+
+    user = get_current_user()
+    if not user:
+        return jsonify({"error": "User not found"}), 401
+    if not os.getenv("LTX_RUNNER_URL"):
+        return jsonify({"error": "LTX_RUNNER_URL is not configured"}), 503
+    data = request.get_json() or {}
+    raw_ids = data.get("script_ids") or []
+    try:
+        script_ids = list(dict.fromkeys(int(i) for i in raw_ids))
+    except (TypeError, ValueError):
+        return jsonify({"error": "script_ids must be a list of integers"}), 400
+    if not script_ids:
+        return jsonify({"error": "script_ids is required"}), 400
+    if any(sid <= 0 for sid in script_ids):
+        return jsonify({"error": "script_ids must be positive integers"}), 400
+    if len(script_ids) > BATCH_MAX:
+        return jsonify({"error": f"Too many scripts (max {BATCH_MAX})"}), 400
+
+    scripts = Script.query.filter(Script.id.in_(script_ids), Script.user_id == user.id).all()
+    found = {s.id for s in scripts}
+    rejected = {sid: "Script not found" for sid in script_ids if sid not in found}
+    statuses = {sid: 404 for sid in rejected}  # code HTTP de chaque refus, comme pour /auto
+    queued = []
+    for script in sorted(scripts, key=lambda s: (spec_group(s.platform), script_ids.index(s.id))):
+        try:
+            _queue_ltx_generation(script, user, segmented=bool(data.get("segmented")))
+            queued.append(script.id)
+        except PermissionError as e:
+            rejected[script.id], statuses[script.id] = str(e), 403
+        except RuntimeError as e:
+            if str(e) == "ALREADY_RUNNING":
+                queued.append(script.id)  # déjà en file : suivi dans le lot quand même
+            else:
+                rejected[script.id], statuses[script.id] = str(e), 503
+        except ValueError as e:
+            rejected[script.id], statuses[script.id] = str(e), 503
+    if not queued:
+        # Refus du plan d'abord (actionnable par l'utilisateur), puis file indisponible, sinon introuvables
+        status = next(code for code in (403, 503, 404) if code in statuses.values())
+        body = {"error": "Aucun script mis en file", "rejected": rejected}
+        if status == 403:
+            body["upgrade_required"] = True
+        return jsonify(body), status
+
+    try:
+        batch = create_batch(user.id, queued, rejected)
+    except Exception as e:
+        return jsonify({"error": str(e), "queued": queued, "rejected": rejected}), 503
+    return (
+        jsonify(
+            {
+                "batch_id": batch["batch_id"],
+                "queued": queued,
+                "rejected": rejected,
+                "status_url": f"/api/video/ltx/batch/{batch['batch_id']}",
+            }
+        ),
+        202,
+    )
+
+
+@video_bp.route("/ltx/batch/<batch_id>", methods=["GET"])
+@jwt_required()
+def ltx_batch_status(batch_id: str):
+    from backend.ltx_batches import batch_progress, load_batch
+
+    user = get_current_user()
+    try:
+        batch = load_batch(batch_id)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+    if not batch or batch.get("user_id") != user.id:
+        return jsonify({"error": "Batch not found"}), 404
+    return jsonify(batch_progress(batch, user.id)), 200
+
+
+@video_bp.route("/ltx/callback/<int:script_id>", methods=["POST"])
+def ltx_callback(script_id: int):
+    """Webhook du runner LTX (fin de job) : enfile la phase 2 (téléchargement + stockage)."""
+    expected = (os.getenv("LTX_CALLBACK_TOKEN") or "").strip()
+    auth = request.headers.get("Authorization", "")
+    got = auth.split(" ", 1)[1].strip() if auth.startswith("Bearer ") else ""
+    if not expected or not hmac.compare_digest(got, expected):
+        return jsonify({"error": "Invalid callback token"}), 401
+
+    payload = request.get_json() or {}
+    job_id = payload.get("job_id")
+    if not job_id or payload.get("status") not in ("completed", "failed"):
+        return jsonify({"error": "job_id and a final status are required"}), 400
+
+    ltx = generation_jobs.view(script_id) or {}
+    if ltx.get("runner_job_id") != job_id:
+        # Job inconnu ou remplacé : accuser réception pour stopper les renvois
+        return jsonify({"status": "ignored"}), 200
+
+    try:
+        from backend.tasks_ltx import enqueue_ltx_finalize
+
+        enqueue_ltx_finalize(script_id, job_id, payload)
+    except Exception as exc:
+        return jsonify({"error": f"File d'attente indisponible: {exc}"}), 503
+    return jsonify({"status": "accepted"}), 202
 
 
 @video_bp.route("/ltx/result/<int:script_id>", methods=["GET"])
@@ -184,7 +356,7 @@ def ltx_result(script_id: int):
     if not script:
         return jsonify({"error": "Script not found"}), 404
 
-    ltx = (script.extra_metadata or {}).get("ltx_video") or {}
+    ltx = generation_jobs.view(script.id) or {}
     if ltx.get("status") != "completed":
         return jsonify({"error": "Video not ready", "ltx_video": ltx}), 409
 
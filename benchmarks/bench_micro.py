@@ -0,0 +1,79 @@
+"""
+Micro-benchmarks (pytest-benchmark) des fonctions CPU du pipeline de script :
+extraction des sources, nettoyage, temps de lecture, prompt LTX et rendu PDF.
+
+  cd benchmarks && python -m pytest bench_micro.py --benchmark-json=../results/micro.json
+  python benchmarks/report.py --micro results/micro.json
+
+Entrées synthétiques de taille réaliste (script long format ~2 500 mots, recherche de
+~20 sources) ; aucun appel réseau. `save_to_pdf` écrit dans le dossier temporaire,
+chaque PDF produit est supprimé.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main  # noqa: E402
+from backend.ltx_prompt import script_to_ltx_prompt  # noqa: E402
+
+_SECTION = """## Partie {i} : pourquoi ça marche
+
+[VISUEL] Plan large d'un bureau lumineux, café fumant, carnet ouvert.
+
+**ACCROCHE** : 80 % des gens abandonnent leurs bonnes résolutions en février — et si le problème venait du système, pas de la motivation ?
+
+Les chercheurs de l'université de Londres ont suivi 96 volontaires pendant 12 semaines : il faut en moyenne 66 jours pour ancrer une habitude. « La régularité compte plus que l'intensité », résume l'étude.
+
+[B-ROLL / VISUEL] Calendrier qui se remplit de coches vertes, accéléré.
+
+Concrètement : choisissez un déclencheur existant, associez-y une action de deux minutes, et célébrez immédiatement. C'est la méthode du *habit stacking* popularisée par James Clear.
+"""
+
+SCRIPT = "# Le système des petites habitudes\n\n" + "\n".join(_SECTION.format(i=i) for i in range(1, 21))
+
+RESEARCH = "\n\n".join(
+    f"Source: https://www.example{i}.com/article/habitudes-{i}\n"
+    f"Titre: Étude n°{i} sur la formation des habitudes\n"
+    f"Résumé: Résultats publiés en 202{i % 5}, échantillon de {100 + i} participants."
+    for i in range(1, 21)
+) + "\n\n" + "\n".join(f"[{i}] https://doi.org/10.1000/{i} - Article scientifique {i}" for i in range(1, 11))
+
+
+def bench_extract_sources(benchmark):
+    sources = benchmark(main.extract_sources, RESEARCH)
+    assert sources
+
+
+def bench_sanitize_text(benchmark):
+    cleaned = benchmark(main.sanitize_text, SCRIPT)
+    assert cleaned
+
+
+def bench_estimate_reading_time(benchmark):
+    estimate = benchmark(main.estimate_reading_time, SCRIPT)
+    assert estimate
+
+
+@pytest.mark.parametrize("platform", ["youtube", "tiktok"])
+def bench_script_to_ltx_prompt(benchmark, platform):
+    prompt = benchmark(script_to_ltx_prompt, SCRIPT, title="Le système des petites habitudes", platform=platform)
+    assert prompt
+
+
+def bench_save_to_pdf(benchmark):
+    sources = main.extract_sources(RESEARCH)
+
+    def render():
+        path = main.save_to_pdf(SCRIPT, title="Le système des petites habitudes", author="Bench",
+                                channel="Bench", sources=sources)
+        if path and os.path.exists(path):
+            os.remove(path)
+        return path
+
+    # Rendu coûteux (polices, mise en page) : peu de tours
+    path = benchmark.pedantic(render, rounds=10, iterations=1, warmup_rounds=1)
+    assert path
@@ -0,0 +1,155 @@
+"""
+Scénario de charge : requêtes simultanées sur une route à attente d'E/S, pour comparer
+les modes gunicorn (voir backend/gunicorn.conf.py).
+
+Démarrer l'API avec la route de test, dans chaque mode (depuis la racine du dépôt) :
+  LOADTEST_ENDPOINTS=1 GUNICORN_WORKER_CLASS=sync    gunicorn -c backend/gunicorn.conf.py backend.app_saas:app
+  LOADTEST_ENDPOINTS=1 GUNICORN_WORKER_CLASS=gthread gunicorn -c backend/gunicorn.conf.py backend.app_saas:app
+  LOADTEST_ENDPOINTS=1 GUNICORN_WORKER_CLASS=gevent  gunicorn -c backend/gunicorn.conf.py backend.app_saas:app
+
+Puis :
+  python benchmarks/concurrency_load.py --url http://localhost:5000/health/slow?ms=1000 -c 200 -n 1000
+
+Avec 4 workers sync, le débit plafonne à ~4 req/s pour 1 s d'attente ; en gthread
+(4 x 32) ou gevent, il suit la concurrence demandée.
+
+Routes de génération réelles, fournisseurs remplacés par les bouchons (benchmarks/stubs.py,
+API lancée avec les variables de benchmarks/README.md, section 2) :
+  python benchmarks/concurrency_load.py --scenario topics  --base http://localhost:5000 -c 200 -n 1000
+  python benchmarks/concurrency_load.py --scenario scripts --base http://localhost:5000 -c 100 -n 500
+
+- topics  : POST /generate-topics anonyme (appel Ollama bouchonné, sans base).
+- scripts : POST /api/scripts authentifié (JWT, quota, appel Ollama bouchonné, écriture
+            en base) : exerce aussi le pool SQLAlchemy (DB_POOL_SIZE, voir database.py).
+            Un compte free par thread client, remplacé quand son quota est atteint.
+
+`--json results/load.json` : rapport machine (fusionnable par benchmarks/report.py).
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+_local = threading.local()
+
+
+def _request(url: str, timeout: float, body: Optional[dict] = None, token: Optional[str] = None) -> tuple:
+    """(statut HTTP, JSON décodé ou None) ; statut 0 si la connexion échoue."""
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers=headers, method='POST' if data else 'GET')
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            status, raw = resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        status, raw = e.code, e.read()
+    except Exception:
+        return 0, None
+    try:
+        return status, json.loads(raw) if raw else None
+    except ValueError:
+        return status, None
+
+
+def _hit(url: str, timeout: float) -> tuple:
+    start = time.perf_counter()
+    status, _ = _request(url, timeout)
+    return 200 <= status < 300, time.perf_counter() - start
+
+
+def _register(base: str, timeout: float) -> Optional[str]:
+    email = f'load-{uuid.uuid4().hex[:12]}@example.com'
+    status, payload = _request(
+        f'{base}/api/auth/register', timeout, {'email': email, 'password': 'load-password', 'name': 'Load'}
+    )
+    return (payload or {}).get('access_token') if status == 201 else None
+
+
+def _hit_topics(base: str, timeout: float) -> tuple:
+    start = time.perf_counter()
+    status, _ = _request(f'{base}/generate-topics', timeout, {'theme': 'productivité', 'platform': 'youtube'})
+    return status == 200, time.perf_counter() - start
+
+
+def _hit_scripts(base: str, timeout: float) -> tuple:
+    body = {'topic': 'Trois habitudes pour mieux dormir', 'platform': 'youtube', 'auto_generate_video': False}
+    for _ in range(2):  # au plus un nouveau compte si le quota du plan free est atteint
+        if getattr(_local, 'token', None) is None:
+            _local.token = _register(base, timeout)  # hors mesure : seule la génération est chronométrée
+            if _local.token is None:
+                return False, 0.0
+        start = time.perf_counter()
+        status, payload = _request(f'{base}/api/scripts', timeout, body, _local.token)
+        elapsed = time.perf_counter() - start
+        if status == 403 and (payload or {}).get('upgrade_required'):
+            _local.token = None
+            continue
+        return status == 201, elapsed
+    return False, elapsed
+
+
+SCENARIOS = {'topics': _hit_topics, 'scripts': _hit_scripts}
+
+
+def _pct(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+
+def run(url: str, concurrency: int, total: int, timeout: float, scenario: Optional[str] = None) -> dict:
+    if scenario:
+        base = url.rstrip('/')
+        hit = lambda _: SCENARIOS[scenario](base, timeout)  # noqa: E731
+    else:
+        hit = lambda _: _hit(url, timeout)  # noqa: E731
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(hit, range(total)))
+    elapsed = time.perf_counter() - started
+    latencies = [lat for ok, lat in results if ok]
+    return {
+        'url': url,
+        'scenario': scenario or 'url',
+        'requests': total,
+        'errors': total - len(latencies),
+        'elapsed_sec': round(elapsed, 2),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(_pct(latencies, 50) * 1000),
+        'p95_ms': round(_pct(latencies, 95) * 1000),
+        'p99_ms': round(_pct(latencies, 99) * 1000),
+        'mean_ms': round(statistics.mean(latencies) * 1000) if latencies else 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://localhost:5000/health/slow?ms=1000')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), help='route de génération (au lieu de --url)')
+    parser.add_argument('--base', default='http://localhost:5000', help='racine de l\'API pour --scenario')
+    parser.add_argument('-c', '--concurrency', type=int, default=100)
+    parser.add_argument('-n', '--requests', type=int, default=500)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--json', help='écrit aussi le rapport en JSON dans ce fichier')
+    args = parser.parse_args()
+
+    url = args.base if args.scenario else args.url
+    report = run(url, args.concurrency, args.requests, args.timeout, args.scenario)
+    for key, value in report.items():
+        print(f"{key:>15}: {value}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
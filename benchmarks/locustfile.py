@@ -0,0 +1,145 @@
+"""
+Scénarios de charge Locust sur l'API (backend/app_saas.py) branchée sur les bouchons
+(benchmarks/stubs.py) : aucun fournisseur réel n'est appelé.
+
+  python benchmarks/stubs.py &
+  OLLAMA_BASE_URL=http://127.0.0.1:8900 GEMINI_API_BASE=http://127.0.0.1:8900 GEMINI_API_KEY=bench \\
+  PEXELS_API_BASE=http://127.0.0.1:8900 PEXELS_API_KEY=bench LTX_RUNNER_URL=http://127.0.0.1:8900 \\
+    gunicorn -c backend/gunicorn.conf.py backend.app_saas:app
+  locust -f benchmarks/locustfile.py --host http://localhost:5000 --headless -u 50 -r 10 -t 2m \\
+    --csv results/load --tags topics scripts
+
+Scénarios (tags) : topics, scripts, export, video, analysis. Sans --tags, tous tournent
+selon leurs poids. Chaque utilisateur virtuel crée son compte (plan free) ; quand un quota
+est atteint (403 upgrade_required), il repart sur un compte neuf plutôt que de mesurer
+des refus.
+
+Résultats p50/p95/p99 : `python benchmarks/report.py --locust results/load_stats.csv`.
+"""
+import os
+import uuid
+
+from locust import HttpUser, between, tag, task
+
+PLATFORMS = ("youtube", "tiktok", "instagram", "facebook")
+LTX_POLL_MAX = int(os.getenv("BENCH_LTX_POLL_MAX", "20"))
+
+_SCRIPT = """# Trois habitudes pour mieux dormir
+
+[VISUEL] Chambre baignée d'une lumière douce, réveil qui affiche 23h.
+
+**ACCROCHE** : Vous dormez 8 heures et vous êtes toujours fatigué ? Voici pourquoi.
+
+[B-ROLL / VISUEL] Graphiques des cycles de sommeil.
+
+Selon une étude de 2023 (https://example.com/sommeil), la régularité compte plus que la durée.
+""" * 4
+
+
+class ScriptyUser(HttpUser):
+    wait_time = between(1, 3)
+
+    def on_start(self):
+        self._register()
+
+    def _register(self):
+        email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+        with self.client.post(
+            "/api/auth/register",
+            json={"email": email, "password": "bench-password", "name": "Bench"},
+            name="/api/auth/register",
+            catch_response=True,
+        ) as resp:
+            if resp.status_code != 201:
+                resp.failure(f"register: {resp.status_code}")
+                self.token = None
+                return
+            self.token = resp.json()["access_token"]
+        self.script_ids = []
+
+    @property
+    def _auth(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"} if self.token else {}
+
+    def _quota_hit(self, resp) -> bool:
+        """Quota du plan free atteint : compte neuf, la requête n'est pas comptée en échec."""
+        if resp.status_code == 403 and (resp.json() or {}).get("upgrade_required"):
+            resp.success()
+            self._register()
+            return True
+        return False
+
+    @tag("topics")
+    @task(3)
+    def topics(self):
+        self.client.post(
+            "/generate-topics",
+            json={"theme": "productivité", "platform": PLATFORMS[uuid.uuid4().int % 4]},
+            headers=self._auth,
+            name="/generate-topics",
+        )
+
+    @tag("scripts")
+    @task(3)
+    def scripts(self):
+        with self.client.post(
+            "/api/scripts",
+            json={"topic": "Trois habitudes pour mieux dormir", "platform": "youtube", "auto_generate_video": False},
+            headers=self._auth,
+            name="/api/scripts [POST]",
+            catch_response=True,
+        ) as resp:
+            if self._quota_hit(resp):
+                return
+            if resp.status_code != 201:
+                resp.failure(f"create_script: {resp.status_code}")
+                return
+            self.script_ids.append(resp.json()["script"]["id"])
+        self.client.get("/api/scripts?view=summary&limit=20", headers=self._auth, name="/api/scripts?view=summary")
+
+    @tag("export")
+    @task(2)
+    def export(self):
+        self.client.post(
+            "/export-pdf",
+            json={"script": _SCRIPT, "title": "Mieux dormir", "platform": "youtube"},
+            headers=self._auth,
+            name="/export-pdf",
+        )
+
+    @tag("video")
+    @task(1)
+    def video(self):
+        if not self.script_ids:
+            return self.scripts()
+        script_id = self.script_ids.pop()
+        with self.client.post(
+            "/api/video/auto",
+            json={"script_id": script_id},
+            headers=self._auth,
+            name="/api/video/auto",
+            catch_response=True,
+        ) as resp:
+            if self._quota_hit(resp):
+                return
+            if resp.status_code not in (202, 409):
+                resp.failure(f"video_auto: {resp.status_code}")
+                return
+        for _ in range(LTX_POLL_MAX):
+            resp = self.client.get(
+                f"/api/video/ltx/status/{script_id}", headers=self._auth, name="/api/video/ltx/status/[id]"
+            )
+            status = ((resp.json() or {}).get("ltx_video") or {}).get("status") if resp.ok else None
+            if status in ("completed", "failed", None):
+                break
+            self.wait()
+
+    @tag("analysis")
+    @task(1)
+    def analysis(self):
+        self.client.post(
+            "/api/analyze/chat",
+            json={"query": "Quel est le hook de cette vidéo ?", "file_name": "files/bench"},
+            headers=self._auth,
+            name="/api/analyze/chat",
+        )
@@ -0,0 +1,89 @@
+"""
+Budget de requêtes SQL des pages admin (non-régression N+1, voir backend/query_counter.py).
+
+Application complète (backend/app_saas.py) sur SQLite en mémoire, 60 comptes avec
+abonnement et scripts, appels via le client de test Flask dans `assert_max_queries` :
+
+  python benchmarks/query_budget.py
+
+Budgets (requêtes propres à l'endpoint, + 1 pour charger l'admin quand les claims du JWT
+ne peuvent pas être vérifiés, c.-à-d. sans Redis) :
+  GET /api/admin/users?per_page=50   3  (page avec abonnements joints, total, scripts par compte)
+  GET /api/admin/activity            2  (scripts récents avec auteur, inscriptions récentes)
+
+Code de sortie 1 si un budget est dépassé (requêtes listées).
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Avant l'import de l'application : la base est choisie à l'initialisation
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+from backend.app_saas import app  # noqa: E402
+from backend.database import db  # noqa: E402
+from backend.identity import ACCESS_TTL, claims_for  # noqa: E402
+from backend.query_counter import assert_max_queries  # noqa: E402
+from backend.redis_client import get_redis_client  # noqa: E402
+from backend.saas_models import Script, Subscription, User  # noqa: E402
+
+USERS = 60
+SCRIPTS_PER_USER = 3
+
+BUDGETS = (
+    ('/api/admin/users?per_page=50', 3),
+    ('/api/admin/activity', 2),
+)
+
+
+def _seed() -> User:
+    admin = User(email='admin@example.com', name='Admin', password_hash='-', is_admin=True)
+    db.session.add(admin)
+    for i in range(USERS):
+        user = User(email=f'user{i}@example.com', name=f'User {i}', password_hash='-')
+        user.subscription = Subscription(plan_type=('free', 'pro', 'enterprise')[i % 3])
+        db.session.add(user)
+        for j in range(SCRIPTS_PER_USER):
+            user.scripts.append(Script(platform='youtube', title=f'Script {i}-{j}', content='...'))
+    db.session.commit()
+    return admin
+
+
+def _redis_up() -> bool:
+    client = get_redis_client()
+    try:
+        return client is not None and bool(client.ping())
+    except Exception:
+        return False
+
+
+def main() -> int:
+    failures = 0
+    with app.app_context():
+        admin = _seed()
+        token = create_access_token(identity=admin.id, expires_delta=ACCESS_TTL, additional_claims=claims_for(admin))
+        # Sans Redis, les claims ne font pas foi : l'admin est relu en base (une requête)
+        auth_queries = 0 if _redis_up() else 1
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    for path, budget in BUDGETS:
+        limit = budget + auth_queries
+        try:
+            with assert_max_queries(limit) as counter:
+                response = client.get(path, headers=headers)
+            if response.status_code != 200:
+                raise AssertionError(f"HTTP {response.status_code}: {response.get_data(as_text=True)[:200]}")
+            print(f"✅ {path}: {counter.count} requête(s) SQL (max {limit})")
+        except AssertionError as e:
+            failures += 1
+            print(f"❌ {path}: {e}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""
+Rapport machine : fusionne les résultats des benchmarks en un JSON p50 / p95 / p99 (ms).
+
+Sources acceptées :
+  --locust  <prefix>_stats.csv      (locust --csv <prefix>)
+  --micro   <fichier>.json          (pytest --benchmark-json, avec --benchmark-save-data)
+  --load    <fichier>.json          (concurrency_load.py --json)
+
+  python benchmarks/report.py --locust results/load_stats.csv --micro results/micro.json \\
+    -o results/report.json
+
+Sortie : {"generated_at", "git_commit", "results": [{"suite", "name", "count", "errors",
+"p50_ms", "p95_ms", "p99_ms", "mean_ms", "rps"}]}. Sans -o, le JSON est écrit sur stdout.
+"""
+import argparse
+import csv
+import json
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def _pct(values: list, p: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 4) if seconds is not None else None
+
+
+def _num(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None  # Locust écrit "N/A" sans requête
+
+
+def from_locust(path: str) -> list:
+    rows = []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            rows.append({
+                'suite': 'locust',
+                'name': f"{row['Type']} {row['Name']}".strip() if row['Name'] != 'Aggregated' else 'Aggregated',
+                'count': int(row['Request Count']),
+                'errors': int(row['Failure Count']),
+                'p50_ms': _num(row['50%']),
+                'p95_ms': _num(row['95%']),
+                'p99_ms': _num(row['99%']),
+                'mean_ms': _num(row['Average Response Time']),
+                'rps': _num(row['Requests/s']),
+            })
+    return rows
+
+
+def from_micro(path: str) -> list:
+    with open(path) as f:
+        data = json.load(f)
+    rows = []
+    for bench in data.get('benchmarks', []):
+        stats = bench['stats']
+        samples = stats.get('data') or []
+        rows.append({
+            'suite': 'micro',
+            'name': bench['name'],
+            'count': stats['rounds'],
+            'errors': 0,
+            'p50_ms': _ms(_pct(samples, 50) if samples else stats['median']),
+            'p95_ms': _ms(_pct(samples, 95)),
+            'p99_ms': _ms(_pct(samples, 99)),
+            'mean_ms': _ms(stats['mean']),
+            'rps': round(stats['ops'], 1),
+        })
+    return rows
+
+
+def from_load(path: str) -> list:
+    with open(path) as f:
+        data = json.load(f)
+    return [{
+        'suite': 'load',
+        'name': data.get('url', 'load'),
+        'count': data['requests'],
+        'errors': data['errors'],
+        'p50_ms': data['p50_ms'],
+        'p95_ms': data['p95_ms'],
+        'p99_ms': data['p99_ms'],
+        'mean_ms': data['mean_ms'],
+        'rps': data['throughput_rps'],
+    }]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def build(locust: list = (), micro: list = (), load: list = ()) -> dict:
+    results = []
+    for paths, reader in ((locust, from_locust), (micro, from_micro), (load, from_load)):
+        for path in paths or ():
+            results.extend(reader(path))
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': _git_commit(),
+        'results': results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--locust', action='append', default=[])
+    parser.add_argument('--micro', action='append', default=[])
+    parser.add_argument('--load', action='append', default=[])
+    parser.add_argument('-o', '--output')
+    args = parser.parse_args()
+
+    report = build(args.locust, args.micro, args.load)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+        print(f"📊 {len(report['results'])} résultat(s) -> {args.output}")
+    else:
+        sys.stdout.write(text + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+Serveur de bouchons hors-ligne pour les benchmarks : Ollama, Gemini (REST), Pexels et
+runner LTX sur un seul port, avec latence configurable. Aucun appel réseau externe,
+aucune clé réelle.
+
+Pointer l'API dessus :
+  OLLAMA_BASE_URL=http://127.0.0.1:8900  SCRIPT_PROVIDER=ollama
+  GEMINI_API_BASE=http://127.0.0.1:8900  GEMINI_API_KEY=bench
+  PEXELS_API_BASE=http://127.0.0.1:8900  PEXELS_API_KEY=bench
+  LTX_RUNNER_URL=http://127.0.0.1:8900
+
+Le vrai runner en mode démo (LTX_MOCK=1, ffmpeg) reste utilisable à la place du bouchon
+LTX pour mesurer aussi l'encodage.
+
+Routes :
+  POST /api/generate                                   Ollama (topics JSON ou script)
+  POST /v1beta/models/<modèle>:generateContent         Gemini
+  GET  /v1beta/models, /v1beta/files/<nom>             Gemini (liste, fichiers « ACTIVE »)
+  GET  /videos/search, /media/clip.mp4                 Pexels
+  POST /v1/jobs ; GET /v1/jobs/<id>[?wait=s], /v1/jobs/<id>/file ; POST /v1/jobs/<id>/ack
+  GET  /health
+
+Env :
+  STUB_HOST               défaut 127.0.0.1
+  STUB_PORT               défaut 8900
+  STUB_LATENCY_MS         défaut 200 (latence de base de chaque réponse)
+  STUB_JITTER_MS          défaut 50 (± aléatoire)
+  STUB_<P>_LATENCY_MS     par fournisseur : OLLAMA, GEMINI, PEXELS, LTX
+  STUB_LTX_RENDER_MS      défaut 3000 (durée simulée d'un rendu LTX)
+  STUB_MEDIA_FILE         MP4 servi pour Pexels / LTX (défaut : octets synthétiques)
+  STUB_MEDIA_KB           défaut 512 (taille des octets synthétiques)
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+_SCRIPT = """# {title}
+
+[VISUEL] Plan serré sur un créateur face caméra, lumière chaude, ambiance studio.
+
+**ACCROCHE** : Et si tout ce que vous saviez sur {title} était faux ?
+
+[B-ROLL / VISUEL] Montage rapide de graphiques animés et de chiffres clés.
+
+Dans cette vidéo, on décortique les trois idées qui changent vraiment la donne.
+Source : https://example.com/etude-2024 et https://example.org/rapport.
+
+[VISUEL] Retour face caméra, sourire complice, zoom lent.
+
+**CONCLUSION** : Abonnez-vous pour la suite, et dites-moi en commentaire ce que vous en pensez.
+"""
+
+
+def _latency_ms(provider: str) -> float:
+    base = float(os.getenv(f"STUB_{provider.upper()}_LATENCY_MS", os.getenv("STUB_LATENCY_MS", "200")))
+    jitter = float(os.getenv("STUB_JITTER_MS", "50"))
+    return max(0.0, base + random.uniform(-jitter, jitter))
+
+
+def _media() -> bytes:
+    path = os.getenv("STUB_MEDIA_FILE")
+    if path and os.path.isfile(path):
+        with open(path, "rb") as f:
+            return f.read()
+    size = int(os.getenv("STUB_MEDIA_KB", "512")) * 1024
+    return (b"\x00\x00\x00\x18ftypmp42" + bytes(range(256)) * (size // 256 + 1))[:size]
+
+
+def _topics(theme: str) -> dict:
+    return {
+        "topics": [
+            {
+                "title": f"{theme} : idée #{i}",
+                "angle": "Angle contre-intuitif",
+                "why_interesting": "Sujet recherché, peu couvert",
+                "key_points": ["Point 1", "Point 2", "Point 3"],
+                "target_audience": "Créateurs débutants",
+                "estimated_duration": "8-10 minutes",
+            }
+            for i in range(1, 7)
+        ]
+    }
+
+
+def _completion(prompt: str) -> str:
+    """Réponse plausible selon la nature du prompt (topics en JSON, sinon un script)."""
+    match = re.search(r"(?:thème|theme|sujet|topic)\s*[:\"«]\s*([^\n\"»]{3,80})", prompt, re.IGNORECASE)
+    subject = (match.group(1) if match else "le sujet").strip()
+    if re.search(r"\btopics?\b|\bsujets\b", prompt, re.IGNORECASE) and "json" in prompt.lower():
+        return json.dumps(_topics(subject), ensure_ascii=False)
+    return _SCRIPT.format(title=subject)
+
+
+class _LtxJobs:
+    """Jobs LTX simulés : terminés STUB_LTX_RENDER_MS après leur création."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, body: dict) -> dict:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {"created": time.monotonic(), "platform": body.get("platform", "youtube")}
+        return {"job_id": job_id, "status": "queued", "position": 0}
+
+    def status(self, job_id: str, media: bytes) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        render = float(os.getenv("STUB_LTX_RENDER_MS", "3000")) / 1000
+        if time.monotonic() - job["created"] < render:
+            return {"job_id": job_id, "status": "running", "platform": job["platform"], "mock": True}
+        return {
+            "job_id": job_id,
+            "status": "completed",
+            "platform": job["platform"],
+            "mock": True,
+            "size_bytes": len(media),
+            "sha256": hashlib.sha256(media).hexdigest(),
+        }
+
+    def remaining(self, job_id: str) -> float:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return 0.0
+        render = float(os.getenv("STUB_LTX_RENDER_MS", "3000")) / 1000
+        return max(0.0, render - (time.monotonic() - job["created"]))
+
+    def forget(self, job_id: str) -> None:
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = "ScriptyStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        if os.getenv("STUB_VERBOSE") == "1":
+            super().log_message(fmt, *args)
+
+    # --- utilitaires -----------------------------------------------------
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def _send(self, status: int, payload=None, raw: bytes = None, content_type: str = "application/json"):
+        data = raw if raw is not None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _sleep(self, provider: str):
+        time.sleep(_latency_ms(provider) / 1000)
+
+    # --- routes ----------------------------------------------------------
+    def do_GET(self):
+        url = urlparse(self.path)
+        path, query = url.path, parse_qs(url.query)
+        media = self.server.media
+
+        if path == "/health":
+            return self._send(200, {"status": "ok", "stub": True})
+        if path == "/v1beta/models":
+            self._sleep("gemini")
+            return self._send(200, {"models": [{"name": "models/gemini-1.5-flash", "supportedGenerationMethods": ["generateContent"]}]})
+        if path.startswith("/v1beta/files/"):
+            self._sleep("gemini")
+            name = path[len("/v1beta/"):]
+            return self._send(200, {
+                "name": name,
+                "uri": f"http://{self.headers.get('Host')}/v1beta/{name}",
+                "mimeType": "video/mp4",
+                "state": "ACTIVE",
+            })
+        if path == "/videos/search":
+            self._sleep("pexels")
+            term = (query.get("query") or ["stock"])[0]
+            per_page = int((query.get("per_page") or ["15"])[0])
+            link = f"http://{self.headers.get('Host')}/media/clip.mp4"
+            videos = [
+                {
+                    "id": 1000 + i,
+                    "duration": 8 + i % 5,
+                    "url": f"https://www.pexels.com/video/{term.replace(' ', '-')}-{1000 + i}/",
+                    "video_files": [
+                        {"quality": "hd", "file_type": "video/mp4", "width": 1920, "height": 1080, "link": link},
+                        {"quality": "sd", "file_type": "video/mp4", "width": 640, "height": 360, "link": link},
+                    ],
+                }
+                for i in range(per_page)
+            ]
+            return self._send(200, {"page": 1, "per_page": per_page, "videos": videos})
+        if path == "/media/clip.mp4":
+            self._sleep("pexels")
+            return self._send(200, raw=media, content_type="video/mp4")
+
+        m = re.fullmatch(r"/v1/jobs/([0-9a-f]+)(/file)?", path)
+        if m:
+            job_id, is_file = m.group(1), bool(m.group(2))
+            self._sleep("ltx")
+            if not is_file:
+                wait = min(float((query.get("wait") or ["0"])[0] or 0), 120.0)
+                time.sleep(min(wait, self.server.ltx.remaining(job_id)))
+            status = self.server.ltx.status(job_id, media)
+            if status is None:
+                return self._send(404, {"detail": "Unknown job"})
+            if not is_file:
+                return self._send(200, status)
+            if status["status"] != "completed":
+                return self._send(409, {"detail": "Job not completed"})
+            return self._send(200, raw=media, content_type="video/mp4")
+        return self._send(404, {"error": f"no stub for GET {path}"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self._body()
+
+        if path == "/api/generate":
+            self._sleep("ollama")
+            return self._send(200, {
+                "model": body.get("model", "stub"),
+                "response": _completion(body.get("prompt") or ""),
+                "done": True,
+            })
+        if re.fullmatch(r"/v1beta/models/[^/:]+:generateContent", path):
+            self._sleep("gemini")
+            texts = [p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", [])]
+            return self._send(200, {
+                "candidates": [{
+                    "content": {"parts": [{"text": _completion(" ".join(texts))}], "role": "model"},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }],
+                "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 200, "totalTokenCount": 300},
+            })
+        if path == "/v1/jobs":
+            self._sleep("ltx")
+            if len(body.get("prompt") or "") < 3:
+                return self._send(422, {"detail": "prompt too short"})
+            return self._send(200, self.server.ltx.create(body))
+        m = re.fullmatch(r"/v1/jobs/([0-9a-f]+)/ack", path)
+        if m:
+            self.server.ltx.forget(m.group(1))
+            return self._send(200, {"acknowledged": True})
+        return self._send(404, {"error": f"no stub for POST {path}"})
+
+
+def serve(host: str = None, port: int = None) -> ThreadingHTTPServer:
+    """Démarre le serveur dans un thread (retourné pour `shutdown()`)."""
+    server = ThreadingHTTPServer((host or os.getenv("STUB_HOST", "127.0.0.1"), port or int(os.getenv("STUB_PORT", "8900"))), StubHandler)
+    server.daemon_threads = True
+    server.media = _media()
+    server.ltx = _LtxJobs()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("STUB_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("STUB_PORT", "8900")))
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port)
+    print(f"🧪 Bouchons Ollama / Gemini / Pexels / LTX sur http://{args.host}:{args.port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import requests
 import json
 from dotenv import load_dotenv
 import time
+from backend.telemetry import traced
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -10,6 +11,7 @@ load_dotenv()
 # Configuration de l'API Claude
 CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")
 
+@traced("research", provider="claude")
 def claude_search(query: str, num_results: int = 5) -> str:
     """Effectue une recherche via l'API Claude en remplacement de DeepSeek."""
     try:
@@ -123,6 +125,7 @@ Les sources doivent être variées et refléter différentes perspectives sur le
         print(f"Erreur Claude: {e}")
         return ""
 
+@traced("llm", provider="claude")
 def claude_generate(prompt: str) -> str:
     """Génère du texte avec Claude en remplacement de DeepSeek."""
     try:
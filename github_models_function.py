@@ -7,6 +7,7 @@ import os
 import json
 import requests
 from dotenv import load_dotenv
+from backend.telemetry import traced
 
 # Charger les variables d'environnement
 load_dotenv()
@@ -16,6 +17,7 @@ GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
 GITHUB_MODEL = os.getenv("GITHUB_MODEL", "gpt-4o")
 API_ENDPOINT = "https://models.inference.ai.azure.com/chat/completions"
 
+@traced("llm", provider="github_models", model=GITHUB_MODEL)
 def github_models_generate(prompt: str, model: str = None, temperature: float = 0.7, max_tokens: int = 4000) -> str:
     """
     Génère du texte avec GitHub Models via l'API OpenAI-compatible.
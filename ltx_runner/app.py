@@ -3,27 +3,47 @@ Worker HTTP pour Lightricks LTX-2 (CLI) + mode démo LTX_MOCK (ffmpeg, sans GPU)
 
 Variables utiles : voir docstring du fichier dans le dépôt (LTX_REPO_ROOT, checkpoints, etc.).
 LTX_MOCK=1 : ignore les checkpoints, génère un MP4 de démonstration aux dimensions demandées.
+LTX_SLOTS / LTX_DEVICES : nombre de jobs simultanés et GPU associés (voir scheduler.py).
+Jobs persistés dans SQLite (voir job_store.py) : reprise après redémarrage, rétention des MP4.
+Requêtes identiques (prompt + spec + seed) dédupliquées : pas de second rendu GPU.
+POST /v1/jobs/{id}/cancel : le demandeur renonce au job (abandonné s'il était le dernier).
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
 import shlex
 import subprocess
 import threading
+import time
+import urllib.request
 import uuid
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, Literal, Optional
 
 from fastapi import Depends, FastAPI, Header, HTTPException, Response
-from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-app = FastAPI(title="Scripty LTX Runner", version="1.1.0")
+from job_store import JobStore
+from mock_video import ffmpeg_demo_video
+from scheduler import Scheduler, estimate_cost
 
-_jobs: Dict[str, Dict[str, Any]] = {}
+app = FastAPI(title="Scripty LTX Runner", version="1.2.0")
+
+# Source de vérité des jobs (statut, requête, webhook) : survit aux redémarrages
+_store = JobStore()
 _lock = threading.Lock()
-_executor = ThreadPoolExecutor(max_workers=1)
+
+# Long-polls / flux SSE : coroutines en attente sur la boucle asyncio (aucun thread du pool
+# bloqué) ; chaque changement de statut, écrit depuis un thread de rendu, les réveille.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_waiters: set = set()
+
+_TERMINAL = ("completed", "failed")
 
 
 def _is_mock() -> bool:
@@ -51,6 +71,11 @@ class JobCreate(BaseModel):
     height: int = Field(default=768, ge=64, le=4096)
     num_frames: int = Field(default=161, ge=9, le=512)
     frame_rate: float = Field(default=24.0, gt=0, le=120)
+    seed: Optional[int] = Field(default=None, ge=0)
+    encode_profile: Literal["preview", "final"] = "final"
+    tier: Literal["free", "pro", "enterprise"] = "free"
+    callback_url: Optional[str] = Field(default=None, max_length=2000)
+    callback_token: Optional[str] = Field(default=None, max_length=500)
 
 
 def _module_for_pipeline(pipeline: str) -> str:
@@ -92,6 +117,8 @@ def _build_command(body: JobCreate, output_path: Path) -> list[str]:
         cmd.extend(["--negative-prompt", body.negative_prompt])
     if body.enhance_prompt and "distilled" not in module:
         cmd.append("--enhance-prompt")
+    if body.seed is not None:
+        cmd.extend(["--seed", str(body.seed)])
     distilled_lora = os.getenv("LTX_DISTILLED_LORA_PATH", "").strip()
     if distilled_lora and "distilled" not in module:
         cmd.extend(["--distilled-lora", distilled_lora, strength])
@@ -101,71 +128,150 @@ def _build_command(body: JobCreate, output_path: Path) -> list[str]:
     return cmd
 
 
-def _ffmpeg_demo_video(path: Path, body: JobCreate) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    w, h = body.width, body.height
-    dur = max(2, min(8, int(body.num_frames / max(body.frame_rate, 1))))
-    rate = min(60, max(1, int(body.frame_rate)))
-    cmd = [
-        "ffmpeg",
-        "-y",
-        "-f",
-        "lavfi",
-        "-i",
-        f"testsrc=duration={dur}:size={w}x{h}:rate={rate}",
-        "-c:v",
-        "libx264",
-        "-pix_fmt",
-        "yuv420p",
-        "-movflags",
-        "+faststart",
-        str(path),
-    ]
-    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+def _update_job(job_id: str, **fields: Any) -> None:
+    with _lock:
+        _store.update(job_id, fields)
+    loop = _loop
+    if loop is not None:
+        try:
+            loop.call_soon_threadsafe(_wake_waiters)
+        except RuntimeError:  # boucle fermée (arrêt du serveur)
+            pass
+
+
+def _wake_waiters() -> None:
+    for event in list(_waiters):
+        event.set()
+
+
+def _subscribe() -> asyncio.Event:
+    """À appeler AVANT de lire le statut : un changement intervenu entre-temps n'est pas perdu."""
+    event = asyncio.Event()
+    _waiters.add(event)
+    return event
+
+
+async def _wait_change(event: asyncio.Event, timeout: float) -> None:
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        _waiters.discard(event)
+
+
+async def _read_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Lecture SQLite (bloquante) dans le pool de threads : la boucle sert les autres long-polls."""
+    return await run_in_threadpool(_store.get, job_id)
+
+
+def _public(job_id: str, job: Dict[str, Any]) -> dict:
+    return {"job_id": job_id, **job}
+
+
+def _fingerprint(body: JobCreate) -> str:
+    """Empreinte de ce qui détermine le MP4 produit (ni le plan ni le webhook n'en font partie)."""
+    spec = body.model_dump(exclude={"tier", "platform", "callback_url", "callback_token"})
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _group_key(body: JobCreate) -> tuple:
+    """Configuration partagée par des jobs enchaînables sans rechargement (affinité de slot)."""
+    return (body.pipeline, body.width, body.height)
+
+
+def _fire_callback(job_id: str) -> None:
+    """POST le statut final vers les webhooks du backend (3 essais, en tâche de fond)."""
+    job = _store.get(job_id) or {}
+    for cb in _store.pop_callbacks(job_id):
+        _send_callback(job_id, job, cb)
+
+
+def _send_callback(job_id: str, job: Dict[str, Any], cb: Dict[str, str]) -> None:
+    def send() -> None:
+        body = json.dumps(_public(job_id, job)).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if cb.get("token"):
+            headers["Authorization"] = f"Bearer {cb['token']}"
+        for attempt in range(3):
+            try:
+                req = urllib.request.Request(cb["url"], data=body, headers=headers, method="POST")
+                with urllib.request.urlopen(req, timeout=15):
+                    return
+            except Exception:
+                time.sleep(2 ** attempt)
+
+    threading.Thread(target=send, daemon=True).start()
+
+
+def _file_digest(path: Path) -> tuple[int, str]:
+    """Taille + sha256 du MP4 produit (vérifiés par le backend après téléchargement)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return path.stat().st_size, h.hexdigest()
+
+
+def _run_subprocess(body: JobCreate, output_path: Path, device: Optional[str]) -> None:
+    repo_root = Path(os.environ["LTX_REPO_ROOT"]).resolve()
+    cmd = _build_command(body, output_path)
+    env = os.environ.copy()
+    if device is not None:
+        env["CUDA_VISIBLE_DEVICES"] = device
+    proc = subprocess.run(
+        cmd,
+        cwd=str(repo_root),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=int(os.getenv("LTX_SUBPROCESS_TIMEOUT_SEC", "7200")),
+    )
     if proc.returncode != 0:
-        err = (proc.stderr or proc.stdout or "ffmpeg failed")[-4000:]
-        raise RuntimeError(err)
+        err = (proc.stderr or proc.stdout or "").strip()[-8000:]
+        raise RuntimeError(err or f"exit {proc.returncode}")
 
 
-def _run_job(job_id: str, body: JobCreate) -> None:
+def _run_job(job_id: str, body: JobCreate, device: Optional[str] = None) -> None:
     out_dir = Path(os.getenv("LTX_OUTPUT_DIR", "./outputs")).resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
     output_path = out_dir / f"{job_id}.mp4"
 
-    with _lock:
-        _jobs[job_id]["status"] = "running"
+    _update_job(job_id, status="running", device=device, started_at=time.time())
 
     try:
         if _is_mock():
-            _ffmpeg_demo_video(output_path, body)
+            ffmpeg_demo_video(output_path, body)
         else:
-            repo_root = Path(os.environ["LTX_REPO_ROOT"]).resolve()
-            cmd = _build_command(body, output_path)
-            proc = subprocess.run(
-                cmd,
-                cwd=str(repo_root),
-                env=os.environ.copy(),
-                capture_output=True,
-                text=True,
-                timeout=int(os.getenv("LTX_SUBPROCESS_TIMEOUT_SEC", "7200")),
-            )
-            if proc.returncode != 0:
-                err = (proc.stderr or proc.stdout or "").strip()[-8000:]
-                raise RuntimeError(err or f"exit {proc.returncode}")
+            _run_subprocess(body, output_path, device)
         if not output_path.is_file():
             raise RuntimeError("Output file missing after inference")
 
-        with _lock:
-            _jobs[job_id]["status"] = "completed"
-            _jobs[job_id]["output_path"] = str(output_path)
+        size_bytes, sha256 = _file_digest(output_path)
+        _update_job(
+            job_id,
+            status="completed",
+            output_path=str(output_path),
+            size_bytes=size_bytes,
+            sha256=sha256,
+            completed_at=time.time(),
+        )
+        if (_store.get(job_id) or {}).get("abandoned"):
+            # Annulé pendant le rendu (voir cancel_job) : personne ne téléchargera la sortie
+            _store.ack(job_id)
+            _wake_janitor.set()
     except Exception as e:
-        with _lock:
-            _jobs[job_id]["status"] = "failed"
-            _jobs[job_id]["error"] = str(e)
+        _update_job(job_id, status="failed", error=str(e))
+    _fire_callback(job_id)
 
 
-@app.post("/v1/jobs")
-def create_job(body: JobCreate, _: None = Depends(_require_token)) -> dict:
+_scheduler = Scheduler(
+    _run_job,
+    sec_per_unit=float(os.getenv("LTX_SEC_PER_COST_UNIT") or (0.02 if _is_mock() else 0.6)),
+)
+
+
+def _check_runtime(body: JobCreate) -> None:
     if not _is_mock():
         for key in (
             "LTX_REPO_ROOT",
@@ -183,37 +289,196 @@ def create_job(body: JobCreate, _: None = Depends(_require_token)) -> dict:
                 detail="LTX_DISTILLED_LORA_PATH is required for the two-stage text-to-video module",
             )
 
-    job_id = uuid.uuid4().hex
+
+def _enqueue(body: JobCreate) -> dict:
+    """Crée le job (ou le rattache à un rendu identique) et le place dans la file."""
+    callback = {"url": body.callback_url, "token": body.callback_token or ""} if body.callback_url else None
+    fingerprint = _fingerprint(body)
     with _lock:
-        _jobs[job_id] = {
+        reusable = _store.find_reusable(fingerprint)
+        if reusable:
+            job_id, state = reusable
+            if state["status"] in _TERMINAL:
+                _store.touch(job_id)
+            _store.attach(job_id, callback if state["status"] not in _TERMINAL else None)
+            if state.get("abandoned"):
+                # Rendu en cours abandonné par son demandeur, de nouveau attendu : sortie conservée
+                state = _store.update(job_id, {"abandoned": False})
+    if reusable:
+        # Même rendu déjà produit ou en cours : aucune minute GPU supplémentaire
+        snapshot = _public(job_id, {**state, "deduplicated": True})
+        if state["status"] not in _TERMINAL:
+            snapshot.update(_scheduler.queue_info(job_id))
+        return snapshot
+
+    job_id = uuid.uuid4().hex
+    cost = estimate_cost(body.num_frames, body.width, body.height, body.pipeline)
+    _store.create(
+        job_id,
+        {
             "status": "queued",
             "pipeline": body.pipeline,
             "platform": body.platform,
+            "tier": body.tier,
+            "estimated_cost": round(cost, 2),
             "mock": _is_mock(),
-        }
-    _executor.submit(_run_job, job_id, body)
-    return {"job_id": job_id}
+        },
+        body.model_dump(exclude={"callback_url", "callback_token"}),
+        callback,
+        fingerprint,
+    )
+    _scheduler.submit(job_id, body, body.tier, cost, _group_key(body))
+    return {"job_id": job_id, "status": "queued", **_scheduler.queue_info(job_id)}
+
+
+@app.post("/v1/jobs")
+def create_job(body: JobCreate, _: None = Depends(_require_token)) -> dict:
+    _check_runtime(body)
+    return _enqueue(body)
 
 
 @app.get("/v1/jobs/{job_id}")
-def job_status(job_id: str, _: None = Depends(_require_token)) -> dict:
-    with _lock:
-        job = _jobs.get(job_id)
-    if not job:
+async def job_status(job_id: str, wait: float = 0, _: None = Depends(_require_token)) -> dict:
+    """
+    Statut du job. `wait` (s, max 120) : long-poll, répond dès que le job est terminé
+    ou à l'expiration du délai.
+    """
+    deadline = time.monotonic() + max(0.0, min(wait, 120.0))
+    while True:
+        event = _subscribe()
+        snapshot = await _read_job(job_id)
+        if not snapshot:
+            _waiters.discard(event)
+            raise HTTPException(status_code=404, detail="Unknown job")
+        remaining = deadline - time.monotonic()
+        if snapshot.get("status") in _TERMINAL or remaining <= 0:
+            _waiters.discard(event)
+            break
+        await _wait_change(event, remaining)
+    if snapshot.get("status") not in _TERMINAL:
+        # Position dans la file (0 = en cours) et ETA estimée
+        snapshot.update(_scheduler.queue_info(job_id))
+    return _public(job_id, snapshot)
+
+
+@app.get("/v1/jobs/{job_id}/events")
+async def job_events(job_id: str, _: None = Depends(_require_token)) -> StreamingResponse:
+    """Flux SSE : un évènement `status` à chaque changement, jusqu'à la fin du job."""
+    if await _read_job(job_id) is None:
         raise HTTPException(status_code=404, detail="Unknown job")
-    return {"job_id": job_id, **job}
+
+    async def stream():
+        last = None
+        while True:
+            event = _subscribe()
+            job = await _read_job(job_id) or {}
+            if job == last:
+                await _wait_change(event, 15)
+                job = await _read_job(job_id) or {}
+            else:
+                _waiters.discard(event)
+            if job == last:
+                yield ": keep-alive\n\n"
+                continue
+            last = job
+            yield f"event: status\ndata: {json.dumps(_public(job_id, job))}\n\n"
+            if job.get("status") in _TERMINAL:
+                return
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 
 @app.get("/v1/jobs/{job_id}/file")
 def job_file(job_id: str, _: None = Depends(_require_token)) -> FileResponse:
-    with _lock:
-        job = _jobs.get(job_id)
+    job = _store.get(job_id)
     if not job or job.get("status") != "completed":
         raise HTTPException(status_code=404, detail="Result not ready")
+    if job.get("output_evicted"):
+        raise HTTPException(status_code=410, detail=f"Output removed ({job['output_evicted']})")
     path = job.get("output_path")
     if not path or not Path(path).is_file():
         raise HTTPException(status_code=404, detail="File missing")
-    return FileResponse(path, media_type="video/mp4", filename=f"{job_id}.mp4")
+    # FileResponse gère les requêtes Range (reprise côté backend)
+    headers = {"X-Content-SHA256": job["sha256"]} if job.get("sha256") else None
+    return FileResponse(path, media_type="video/mp4", filename=f"{job_id}.mp4", headers=headers)
+
+
+@app.post("/v1/jobs/{job_id}/ack")
+def ack_job(job_id: str, _: None = Depends(_require_token)) -> dict:
+    """Le backend confirme avoir téléchargé et vérifié le MP4 : il sera supprimé au prochain nettoyage."""
+    if not _store.ack(job_id):
+        raise HTTPException(status_code=404, detail="Unknown or unfinished job")
+    _wake_janitor.set()
+    return {"job_id": job_id, "acked": True}
+
+
+@app.post("/v1/jobs/{job_id}/cancel")
+def cancel_job(job_id: str, _: None = Depends(_require_token)) -> dict:
+    """
+    Le demandeur n'a plus besoin du job (ex. autre segment de la même vidéo en échec).
+    Sans autre demandeur (requêtes dédupliquées) : retiré de la file s'il n'a pas démarré,
+    sortie supprimée dès la fin du rendu s'il est en cours, acquittée s'il est terminé.
+    """
+    with _lock:
+        released = _store.release(job_id)
+    if released is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    refs, state = released
+    if refs == 0 and state.get("status") not in _TERMINAL:
+        if _scheduler.cancel(job_id):
+            _update_job(job_id, status="failed", error="cancelled", cancelled=True)
+        else:
+            # Déjà sur un slot : le rendu va au bout (sous-processus), sa sortie sera supprimée
+            _update_job(job_id, abandoned=True)
+    if refs == 0 and (_store.get(job_id) or {}).get("status") == "completed" and _store.ack(job_id):
+        _wake_janitor.set()
+    return _public(job_id, {**(_store.get(job_id) or state), "refs": refs})
+
+
+@app.get("/v1/scheduler")
+def scheduler_stats(_: None = Depends(_require_token)) -> dict:
+    return {
+        **_scheduler.stats(),
+        "jobs": _store.stats(),
+    }
+
+
+# Nettoyage périodique des sorties (ack / TTL / budget disque), réveillé aussi par chaque ack
+_wake_janitor = threading.Event()
+
+
+def _janitor_loop() -> None:
+    interval = float(os.getenv("LTX_CLEANUP_INTERVAL_SEC", "600"))
+    while True:
+        try:
+            result = _store.cleanup()
+            if result["evicted"] or result["purged"]:
+                print(f"🧹 Sorties LTX nettoyées: {result}")
+        except Exception as e:
+            print(f"⚠️ Nettoyage des sorties LTX: {e}")
+        _wake_janitor.wait(interval)
+        _wake_janitor.clear()
+
+
+def _recover_jobs() -> None:
+    """Remet en file les jobs interrompus par un arrêt du runner (sortie partielle régénérée)."""
+    for job_id, state, request in _store.interrupted():
+        body = JobCreate(**request)
+        _store.update(job_id, {"status": "queued", "device": None, "recovered": int(state.get("recovered", 0)) + 1})
+        _scheduler.submit(job_id, body, body.tier, float(state.get("estimated_cost") or 0), _group_key(body))
+        print(f"♻️ Job LTX {job_id} repris après redémarrage")
+
+
+@app.on_event("startup")
+async def _bind_loop() -> None:
+    global _loop
+    _loop = asyncio.get_running_loop()
+
+
+@app.on_event("startup")
+def _start_store() -> None:
+    _recover_jobs()
+    threading.Thread(target=_janitor_loop, name="ltx-janitor", daemon=True).start()
 
 
 @app.get("/health")
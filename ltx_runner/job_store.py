@@ -0,0 +1,254 @@
+"""
+Stockage durable des jobs du runner LTX (SQLite).
+
+- Un enregistrement par job : statut public (JSON), requête d'origine (pour re-soumettre
+  après un crash) et webhook de fin (jamais exposé).
+- Reprise : au démarrage, les jobs `queued` / `running` sont remis en file.
+- Déduplication : empreinte (prompt + spec + seed) indexée ; une requête identique est
+  rattachée au job en cours ou à la sortie déjà produite (`refs` compte les demandeurs :
+  un job n'est abandonné que lorsque plus aucun ne l'attend).
+- Rétention des sorties : MP4 supprimé dès que le backend a confirmé le téléchargement
+  (ack), au-delà de LTX_OUTPUT_TTL_SEC, ou du plus ancien au plus récent tant que le
+  dossier dépasse LTX_OUTPUT_MAX_MB.
+
+Env :
+  LTX_JOB_DB             défaut {LTX_OUTPUT_DIR}/jobs.sqlite3
+  LTX_OUTPUT_TTL_SEC     défaut 604800 (7 jours)
+  LTX_OUTPUT_MAX_MB      défaut 0 (pas de limite)
+  LTX_JOB_RETENTION_SEC  défaut 2592000 (30 jours, purge des enregistrements terminés)
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    state TEXT NOT NULL,
+    request TEXT NOT NULL,
+    fingerprint TEXT,
+    callback TEXT,
+    refs INTEGER NOT NULL DEFAULT 1,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    acked_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, updated_at);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS ix_jobs_fingerprint ON jobs (fingerprint, created_at);
+"""
+
+_ACTIVE = ("queued", "running")
+
+
+class JobStore:
+    """Index SQLite des jobs ; une connexion par opération (sûr entre threads)."""
+
+    def __init__(self, path: Optional[str] = None, output_dir: Optional[Path] = None):
+        self.output_dir = (output_dir or Path(os.getenv("LTX_OUTPUT_DIR", "./outputs"))).resolve()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.path = path or os.getenv("LTX_JOB_DB") or str(self.output_dir / "jobs.sqlite3")
+        self.output_ttl = int(os.getenv("LTX_OUTPUT_TTL_SEC", "604800"))
+        self.max_bytes = int(os.getenv("LTX_OUTPUT_MAX_MB", "0")) * 1024 * 1024
+        self.retention = int(os.getenv("LTX_JOB_RETENTION_SEC", "2592000"))
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+            if "fingerprint" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN fingerprint TEXT")
+            if "refs" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN refs INTEGER NOT NULL DEFAULT 1")
+            conn.executescript(_INDEXES)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # --- Jobs -------------------------------------------------------------------
+
+    def create(
+        self,
+        job_id: str,
+        state: Dict[str, Any],
+        request: Dict[str, Any],
+        callback: Optional[Dict[str, str]],
+        fingerprint: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """INSERT INTO jobs (job_id, status, state, request, fingerprint, callback, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    job_id,
+                    state["status"],
+                    json.dumps(state),
+                    json.dumps(request),
+                    fingerprint,
+                    json.dumps([callback]) if callback else None,
+                    now,
+                    now,
+                ),
+            )
+
+    def find_reusable(self, fingerprint: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Job le plus récent de même empreinte : en file / en cours, ou terminé avec sa sortie encore sur disque."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id, state FROM jobs WHERE fingerprint = ? AND status != 'failed' ORDER BY created_at DESC",
+                (fingerprint,),
+            ).fetchall()
+        for row in rows:
+            state = json.loads(row["state"])
+            if state["status"] in _ACTIVE:
+                return row["job_id"], state
+            path = state.get("output_path")
+            if path and os.path.isfile(path):
+                return row["job_id"], state
+        return None
+
+    def touch(self, job_id: str) -> None:
+        """Sortie réutilisée par une requête dédupliquée : annule l'ack et repousse l'expiration."""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET acked_at = NULL, updated_at = ? WHERE job_id = ?", (time.time(), job_id))
+
+    def attach(self, job_id: str, callback: Optional[Dict[str, str]] = None) -> None:
+        """Requête dédupliquée sur ce job : un demandeur de plus, et son webhook s'il en a un."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT callback FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            raw = row["callback"] if row else None
+            if callback:
+                raw = json.dumps(self._callbacks(raw) + [callback])
+            conn.execute("UPDATE jobs SET refs = refs + 1, callback = ? WHERE job_id = ?", (raw, job_id))
+
+    def release(self, job_id: str) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Un demandeur renonce au job : (demandeurs restants, état), ou None si job inconnu."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT refs, state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row:
+                return None
+            refs = max(0, row["refs"] - 1)
+            conn.execute("UPDATE jobs SET refs = ? WHERE job_id = ?", (refs, job_id))
+        return refs, json.loads(row["state"])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row["state"]) if row else None
+
+    def update(self, job_id: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Fusionne `fields` dans l'état public du job ; retourne le nouvel état."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row:
+                raise KeyError(job_id)
+            state = {**json.loads(row["state"]), **fields}
+            conn.execute(
+                "UPDATE jobs SET state = ?, status = ?, updated_at = ? WHERE job_id = ?",
+                (json.dumps(state), state["status"], time.time(), job_id),
+            )
+        return state
+
+    @staticmethod
+    def _callbacks(raw: Optional[str]) -> List[Dict[str, str]]:
+        if not raw:
+            return []
+        value = json.loads(raw)
+        return value if isinstance(value, list) else [value]
+
+    def pop_callbacks(self, job_id: str) -> List[Dict[str, str]]:
+        """Retourne et efface les webhooks (envoyés une seule fois)."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT callback FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if not row or not row["callback"]:
+                return []
+            conn.execute("UPDATE jobs SET callback = NULL WHERE job_id = ?", (job_id,))
+        return self._callbacks(row["callback"])
+
+    def interrupted(self) -> List[Tuple[str, Dict[str, Any], Dict[str, Any]]]:
+        """Jobs non terminés lors du dernier arrêt : [(job_id, état, requête)] par ordre d'arrivée."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT job_id, state, request FROM jobs WHERE status IN ({','.join('?' for _ in _ACTIVE)}) ORDER BY created_at",
+                _ACTIVE,
+            ).fetchall()
+        return [(r["job_id"], json.loads(r["state"]), json.loads(r["request"])) for r in rows]
+
+    def ack(self, job_id: str) -> bool:
+        """Le backend a téléchargé et vérifié la sortie : le MP4 peut être supprimé."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET acked_at = ? WHERE job_id = ? AND status = 'completed'",
+                (time.time(), job_id),
+            )
+        return cur.rowcount > 0
+
+    # --- Rétention --------------------------------------------------------------
+
+    def _evict_output(self, conn: sqlite3.Connection, job_id: str, state: Dict[str, Any], reason: str) -> int:
+        path = state.get("output_path")
+        freed = 0
+        if path:
+            try:
+                freed = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        state = {**state, "output_path": None, "output_evicted": reason}
+        conn.execute("UPDATE jobs SET state = ? WHERE job_id = ?", (json.dumps(state), job_id))
+        return freed
+
+    def cleanup(self) -> Dict[str, int]:
+        """Supprime les sorties confirmées / expirées / hors budget et purge les vieux jobs."""
+        now = time.time()
+        evicted = freed = 0
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT job_id, state, updated_at, acked_at FROM jobs WHERE status = 'completed' ORDER BY updated_at"
+            ).fetchall()
+            kept: List[Tuple[str, Dict[str, Any], int]] = []
+            for row in rows:
+                state = json.loads(row["state"])
+                if not state.get("output_path"):
+                    continue
+                if row["acked_at"]:
+                    reason = "acked"
+                elif self.output_ttl and row["updated_at"] < now - self.output_ttl:
+                    reason = "expired"
+                else:
+                    kept.append((row["job_id"], state, int(state.get("size_bytes") or 0)))
+                    continue
+                freed += self._evict_output(conn, row["job_id"], state, reason)
+                evicted += 1
+            if self.max_bytes:
+                total = sum(size for _, _, size in kept)
+                for job_id, state, size in kept:
+                    if total <= self.max_bytes:
+                        break
+                    freed += self._evict_output(conn, job_id, state, "budget")
+                    total -= size
+                    evicted += 1
+            purged = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND updated_at < ?",
+                (now - self.retention,),
+            ).rowcount
+        return {"evicted": evicted, "freed_bytes": freed, "purged": purged}
+
+    def stats(self) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
@@ -0,0 +1,56 @@
+"""
+Génération vidéo de démonstration (LTX_MOCK) : mire ffmpeg aux dimensions demandées.
+Module sans dépendance à FastAPI pour être importable par les workers résidents.
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+from pathlib import Path
+from typing import Any, Dict
+
+# Profils d'encodage ffmpeg (mode démo), miroir de backend/encode_profiles.py.
+_ENCODE_PROFILES: Dict[str, Dict[str, Any]] = {
+    "preview": {"preset": "ultrafast", "crf": os.getenv("LTX_PREVIEW_CRF", "30"), "scale": 0.5},
+    "final": {"preset": os.getenv("LTX_FINAL_PRESET", "medium"), "crf": os.getenv("LTX_FINAL_CRF", "20"), "scale": 1.0},
+}
+
+
+def _encode_args(profile_name: str) -> list[str]:
+    profile = _ENCODE_PROFILES.get(profile_name, _ENCODE_PROFILES["final"])
+    codec = os.getenv("LTX_VIDEO_CODEC", "libx264")
+    args = ["-c:v", codec]
+    if codec in ("libx264", "libx265"):
+        args.extend(["-preset", profile["preset"], "-crf", str(profile["crf"])])
+    threads = os.getenv("LTX_ENCODE_THREADS", "").strip()
+    if threads:
+        args.extend(["-threads", threads])
+    return args
+
+
+def ffmpeg_demo_video(path: Path, body: Any) -> None:
+    """MP4 de démonstration (testsrc) aux dimensions / cadence de `body` (JobCreate ou équivalent)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scale = _ENCODE_PROFILES.get(body.encode_profile, _ENCODE_PROFILES["final"])["scale"]
+    # Dimensions paires (yuv420p)
+    w, h = int(body.width * scale) // 2 * 2, int(body.height * scale) // 2 * 2
+    dur = max(2, min(8, int(body.num_frames / max(body.frame_rate, 1))))
+    rate = min(60, max(1, int(body.frame_rate)))
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-f",
+        "lavfi",
+        "-i",
+        f"testsrc=duration={dur}:size={w}x{h}:rate={rate}",
+        *_encode_args(body.encode_profile),
+        "-pix_fmt",
+        "yuv420p",
+        "-movflags",
+        "+faststart",
+        str(path),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        err = (proc.stderr or proc.stdout or "ffmpeg failed")[-4000:]
+        raise RuntimeError(err)
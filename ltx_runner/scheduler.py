@@ -0,0 +1,202 @@
+"""
+Ordonnanceur multi-slots du runner LTX.
+
+- N slots d'exécution (LTX_SLOTS), chacun épinglé à un device (LTX_DEVICES="0,1" ->
+  CUDA_VISIBLE_DEVICES du sous-processus).
+- Files par priorité de plan (enterprise > pro > free), puis plus court job d'abord
+  (coût estimé = num_frames × width × height × facteur pipeline), avec vieillissement
+  pour qu'un gros job finisse toujours par passer.
+- Le vieillissement traverse aussi les plans : un job monte d'un rang de plan toutes les
+  LTX_TIER_PROMOTE_SEC d'attente (un job free attend au plus 2 × ce délai avant de
+  concourir avec les jobs enterprise), puis passe devant par son coût vieilli.
+- Affinité de groupe : à priorité égale, un slot enchaîne les jobs de même pipeline et
+  résolution que le précédent (pas de rechargement ni de reconfiguration), dans la limite
+  de LTX_GROUP_MAX_RUN jobs consécutifs.
+- Position dans la file et ETA calculées en simulant la file sur les slots.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+TIER_RANK = {"enterprise": 0, "pro": 1, "free": 2}
+
+# Coût relatif par pipeline (two-stage = génération + upscaling)
+PIPELINE_FACTOR = {"two_stage": 2.0, "one_stage": 1.5, "distilled": 0.5}
+
+
+def estimate_cost(num_frames: int, width: int, height: int, pipeline: str) -> float:
+    """Unités de coût : mégapixels × frames × facteur pipeline."""
+    return num_frames * width * height / 1e6 * PIPELINE_FACTOR.get(pipeline, 1.0)
+
+
+def _devices_from_env() -> List[Optional[str]]:
+    devices = [d.strip() for d in (os.getenv("LTX_DEVICES") or "").split(",") if d.strip()]
+    slots = int(os.getenv("LTX_SLOTS") or len(devices) or 1)
+    if not devices:
+        return [None] * slots
+    return [devices[i % len(devices)] for i in range(slots)]
+
+
+@dataclass
+class _Entry:
+    job_id: str
+    payload: Any
+    tier_rank: int
+    cost: float
+    seq: int
+    group: Optional[tuple] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class Scheduler:
+    """
+    `run_fn(job_id, payload, device)` est appelé dans le thread du slot ; ses exceptions
+    sont de sa responsabilité (le statut du job est géré par l'appelant).
+    """
+
+    def __init__(
+        self,
+        run_fn: Callable[[str, Any, Optional[str]], None],
+        devices: Optional[List[Optional[str]]] = None,
+        sec_per_unit: Optional[float] = None,
+    ):
+        self._run_fn = run_fn
+        self.devices = devices if devices is not None else _devices_from_env()
+        # Secondes par unité de coût, ajusté par moyenne mobile à chaque job terminé
+        self.sec_per_unit = sec_per_unit or float(os.getenv("LTX_SEC_PER_COST_UNIT", "0.6"))
+        # Secondes d'attente qui valent une unité de coût en moins (anti-famine)
+        self.aging = float(os.getenv("LTX_QUEUE_AGING_SEC_PER_UNIT", "10"))
+        # Secondes d'attente qui valent un rang de plan en plus (anti-famine entre plans)
+        self.tier_promote = float(os.getenv("LTX_TIER_PROMOTE_SEC", "900"))
+        self.max_group_run = int(os.getenv("LTX_GROUP_MAX_RUN", "8"))
+        # Dernier groupe exécuté par slot et longueur de la série en cours
+        self._last_group: Dict[int, Tuple[Optional[tuple], int]] = {}
+        self._queue: List[_Entry] = []
+        self._running: Dict[int, Tuple[_Entry, float]] = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._threads = [
+            threading.Thread(target=self._slot_loop, args=(i,), name=f"ltx-slot-{i}", daemon=True)
+            for i in range(len(self.devices))
+        ]
+        for t in self._threads:
+            t.start()
+
+    # --- File -------------------------------------------------------------------
+
+    def submit(self, job_id: str, payload: Any, tier: str, cost: float, group: Optional[tuple] = None) -> None:
+        """`group` : clé de configuration (pipeline, résolution…) pour l'affinité de slot."""
+        entry = _Entry(job_id, payload, TIER_RANK.get(tier, TIER_RANK["free"]), cost, next(self._seq), group)
+        with self._cond:
+            self._queue.append(entry)
+            self._cond.notify()
+
+    def cancel(self, job_id: str) -> bool:
+        """Retire un job pas encore démarré ; False s'il est déjà pris par un slot (ou inconnu)."""
+        with self._cond:
+            for entry in self._queue:
+                if entry.job_id == job_id:
+                    self._queue.remove(entry)
+                    return True
+        return False
+
+    def _rank(self, entry: _Entry, now: float) -> int:
+        """Rang de plan effectif : l'attente promeut le job vers les plans supérieurs."""
+        waited = now - entry.enqueued_at
+        return max(0, entry.tier_rank - int(waited // self.tier_promote)) if self.tier_promote > 0 else entry.tier_rank
+
+    def _key(self, entry: _Entry, now: float) -> tuple:
+        aged = entry.cost - (now - entry.enqueued_at) / self.aging
+        return (self._rank(entry, now), aged, entry.seq)
+
+    def _ordered(self) -> List[_Entry]:
+        now = time.monotonic()
+        return sorted(self._queue, key=lambda e: self._key(e, now))
+
+    def _pick(self, slot: int) -> _Entry:
+        now = time.monotonic()
+        ordered = sorted(self._queue, key=lambda e: self._key(e, now))
+        head = ordered[0]
+        group, run = self._last_group.get(slot, (None, 0))
+        if group is not None and head.group != group and run < self.max_group_run:
+            for entry in ordered:
+                if self._rank(entry, now) != self._rank(head, now):
+                    break
+                if entry.group == group:
+                    return entry
+        return head
+
+    def _next_for(self, slot: int) -> _Entry:
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            entry = self._pick(slot)
+            group, run = self._last_group.get(slot, (None, 0))
+            self._last_group[slot] = (entry.group, run + 1 if entry.group == group else 1)
+            self._queue.remove(entry)
+            self._running[slot] = (entry, time.monotonic())
+            return entry
+
+    def _slot_loop(self, slot: int) -> None:
+        device = self.devices[slot]
+        while True:
+            entry = self._next_for(slot)
+            started = time.monotonic()
+            try:
+                self._run_fn(entry.job_id, entry.payload, device)
+            finally:
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self._running.pop(slot, None)
+                    if entry.cost > 0:
+                        self.sec_per_unit = 0.7 * self.sec_per_unit + 0.3 * (elapsed / entry.cost)
+
+    # --- Observabilité ---------------------------------------------------------
+
+    def slot_of(self, job_id: str) -> Optional[int]:
+        with self._cond:
+            for slot, (entry, _) in self._running.items():
+                if entry.job_id == job_id:
+                    return slot
+        return None
+
+    def queue_info(self, job_id: str) -> Dict[str, Any]:
+        """
+        {queue_position, eta_seconds, slot, device} : position 0 = en cours d'exécution.
+        L'ETA simule l'attribution de la file aux slots dans l'ordre de passage.
+        """
+        with self._cond:
+            now = time.monotonic()
+            free_at = [0.0] * len(self.devices)
+            for slot, (entry, started) in self._running.items():
+                remaining = max(0.0, entry.cost * self.sec_per_unit - (now - started))
+                free_at[slot] = remaining
+                if entry.job_id == job_id:
+                    return {
+                        "queue_position": 0,
+                        "eta_seconds": round(remaining, 1),
+                        "slot": slot,
+                        "device": self.devices[slot],
+                    }
+            for position, entry in enumerate(self._ordered(), start=1):
+                slot = min(range(len(free_at)), key=free_at.__getitem__)
+                done = free_at[slot] + entry.cost * self.sec_per_unit
+                if entry.job_id == job_id:
+                    return {"queue_position": position, "eta_seconds": round(done, 1)}
+                free_at[slot] = done
+        return {}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "slots": len(self.devices),
+                "devices": self.devices,
+                "running": len(self._running),
+                "queued": len(self._queue),
+                "sec_per_cost_unit": round(self.sec_per_unit, 4),
+            }
@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 import json
+import logging
 from datetime import datetime
 import requests
 from fpdf import FPDF
@@ -8,19 +9,27 @@ import google.generativeai as genai
 import re
 from claude_function import claude_search, claude_generate, generate_claude_image_prompt
 from github_models_function import github_models_generate, github_models_generate_json
+from backend.telemetry import span, traced
 
 # Charge les variables d'environnement
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Configuration des APIs
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 CLAUDE_API_KEY = os.getenv("CLAUDE_API_KEY")  # Utilisation de la variable d'environnement
 SCRIPT_PROVIDER = os.getenv("SCRIPT_PROVIDER", "ollama").strip().lower()
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434").rstrip("/")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "qwen2.5:14b-instruct")
+# Point d'accès Gemini alternatif (REST), ex. bouchon local des benchmarks (benchmarks/stubs.py)
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "").strip()
 
 # Configuration de Gemini
-genai.configure(api_key=GEMINI_API_KEY)
+if GEMINI_API_BASE:
+    genai.configure(api_key=GEMINI_API_KEY, transport="rest", client_options={"api_endpoint": GEMINI_API_BASE})
+else:
+    genai.configure(api_key=GEMINI_API_KEY)
 
 def get_working_model():
     """Tente de trouver un modèle Gemini fonctionnel parmi une liste de candidats."""
@@ -35,16 +44,16 @@ def get_working_model():
     
     for candidate in candidates:
         try:
-            print(f"Test du modèle: {candidate}...")
+            logger.debug(f"Test du modèle: {candidate}...")
             model = genai.GenerativeModel(candidate)
             response = model.generate_content("Hello")
             if response and response.text:
-                print(f"OK modele fonctionnel trouve: {candidate}")
+                logger.info(f"OK modele fonctionnel trouve: {candidate}")
                 return model
         except Exception as e:
-            print(f"ECHEC {candidate}: {e}")
+            logger.warning(f"ECHEC {candidate}: {e}")
             
-    print("FATAL: Aucun modèle Gemini ne fonctionne.")
+    logger.error("FATAL: Aucun modèle Gemini ne fonctionne.")
     return None
 
 model = None
@@ -53,12 +62,12 @@ if SCRIPT_PROVIDER == "gemini":
         model = get_working_model()
         if not model:
             raise Exception("Impossible d'initialiser Gemini")
-        print("Configuration Gemini réussie")
+        logger.info("Configuration Gemini réussie")
     except Exception as e:
-        print(f"AVERTISSEMENT: Problème avec la clé API Gemini: {e}")
-        print("Les fonctions Gemini pourraient ne pas fonctionner correctement")
+        logger.warning(f"AVERTISSEMENT: Problème avec la clé API Gemini: {e}")
+        logger.warning("Les fonctions Gemini pourraient ne pas fonctionner correctement")
 else:
-    print(f"Provider scripts actif: {SCRIPT_PROVIDER} ({OLLAMA_MODEL})")
+    logger.info(f"Provider scripts actif: {SCRIPT_PROVIDER} ({OLLAMA_MODEL})")
 
 
 def ollama_generate(prompt: str) -> str:
@@ -72,16 +81,17 @@ def ollama_generate(prompt: str) -> str:
                 "temperature": 0.7,
             },
         }
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/generate",
-            json=payload,
-            timeout=180,
-        )
-        response.raise_for_status()
+        with span("llm", provider="ollama", model=OLLAMA_MODEL):
+            response = requests.post(
+                f"{OLLAMA_BASE_URL}/api/generate",
+                json=payload,
+                timeout=180,
+            )
+            response.raise_for_status()
         data = response.json()
         return (data.get("response") or "").strip()
     except Exception as e:
-        print(f"Erreur Ollama: {e}")
+        logger.error(f"Erreur Ollama: {e}")
         return ""
 
 def gemini_generate(prompt: str) -> str:
@@ -91,7 +101,7 @@ def gemini_generate(prompt: str) -> str:
         text = ollama_generate(prompt)
         if text:
             return text
-        print("WARN: Ollama indisponible, tentative fallback Gemini...")
+        logger.warning("WARN: Ollama indisponible, tentative fallback Gemini...")
 
     max_retries = 3
     retry_delay = 2  # secondes
@@ -101,21 +111,22 @@ def gemini_generate(prompt: str) -> str:
             global model
             # Vérification de la clé API
             if not GEMINI_API_KEY:
-                print("Erreur: Clé API Gemini manquante ou invalide")
+                logger.error("Erreur: Clé API Gemini manquante ou invalide")
                 return ""
             if model is None:
                 model = get_working_model()
                 if model is None:
-                    print("Erreur: impossible d'initialiser Gemini en fallback")
+                    logger.error("Erreur: impossible d'initialiser Gemini en fallback")
                     return ""
             
             try:
                 # Ajout d'un mécanisme de timeout explicite
-                response = model.generate_content(prompt)
+                with span("llm", provider="gemini", model=getattr(model, "model_name", None)):
+                    response = model.generate_content(prompt)
                 if not response or not response.text:
-                    print("Erreur: Réponse Gemini vide")
+                    logger.error("Erreur: Réponse Gemini vide")
                     if attempt < max_retries - 1:
-                        print(f"Nouvelle tentative ({attempt+2}/{max_retries})...")
+                        logger.warning(f"Nouvelle tentative ({attempt+2}/{max_retries})...")
                         import time
                         time.sleep(retry_delay)
                         continue
@@ -133,46 +144,46 @@ def gemini_generate(prompt: str) -> str:
                         json.loads(json_str)
                         return json_str
                     except:
-                        print(f"Erreur: JSON invalide dans la réponse")
-                        print(f"Début de la réponse reçue: {text[:200]}...")
+                        logger.error("Erreur: JSON invalide dans la réponse")
+                        logger.debug("Réponse Gemini non JSON", extra={'response': text})
                         return text
                 
                 return text
             except requests.exceptions.ConnectionError as conn_err:
-                print(f"Erreur de connexion Gemini (tentative {attempt+1}/{max_retries}): {conn_err}")
+                logger.error(f"Erreur de connexion Gemini (tentative {attempt+1}/{max_retries}): {conn_err}")
                 if attempt < max_retries - 1:
-                    print(f"Nouvelle tentative dans {retry_delay} secondes...")
+                    logger.warning(f"Nouvelle tentative dans {retry_delay} secondes...")
                     import time
                     time.sleep(retry_delay)
                     continue
-                print("Échec après plusieurs tentatives")
+                logger.error("Échec après plusieurs tentatives")
                 return ""
             except requests.exceptions.Timeout as timeout_err:
-                print(f"Timeout lors de la connexion à Gemini (tentative {attempt+1}/{max_retries}): {timeout_err}")
+                logger.error(f"Timeout lors de la connexion à Gemini (tentative {attempt+1}/{max_retries}): {timeout_err}")
                 if attempt < max_retries - 1:
-                    print(f"Nouvelle tentative dans {retry_delay} secondes...")
+                    logger.warning(f"Nouvelle tentative dans {retry_delay} secondes...")
                     import time
                     time.sleep(retry_delay)
                     continue
-                print("Échec après plusieurs tentatives")
+                logger.error("Échec après plusieurs tentatives")
                 return ""
             except requests.exceptions.RequestException as req_err:
-                print(f"Erreur de requête Gemini (tentative {attempt+1}/{max_retries}): {req_err}")
+                logger.error(f"Erreur de requête Gemini (tentative {attempt+1}/{max_retries}): {req_err}")
                 if attempt < max_retries - 1:
-                    print(f"Nouvelle tentative dans {retry_delay} secondes...")
+                    logger.warning(f"Nouvelle tentative dans {retry_delay} secondes...")
                     import time
                     time.sleep(retry_delay)
                     continue
-                print("Échec après plusieurs tentatives")
+                logger.error("Échec après plusieurs tentatives")
                 return ""
         except Exception as e:
-            print(f"Erreur Gemini (tentative {attempt+1}/{max_retries}): {e}")
+            logger.error(f"Erreur Gemini (tentative {attempt+1}/{max_retries}): {e}")
             if attempt < max_retries - 1:
-                print(f"Nouvelle tentative dans {retry_delay} secondes...")
+                logger.warning(f"Nouvelle tentative dans {retry_delay} secondes...")
                 import time
                 time.sleep(retry_delay)
                 continue
-            print("Échec après plusieurs tentatives")
+            logger.error("Échec après plusieurs tentatives")
             return ""
 
 # Note: Les fonctions claude_search, claude_generate et generate_claude_image_prompt
@@ -180,6 +191,7 @@ def gemini_generate(prompt: str) -> str:
 
 
 
+@traced("research", provider="gemini")
 def fetch_research(topic: str, max_results: int = 5) -> str:
     """
     Recherche des informations AJOURNÉES sur le web via Gemini Search Tool.
@@ -188,7 +200,7 @@ def fetch_research(topic: str, max_results: int = 5) -> str:
         if not topic:
             return ""
             
-        print(f"🌍 Recherche temps-réel sur: {topic}")
+        logger.info(f"🌍 Recherche temps-réel sur: {topic}")
         
         # Configuration avec l'outil de recherche Google activé
         tools = [
@@ -221,14 +233,15 @@ def fetch_research(topic: str, max_results: int = 5) -> str:
                 
         if not selected_model:
             # Fallback sur le modèle global sans tools si tout échoue
-            print("⚠️ Impossible d'initier un modèle avec Search Tool, utilisation du modèle standard")
+            logger.warning("⚠️ Impossible d'initier un modèle avec Search Tool, utilisation du modèle standard")
             return gemini_generate(f"Recherche ceci: {topic}")
 
         prompt = f"""Recherche les informations les plus récentes et pertinentes sur : "{topic}".
         Résume les points clés avec des citations exactes ou des liens vers les sources trouvées.
         Focalise-toi sur les faits, chiffres, et tendances actuelles."""
         
-        response = selected_model.generate_content(prompt)
+        with span("llm", provider="gemini", model=getattr(selected_model, "model_name", None)):
+            response = selected_model.generate_content(prompt)
         
         # Le modèle renvoie une synthèse avec des liens groundés
         research_text = response.text
@@ -237,11 +250,11 @@ def fetch_research(topic: str, max_results: int = 5) -> str:
         if response.candidates[0].grounding_metadata.search_entry_point:
              research_text += "\n\n(Sources vérifiées via Google Search)"
             
-        print(f"✅ Recherche terminée ({len(research_text)} caractères)")
+        logger.info(f"✅ Recherche terminée ({len(research_text)} caractères)")
         return research_text
 
     except Exception as e:
-        print(f"⚠️ Erreur recherche web (fallback Gemini simple): {e}")
+        logger.error(f"⚠️ Erreur recherche web (fallback Gemini simple): {e}")
         # Fallback simple
         return gemini_generate(f"Donne moi des infos clés sur {topic}")
             
@@ -252,10 +265,10 @@ def extract_sources(research_text: str) -> list:
     source_data = []  # Liste des dictionnaires enrichis: {url, title, type, fiabilité, date}
     
     if not research_text:
-        print("Aucun texte de recherche fourni pour extraire les sources")
+        logger.warning("Aucun texte de recherche fourni pour extraire les sources")
         return source_data
         
-    print(f"Extraction avancée des sources depuis un texte de {len(research_text)} caractères")
+    logger.info(f"Extraction avancée des sources depuis un texte de {len(research_text)} caractères")
     
     # Formats reconnus pour les sources structurées
     source_patterns = [
@@ -278,7 +291,7 @@ def extract_sources(research_text: str) -> list:
         if separator in research_text:
             blocks = research_text.split(separator)
             if len(blocks) > 1:  # Si on a trouvé des blocs, arrêter
-                print(f"Blocs détectés avec séparateur: {separator}")
+                logger.debug("Blocs détectés avec séparateur: %r", separator)
                 break
     
     # Si pas de blocs, traiter le texte entier comme un bloc
@@ -354,7 +367,7 @@ def extract_sources(research_text: str) -> list:
                 else:
                     source_type = "web"
             except Exception as url_error:
-                print(f"Erreur lors de l'analyse de l'URL {source_url}: {url_error}")
+                logger.error(f"Erreur lors de l'analyse de l'URL {source_url}: {url_error}")
                 domain = source_url.split('/')[2] if len(source_url.split('/')) > 2 else source_url
             
             # Si pas de titre spécifié, générer un titre basé sur le domaine
@@ -382,7 +395,7 @@ def extract_sources(research_text: str) -> list:
                     "date": date,
                     "résumé": summary if summary else ""
                 })
-                print(f"Source extraite: [{source_type}] {source_url} - {title}")
+                logger.debug("Source extraite: [%s] %s - %s", source_type, source_url, title)
     
     # 2. Extraction d'URLs directes du texte avec validation avancée
     url_pattern = r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+[/\w\-._~:/?#[\]@!$&\'()*+,;=]*'
@@ -421,13 +434,13 @@ def extract_sources(research_text: str) -> list:
                         "fiabilité": reliability,
                         "date": ""
                     })
-                    print(f"URL extraite du texte: [{source_type}] {url}")
+                    logger.debug("URL extraite du texte: [%s] %s", source_type, url)
             except Exception as validate_error:
-                print(f"URL invalide ignorée: {url} - {validate_error}")
+                logger.debug("URL invalide ignorée: %s - %s", url, validate_error)
     
     # 3. Génération de sources améliorées si nécessaire
     if not source_data:
-        print("Aucune source trouvée, génération de sources simulées basées sur le contenu")
+        logger.warning("Aucune source trouvée, génération de sources simulées basées sur le contenu")
         
         # Extraire les sujets clés du contenu pour des sources plus réalistes
         topics = []
@@ -493,23 +506,23 @@ def extract_sources(research_text: str) -> list:
                 "date": f"{current_year}-{random.randint(1,12):02d}-{random.randint(1,28):02d}",
                 "simulée": True  # Marquer comme simulée
             })
-            print(f"Source simulée générée: [{domain_info['type']}] {source_url} - {topics[i]}")
+            logger.debug("Source simulée générée: [%s] %s - %s", domain_info['type'], source_url, topics[i])
     
-    print(f"{len(sources)} sources uniques extraites et classifiées")
+    logger.info(f"{len(sources)} sources uniques extraites et classifiées")
     
     return source_data  # Retourner les données complètes des sources
 
 def analyze_topic_potential(topic: str) -> dict:
     """Analyse le potentiel d'un sujet en utilisant Claude + Gemini."""
-    print(f"\nAnalyse du potentiel pour: {topic}")
+    logger.info(f"Analyse du potentiel pour: {topic}")
     
     # Recherche de données sur le sujet
     search_data = claude_search(f"{topic} youtube tendances vues engagement", num_results=3)
     if not search_data:
-        print("Aucune donnée trouvée pour l'analyse")
+        logger.warning("Aucune donnée trouvée pour l'analyse")
         return {}
     
-    print("Analyse avec Gemini...")
+    logger.info("Analyse avec Gemini...")
     analysis_prompt = f"""Analyse le potentiel YouTube de ce sujet: "{topic}"
 Basé sur ces données:
 {search_data}
@@ -538,16 +551,17 @@ IMPORTANT: Réponds UNIQUEMENT avec un JSON valide de cette forme:
     response = gemini_generate(analysis_prompt)
     try:
         result = json.loads(response)
-        print("Analyse terminée avec succès")
+        logger.info("Analyse terminée avec succès")
         return result
     except json.JSONDecodeError as e:
-        print(f"Erreur: Analyse invalide - {str(e)}")
+        logger.error(f"Erreur: Analyse invalide - {str(e)}")
         return {}
 
 
+@traced("topics")
 def generate_topics(theme: str, platform: str = "youtube", num_topics: int = 6, user_context: dict = None) -> list:
     """Génère des sujets optimisés pour la plateforme spécifiée (YouTube, TikTok, Instagram)."""
-    print(f"\nRecherche de sujets pour {platform.upper()} sur le thème: {theme}")
+    logger.info(f"Recherche de sujets pour {platform.upper()} sur le thème: {theme}")
     
     # Construction du contexte utilisateur
     user_context_str = ""
@@ -580,7 +594,7 @@ Informations sur le créateur:
     
     specs = platform_specs.get(platform.lower(), platform_specs["youtube"])
     
-    print(f"Génération avec Gemini (1.5 Flash) pour {platform} sur le thème: {theme}")
+    logger.info(f"Génération avec Gemini (1.5 Flash) pour {platform} sur le thème: {theme}")
     prompt = f"""Tu es un expert mondial en stratégie de contenu pour {platform}.
 Ton objectif est de trouver des idées virales pour le thème "{theme}".
 
@@ -612,7 +626,7 @@ IMPORTANT: Ta réponse doit être UNIQUEMENT un objet JSON valide avec cette str
 Ne génère RIEN d'autre que ce JSON."""
 
     # Appel Gemini
-    print("Envoi du prompt à Gemini (1.5 Flash)...")
+    logger.info("Envoi du prompt à Gemini (1.5 Flash)...")
     response = gemini_generate(prompt)
 
     # Traitement de la réponse Gemini
@@ -631,14 +645,14 @@ Ne génère RIEN d'autre que ce JSON."""
                 
             topics = result.get("topics", [])
             if topics:
-                print(f"\n{len(topics)} sujets {platform} générés avec succès")
+                logger.info(f"{len(topics)} sujets {platform} générés avec succès")
                 return topics[:num_topics]
         except json.JSONDecodeError as e:
-            print(f"Erreur JSON Gemini: {e}")
-            print(f"Réponse reçue: {response[:100]}...")
+            logger.error(f"Erreur JSON Gemini: {e}")
+            logger.debug("Réponse de génération des sujets", extra={'response': response})
     
     # Fallback silencieux simple si Gemini échoue totalement
-    print("Utilisation des sujets de secours.")
+    logger.warning("Utilisation des sujets de secours.")
     return [
         {
             "title": f"Pourquoi {theme} est indispensable en 2024",
@@ -666,7 +680,7 @@ def correct_user_input(text: str) -> str:
     if not text or len(text) < 3:
         return text
         
-    print(f"Correction de l'entrée utilisateur: {text}")
+    logger.info(f"Correction de l'entrée utilisateur: {text}")
     try:
         correction_prompt = f"""Tu es un correcteur orthographique et sémantique expert.
 Corrige cette requête utilisateur pour qu'elle soit parfaitement écrite, sans fautes, et formulée comme un sujet de vidéo clair.
@@ -676,13 +690,14 @@ Sortie (UNIQUEMENT le texte corrigé, sans guillemets, sans explications):"""
         corrected = gemini_generate(correction_prompt)
         if corrected and len(corrected) > 3:
             clean = corrected.strip().strip('"').strip("'")
-            print(f"✅ Correction: '{text}' -> '{clean}'")
+            logger.info(f"✅ Correction: '{text}' -> '{clean}'")
             return clean
         return text
     except Exception as e:
-        print(f"Erreur correction: {e}")
+        logger.error(f"Erreur correction: {e}")
         return text
 
+@traced("script")
 def generate_script(topic: str, research: str, platform: str = "youtube", user_context: dict = None, custom_options: dict = None) -> str:
     """Génère un script complet optimisé pour la plateforme choisie avec options personnalisées."""
     
@@ -696,25 +711,25 @@ def generate_script(topic: str, research: str, platform: str = "youtube", user_c
     deep_research = custom_options.get('deep_research', False)
 
     # 1. Correction intelligente de l'entrée (optionnelle en mode rapide)
-    print(f"DEBUG: Starting generate_script for topic='{topic}'")
+    logger.debug("Starting generate_script for topic=%r", topic)
     clean_topic = topic.strip() if isinstance(topic, str) else str(topic)
     if not fast_mode:
         clean_topic = correct_user_input(clean_topic)
-    print(f"DEBUG: Clean topic='{clean_topic}'")
-    print(f"Génération de script pour {platform.upper()}: {topic} (Corrigé: {clean_topic})")
+    logger.debug("Clean topic=%r", clean_topic)
+    logger.info(f"Génération de script pour {platform.upper()}: {topic} (Corrigé: {clean_topic})")
 
     # 2. Recherche web seulement si demandée (ou mode non rapide)
     should_fetch_research = (not research or len(research) < 50) and (deep_research or not fast_mode)
     if should_fetch_research:
-        print(f"DEBUG: Research missing, fetching for: {clean_topic}")
-        print(f"🔍 Recherche approfondie obligatoire pour: {clean_topic}")
+        logger.debug("Research missing, fetching for: %s", clean_topic)
+        logger.info(f"🔍 Recherche approfondie obligatoire pour: {clean_topic}")
         # On utilise fetch_research qui utilise le Google Search Tool (si dispo) ou Gemini
         research = fetch_research(clean_topic)
-        print(f"DEBUG: Research result length: {len(research) if research else 0}")
+        logger.debug("Research result length", extra={'chars': len(research) if research else 0})
         
         # Double check: si fetch_research échoue ou renvoie peu, on force une génération de faits
         if not research or len(research) < 100:
-             print("⚠️ Recherche web insuffisante, génération de faits de secours...")
+             logger.warning("⚠️ Recherche web insuffisante, génération de faits de secours...")
              research = gemini_generate(f"Agis comme un moteur de recherche. Donne-moi 10 faits précis, 5 chiffres clés et 3 anecdotes véridiques sur : {clean_topic}. Sois exhaustif.")
     elif not research:
         # mode rapide sans recherche externe: le prompt reste robuste et explicite ce choix
@@ -841,12 +856,12 @@ FORMAT : Markdown. Précise les sous-titres (INDISPENSABLES sur FB).
     selected_prompt = prompts.get(platform.lower(), prompts["youtube"])
     
     # Génération avec Gemini
-    print("Envoi du prompt à Gemini...")
+    logger.info("Envoi du prompt à Gemini...")
     script = gemini_generate(selected_prompt)
     
     # Fallback robuste si l'API échoue
     if not script:
-        print(f"⚠️ Échec de génération API Gemini pour '{topic}'. Utilisation du générateur de secours.")
+        logger.error(f"⚠️ Échec de génération API Gemini pour '{topic}'. Utilisation du générateur de secours.")
         youtuber_name = "Toi"
         channel_name = "Ta chaîne"
         if user_context:
@@ -904,7 +919,7 @@ Si cette vidéo vous a plu, n'oubliez pas de liker et de vous abonner à {channe
 Merci d'avoir regardé et à bientôt pour une nouvelle vidéo !
 """
     except Exception as e:
-        print(f"Erreur lors de la génération du script de secours: {e}")
+        logger.error(f"Erreur lors de la génération du script de secours: {e}")
         # Dans le pire des cas, retourner un script ultra-basique
         return f"""[HOOK]
 Bienvenue à cette vidéo sur YouTube !
@@ -977,6 +992,7 @@ def sanitize_text(text: str) -> str:
     
     return result
 
+@traced("pdf_render")
 def save_to_pdf(script_text: str, title: str = None, author: str = None, channel: str = None, sources: list = None) -> str:
     """Génération améliorée de PDF avec mise en page professionnelle et affichage optimisé des sources."""
     import tempfile
@@ -985,7 +1001,7 @@ def save_to_pdf(script_text: str, title: str = None, author: str = None, channel
     
     # Gestion défensive des paramètres
     if not script_text:
-        print("Erreur: aucun texte de script fourni pour la génération du PDF")
+        logger.error("Erreur: aucun texte de script fourni pour la génération du PDF")
         return None
         
     # Sanitarisation des sources pour éviter les erreurs
@@ -1009,7 +1025,7 @@ def save_to_pdf(script_text: str, title: str = None, author: str = None, channel
                         'type': 'web'
                     })
             except Exception as e:
-                print(f"Erreur lors de la sanitarisation d'une source: {e}")
+                logger.error(f"Erreur lors de la sanitarisation d'une source: {e}")
                 # Skip this source
     
     try:
@@ -1029,7 +1045,7 @@ def save_to_pdf(script_text: str, title: str = None, author: str = None, channel
         filename = os.path.join(temp_dir, f"{safe_title}_{timestamp}.pdf")
         txt_filename = filename.replace('.pdf', '.txt')
         
-        print(f"Création de PDF à l'emplacement: {filename}")
+        logger.info(f"Création de PDF à l'emplacement: {filename}")
         
         # Toujours créer un fichier texte complet pour référence
         try:
@@ -1060,9 +1076,9 @@ def save_to_pdf(script_text: str, title: str = None, author: str = None, channel
                             source_title = source.get('title', 'Sans titre')
                             f.write(f"[{i}] {source_title} - {source_url}\n")
 
-            print(f"Fichier texte de référence créé: {txt_filename}")
+            logger.info(f"Fichier texte de référence créé: {txt_filename}")
         except Exception as txt_error:
-            print(f"Erreur lors de la création du fichier texte: {txt_error}")
+            logger.error(f"Erreur lors de la création du fichier texte: {txt_error}")
         
         # Créer une classe personnalisée de PDF avec en-tête et pied de page
         class ScriptPDF(FPDF):
@@ -1258,7 +1274,7 @@ def save_to_pdf(script_text: str, title: str = None, author: str = None, channel
                             # Vérifier la structure des sources et s'assurer qu'elle est valide
                             if not source.get('url') and not source.get('title'):
                                 # Source incorrecte, la classer comme non-classée
-                                print(f"Source invalide trouvée: {source}")
+                                logger.debug("Source invalide trouvée: %r", source)
                                 if 'non-classées' not in source_types:
                                     source_types['non-classées'] = []
                                 source_types['non-classées'].append({'url': str(source), 'title': 'Source invalide'})
@@ -1349,7 +1365,7 @@ def save_to_pdf(script_text: str, title: str = None, author: str = None, channel
                                     summary = sanitize_text(summary)
                                         
                                 except Exception as source_err:
-                                    print(f"Erreur lors du traitement de la source: {source_err}")
+                                    logger.error(f"Erreur lors du traitement de la source: {source_err}")
                                     continue
                                 
                                 # Formater l'affichage selon les métadonnées disponibles
@@ -1401,20 +1417,20 @@ def save_to_pdf(script_text: str, title: str = None, author: str = None, channel
             
             # Vérifier que le PDF est valide
             if os.path.exists(filename) and os.path.getsize(filename) > 100:
-                print(f"PDF généré avec succès: {filename}")
+                logger.info(f"PDF généré avec succès: {filename}")
                 return filename
             else:
-                print(f"Le PDF généré est trop petit ou invalide: {filename}")
+                logger.warning(f"Le PDF généré est trop petit ou invalide: {filename}")
                 return txt_filename
                 
         except Exception as pdf_error:
-            print(f"Erreur lors de la génération du PDF: {pdf_error}")
+            logger.error(f"Erreur lors de la génération du PDF: {pdf_error}")
             import traceback
             traceback.print_exc()
             
             # Tentative alternative avec un PDF plus simple
             try:
-                print("Tentative alternative de génération de PDF...")
+                logger.warning("Tentative alternative de génération de PDF...")
                 basic_pdf = FPDF()
                 basic_pdf.add_page()
                 
@@ -1509,18 +1525,18 @@ def save_to_pdf(script_text: str, title: str = None, author: str = None, channel
                 basic_pdf.output(alt_filename)
                 
                 if os.path.exists(alt_filename) and os.path.getsize(alt_filename) > 100:
-                    print(f"PDF alternatif généré avec succès: {alt_filename}")
+                    logger.info(f"PDF alternatif généré avec succès: {alt_filename}")
                     return alt_filename
                 else:
-                    print(f"Échec de la génération du PDF alternatif")
+                    logger.error(f"Échec de la génération du PDF alternatif")
                     return txt_filename
             except Exception as alt_error:
-                print(f"Erreur lors de la génération du PDF alternatif: {alt_error}")
+                logger.error(f"Erreur lors de la génération du PDF alternatif: {alt_error}")
                 traceback.print_exc()
                 return txt_filename
                 
     except Exception as e:
-        print(f"Erreur générale lors de la sauvegarde: {e}")
+        logger.error(f"Erreur générale lors de la sauvegarde: {e}")
         import traceback
         traceback.print_exc()
         return txt_filename
@@ -1579,7 +1595,7 @@ def estimate_reading_time(script_text: str) -> dict:
         }
     
     except Exception as e:
-        print(f"Erreur lors de l'estimation du temps de lecture: {e}")
+        logger.error(f"Erreur lors de l'estimation du temps de lecture: {e}")
         # Retourner une estimation par défaut en cas d'erreur
         return {
             'minutes': 0,
@@ -1603,11 +1619,11 @@ def modify_script_with_ai(script_text: str, instructions: str, profile: dict = N
         str: Le script modifié
     """
     try:
-        print(f"Modification du script avec les instructions: {instructions[:100]}...")
+        logger.info(f"Modification du script avec les instructions: {instructions[:100]}...")
         
         # Valider les entrées
         if not script_text or not instructions:
-            print("Script ou instructions manquants pour la modification")
+            logger.warning("Script ou instructions manquants pour la modification")
             return script_text
             
         # Extraire les informations de profil utiles
@@ -1654,7 +1670,8 @@ def modify_script_with_ai(script_text: str, instructions: str, profile: dict = N
         """
         
         # Générer la réponse
-        response = model.generate_content([system_prompt, prompt])
+        with span("llm", provider="gemini", model=getattr(model, "model_name", None)):
+            response = model.generate_content([system_prompt, prompt])
         
         # Extraire le contenu et vérifier s'il est valide
         if hasattr(response, 'text') and response.text:
@@ -1662,17 +1679,17 @@ def modify_script_with_ai(script_text: str, instructions: str, profile: dict = N
             
             # Vérifier si la réponse est substantiellement différente
             if len(modified_script) > len(script_text) * 0.5:
-                print(f"Script modifié avec succès ({len(modified_script)} caractères)")
+                logger.info(f"Script modifié avec succès ({len(modified_script)} caractères)")
                 return modified_script
             else:
-                print("La modification semble incomplète, utilisation du script original")
+                logger.warning("La modification semble incomplète, utilisation du script original")
                 return script_text
         else:
-            print("Échec de la modification avec Gemini, utilisation du script original")
+            logger.error("Échec de la modification avec Gemini, utilisation du script original")
             return script_text
     
     except Exception as e:
-        print(f"Erreur lors de la modification du script: {e}")
+        logger.error(f"Erreur lors de la modification du script: {e}")
         import traceback
         traceback.print_exc()
         # Retourner le script original en cas d'erreur
@@ -1724,11 +1741,11 @@ Répondre UNIQUEMENT avec le prompt final, rien d'autre.
         if len(words) > 300:
             response = " ".join(words[:300]) + "..."
             
-        print(f"Prompt d'image généré avec succès ({len(response)} caractères)")
+        logger.info(f"Prompt d'image généré avec succès ({len(response)} caractères)")
         return response
         
     except Exception as e:
-        print(f"Erreur lors de la génération du prompt d'image: {e}")
+        logger.error(f"Erreur lors de la génération du prompt d'image: {e}")
         return f"Créer une image représentative pour une vidéo YouTube intitulée '{title}' dans un style moderne et professionnel."
 
 def generate_images_for_script(script_text: str, title: str = "", num_images: int = 3, style: str = "moderne", format: str = "paysage", use_grok: bool = False) -> tuple:
@@ -1885,7 +1902,7 @@ def generate_images_for_script(script_text: str, title: str = "", num_images: in
                         try:
                             large_font = ImageFont.truetype(font_name, height//15)
                             medium_font = ImageFont.truetype(font_name, height//25)
-                            print(f"Police trouvée et utilisée: {font_name}")
+                            logger.debug(f"Police trouvée et utilisée: {font_name}")
                             break
                         except Exception as e:
                             continue
@@ -1894,10 +1911,10 @@ def generate_images_for_script(script_text: str, title: str = "", num_images: in
                     if not large_font or not medium_font:
                         large_font = ImageFont.load_default()
                         medium_font = large_font
-                        print("Utilisation de la police par défaut")
+                        logger.info("Utilisation de la police par défaut")
                 except Exception as font_error:
                     # Utiliser les polices par défaut avec un message d'erreur
-                    print(f"Erreur lors du chargement des polices: {font_error}")
+                    logger.error(f"Erreur lors du chargement des polices: {font_error}")
                     large_font = ImageFont.load_default()
                     medium_font = large_font
                 
@@ -1945,7 +1962,7 @@ def generate_images_for_script(script_text: str, title: str = "", num_images: in
                         progress_messages.append("Le filtre GaussianBlur n'est pas disponible dans cette version de Pillow")
                 except Exception as filter_error:
                     progress_messages.append(f"Info: Effet de filtre non appliqué: {filter_error}")
-                    print(f"Erreur lors de l'application du filtre: {filter_error}")
+                    logger.error(f"Erreur lors de l'application du filtre: {filter_error}")
                 
                 # Ajouter un numéro d'image discrètement
                 d = ImageDraw.Draw(img)
@@ -1960,7 +1977,7 @@ def generate_images_for_script(script_text: str, title: str = "", num_images: in
         
         except ImportError as import_err:
             progress_messages.append(f"Pillow est requis pour la génération d'images: {import_err}")
-            print(f"ImportError détaillée: {import_err}")
+            logger.error(f"ImportError détaillée: {import_err}")
             
             # Tenter d'installer Pillow dynamiquement seulement si autorisé
             try:
@@ -1970,12 +1987,12 @@ def generate_images_for_script(script_text: str, title: str = "", num_images: in
                 
                 if auto_install:
                     import subprocess
-                    print("Installation automatique de Pillow...")
+                    logger.info("Installation automatique de Pillow...")
                     subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'pillow'])
                     progress_messages.append("Pillow installé avec succès, nouvelle tentative de génération...")
                 else:
                     progress_messages.append("L'installation automatique de dépendances n'est pas activée. Veuillez installer manuellement 'pillow'")
-                    print("Pour activer l'installation automatique, définissez la variable d'environnement AUTO_INSTALL_DEPS=true")
+                    logger.warning("Pour activer l'installation automatique, définissez la variable d'environnement AUTO_INSTALL_DEPS=true")
                 
                 # Réessayer après installation
                 try:
@@ -2030,5 +2047,5 @@ def generate_images_for_script(script_text: str, title: str = "", num_images: in
         else:
             progress_messages.append(f"Erreur {error_type} lors de la génération d'images: {error_details}")
         
-        print(f"Erreur détaillée dans generate_images_for_script: {error_details}")
+        logger.error(f"Erreur détaillée dans generate_images_for_script: {error_details}")
         return [], progress_messages
\ No newline at end of file
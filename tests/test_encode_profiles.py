@@ -0,0 +1,39 @@
+"""Paramètres ffmpeg des profils d'encodage (backend/encode_profiles.py)."""
+import pytest
+
+from backend.encode_profiles import FINAL, PREVIEW
+
+
+@pytest.mark.parametrize(
+    "codec, expected",
+    [
+        ("libx264", ["-crf", "20"]),
+        ("libx265", ["-crf", "24"]),
+        ("h264_nvenc", ["-rc", "vbr", "-cq", "20", "-b:v", "0"]),
+        ("h264_qsv", ["-global_quality", "20"]),
+        ("h264_videotoolbox", ["-q:v", "60"]),
+    ],
+)
+def test_final_quality_uses_encoder_scale(monkeypatch, codec, expected):
+    monkeypatch.setenv("VIDEO_CODEC", codec)
+    monkeypatch.delenv("VIDEO_FINAL_CRF", raising=False)
+    assert FINAL.ffmpeg_params()[: len(expected)] == expected
+
+
+def test_videotoolbox_final_better_than_preview(monkeypatch):
+    # -q:v : plus haut = meilleur, à l'inverse du CRF
+    monkeypatch.setenv("VIDEO_CODEC", "h264_videotoolbox")
+    assert int(FINAL.ffmpeg_params()[1]) > int(PREVIEW.ffmpeg_params()[1])
+
+
+def test_unknown_codec_rejected(monkeypatch):
+    monkeypatch.setenv("VIDEO_CODEC", "mpeg4")
+    with pytest.raises(ValueError):
+        FINAL.write_kwargs()
+
+
+def test_crf_read_per_call(monkeypatch):
+    monkeypatch.setenv("VIDEO_CODEC", "libx264")
+    monkeypatch.setenv("VIDEO_FINAL_CRF", "18")
+    assert FINAL.ffmpeg_params()[:2] == ["-crf", "18"]
+    assert FINAL.to_dict()["crf"] == 18
@@ -0,0 +1,71 @@
+"""Lots LTX (POST/GET /api/video/ltx/batch) sur une application minimale, SQLite en mémoire."""
+import pytest
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from backend import ltx_batches, video_routes
+from backend.database import db
+from backend.saas_models import Script, User
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("LTX_RUNNER_URL", "http://runner.test")
+    # Sans Redis : les claims du JWT sont relus en base
+    monkeypatch.setattr("backend.identity.get_redis_client", lambda: None)
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite://", JWT_SECRET_KEY="test", TESTING=True)
+    db.init_app(app)
+    JWTManager(app)
+    app.register_blueprint(video_routes.video_bp, url_prefix="/api/video")
+    with app.app_context():
+        db.create_all()
+        user = User(email="batch@example.com", name="Batch", password_hash="-")
+        user.scripts.append(Script(platform="youtube", title="Premier", content="..."))
+        user.scripts.append(Script(platform="tiktok", title="Second", content="..."))
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=user.id)
+        script_ids = [s.id for s in user.scripts]
+        client = app.test_client()
+        client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+        client.script_ids = script_ids
+        yield client
+        db.session.remove()
+        db.drop_all()
+
+
+def test_unknown_scripts_are_not_found(client):
+    resp = client.post("/api/video/ltx/batch", json={"script_ids": [9001, 9002]})
+    assert resp.status_code == 404
+    assert set(resp.get_json()["rejected"]) == {"9001", "9002"}
+
+
+def test_invalid_ids_are_bad_requests(client):
+    assert client.post("/api/video/ltx/batch", json={"script_ids": ["abc"]}).status_code == 400
+    assert client.post("/api/video/ltx/batch", json={"script_ids": [0]}).status_code == 400
+
+
+def test_plan_rejection_is_forbidden(client, monkeypatch):
+    def refuse(script, user, segmented=False):
+        raise PermissionError("Quota vidéo atteint")
+
+    monkeypatch.setattr(video_routes, "_queue_ltx_generation", refuse)
+    resp = client.post("/api/video/ltx/batch", json={"script_ids": client.script_ids + [9001]})
+    assert resp.status_code == 403
+    assert resp.get_json()["upgrade_required"] is True
+
+
+def test_batch_status_reads_titles_and_job_statuses(client, monkeypatch):
+    first, second = client.script_ids
+    batch = {"batch_id": "ab" * 8, "user_id": 1, "script_ids": [first, second, 9001], "rejected": {}}
+    monkeypatch.setattr(ltx_batches, "load_batch", lambda batch_id: batch)
+    with client.application.app_context():
+        script = db.session.get(Script, first)
+        script.extra_metadata = {"ltx_video": {"status": "completed", "video_url": "/v.mp4"}}
+        db.session.commit()
+
+    body = client.get(f"/api/video/ltx/batch/{batch['batch_id']}").get_json()
+    assert [item["title"] for item in body["items"]] == ["Premier", "Second", None]
+    assert [item["status"] for item in body["items"]] == ["completed", "unknown", "missing"]
+    assert body["counts"] == {"completed": 1, "unknown": 1, "missing": 1}
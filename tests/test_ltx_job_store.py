@@ -0,0 +1,20 @@
+"""Demandeurs d'un job du runner (ltx_runner/job_store.py) : un job partagé n'est pas abandonné."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "ltx_runner"))
+
+from job_store import JobStore  # noqa: E402
+
+
+def test_release_counts_deduplicated_requesters(tmp_path):
+    store = JobStore(path=str(tmp_path / "jobs.sqlite3"), output_dir=tmp_path)
+    store.create("job1", {"status": "queued"}, {"prompt": "p"}, None, "fp")
+    store.attach("job1", {"url": "http://backend/cb", "token": ""})
+
+    refs, state = store.release("job1")
+    assert (refs, state["status"]) == (1, "queued")
+    assert store.pop_callbacks("job1") == [{"url": "http://backend/cb", "token": ""}]
+    assert store.release("job1")[0] == 0
+    assert store.release("job1")[0] == 0
+    assert store.release("unknown") is None
@@ -0,0 +1,38 @@
+"""Ordonnanceur du runner (ltx_runner/scheduler.py) : un job de plan inférieur ne reste pas bloqué."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "ltx_runner"))
+
+from scheduler import Scheduler  # noqa: E402
+
+ROUND_SEC = 60
+
+
+def _dispatch_round(scheduler: Scheduler, n: int) -> str:
+    """Une minute s'écoule, un job enterprise arrive, un slot se libère : job démarré."""
+    for entry in scheduler._queue:
+        entry.enqueued_at -= ROUND_SEC
+    scheduler.submit(f"ent-{n}", None, "enterprise", cost=1.0)
+    entry = scheduler._next_for(0)
+    scheduler._running.pop(0, None)
+    return entry.job_id
+
+
+def test_free_job_is_not_starved_by_enterprise_stream(monkeypatch):
+    monkeypatch.setenv("LTX_TIER_PROMOTE_SEC", "900")
+    monkeypatch.setenv("LTX_QUEUE_AGING_SEC_PER_UNIT", "10")
+    scheduler = Scheduler(lambda *args: None, devices=[])
+    scheduler.submit("free-job", None, "free", cost=50.0)
+
+    started = [_dispatch_round(scheduler, n) for n in range(1, 60)]
+    # Plan respecté tant que l'attente est courte, puis promu (free -> enterprise en 2 × 900 s)
+    assert started.index("free-job") + 1 == 2 * 900 // ROUND_SEC
+
+
+def test_tier_order_holds_for_fresh_jobs():
+    scheduler = Scheduler(lambda *args: None, devices=[])
+    scheduler.submit("free", None, "free", cost=1.0)
+    scheduler.submit("pro", None, "pro", cost=100.0)
+    scheduler.submit("enterprise", None, "enterprise", cost=500.0)
+    assert [e.job_id for e in scheduler._ordered()] == ["enterprise", "pro", "free"]
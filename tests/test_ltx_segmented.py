@@ -0,0 +1,90 @@
+"""Mode segmenté de backend/ltx_workflow.py : reprise sans re-soumission, annulation des jobs frères."""
+import itertools
+
+import pytest
+import requests
+from flask import Flask
+
+from backend import generation_jobs, ltx_workflow
+from backend.database import db
+from backend.ltx_runner_client import LtxJobFailed
+from backend.saas_models import Script, User
+
+PROMPTS = ["scène un", "scène deux", "scène trois"]
+
+
+class FakeRunner:
+    def __init__(self):
+        self._ids = itertools.count(1)
+        self.created, self.acked, self.cancelled = [], [], []
+        self.fail = {}  # job_id -> exception levée par wait_for_job
+
+    def create_job(self, prompt, **kwargs):
+        job_id = f"{next(self._ids):032x}"
+        self.created.append(job_id)
+        return {"job_id": job_id, "status": "queued"}
+
+    def wait_for_job(self, job_id):
+        if job_id in self.fail:
+            raise self.fail.pop(job_id)
+        return {"status": "completed", "sha256": None, "size_bytes": None}
+
+    def download_result(self, job_id, path, **kwargs):
+        with open(path, "wb") as f:
+            f.write(job_id.encode())
+        return job_id
+
+
+@pytest.fixture
+def runner(monkeypatch, tmp_path):
+    fake = FakeRunner()
+    for name in ("create_job", "wait_for_job", "download_result"):
+        monkeypatch.setattr(ltx_workflow, name, getattr(fake, name))
+    monkeypatch.setattr(ltx_workflow, "ack_result", fake.acked.append)
+    monkeypatch.setattr(ltx_workflow, "cancel_job", fake.cancelled.append)
+    monkeypatch.setattr(ltx_workflow, "scene_prompts", lambda *a, **k: list(PROMPTS))
+    monkeypatch.setattr(ltx_workflow, "concat_videos", lambda clips, out: open(out, "wb").close() or True)
+    monkeypatch.setattr(ltx_workflow, "_static_video_dir", lambda: str(tmp_path))
+    monkeypatch.setattr(ltx_workflow, "SEGMENT_DIR", str(tmp_path / "segments"))
+    monkeypatch.setattr(ltx_workflow.quotas, "record", lambda *a, **k: None)
+    monkeypatch.setattr(ltx_workflow.quotas, "release", lambda *a, **k: None)
+
+    app = Flask(__name__)
+    app.config.update(SQLALCHEMY_DATABASE_URI="sqlite://")
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        user = User(email="seg@example.com", name="Seg", password_hash="-")
+        user.scripts.append(Script(platform="youtube", title="Long format", content="[VISUEL] ..."))
+        db.session.add(user)
+        db.session.commit()
+        fake.script_id = user.scripts[0].id
+        generation_jobs.acquire(user.scripts[0], {"mode": "segmented"}, fresh=True)
+        yield fake
+        db.session.remove()
+        db.drop_all()
+
+
+def test_retry_resumes_submitted_segments(runner):
+    first = f"{2:032x}"
+    runner.fail[first] = requests.ConnectionError("runner unreachable")
+    with pytest.raises(ltx_workflow.TransientLtxError):
+        ltx_workflow.run_segmented_ltx_for_script(runner.script_id, retry_transient=True)
+    assert len(runner.created) == 3
+    assert [s["runner_job_id"] for s in generation_jobs.view(runner.script_id)["segments"]] == runner.created
+
+    ltx_workflow.run_segmented_ltx_for_script(runner.script_id, retry_transient=True)
+    ltx = generation_jobs.view(runner.script_id)
+    assert ltx["status"] == "completed"
+    assert len(runner.created) == 3  # aucun rendu repayé
+    assert sorted(runner.acked) == sorted(runner.created)
+    assert not runner.cancelled
+
+
+def test_failed_segment_cancels_siblings(runner):
+    runner.fail[f"{2:032x}"] = LtxJobFailed("CUDA out of memory")
+    ltx_workflow.run_segmented_ltx_for_script(runner.script_id, retry_transient=True)
+    ltx = generation_jobs.view(runner.script_id)
+    assert ltx["status"] == "failed"
+    assert sorted(runner.cancelled) == sorted(runner.created)
+    assert all("runner_job_id" not in seg for seg in ltx["segments"])
@@ -0,0 +1,57 @@
+"""
+Réconciliation des compteurs de quota (backend/quotas.py) contre un Redis en mémoire
+(fakeredis avec Lua) : le compte SQL est simulé, aucune base n'est nécessaire.
+"""
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from backend import quotas, usage_events  # noqa: E402
+
+USER, ACTION = 42, "script_generated"
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(quotas, "get_redis_client", lambda: client)
+    monkeypatch.setattr(usage_events, "flush", lambda: {"flushed": 0})
+    return client
+
+
+def _key():
+    return quotas._keys(USER, ACTION, quotas._month())[0]
+
+
+def test_commit_between_group_by_and_write_is_kept(redis_client, monkeypatch):
+    redis_client.set(_key(), 3)
+
+    def counts_then_concurrent_commit():
+        # GROUP BY terminé (3 en base), puis une consommation confirmée avant l'écriture Redis
+        rows = [(USER, ACTION, 3)]
+        redis_client.eval(quotas._COMMIT, 2, _key(), "unused", "", quotas._KEY_TTL)
+        return rows
+
+    monkeypatch.setattr(quotas, "_db_counts", counts_then_concurrent_commit)
+    quotas.reconcile()
+
+    assert int(redis_client.get(_key())) == 4
+    assert redis_client.ttl(_key()) > 0
+
+
+def test_lagging_counter_is_raised_to_db_count(redis_client, monkeypatch):
+    redis_client.set(_key(), 1)
+    monkeypatch.setattr(quotas, "_db_counts", lambda: [(USER, ACTION, 5)])
+
+    assert quotas.reconcile() == {"updated": 1}
+    assert int(redis_client.get(_key())) == 5
+    assert 0 < redis_client.ttl(_key()) <= quotas._KEY_TTL
+
+
+def test_missing_counter_is_created(redis_client, monkeypatch):
+    monkeypatch.setattr(quotas, "_db_counts", lambda: [(USER, ACTION, 2)])
+
+    quotas.reconcile()
+
+    assert int(redis_client.get(_key())) == 2
@@ -0,0 +1,55 @@
+"""Choix copie / ré-encodage de backend/video_concat.py selon la spec ffprobe des clips."""
+import pytest
+
+from backend import video_concat
+
+SPEC = {
+    "codec": "h264",
+    "profile": "High",
+    "width": 1080,
+    "height": 1920,
+    "fps": "24/1",
+    "pix_fmt": "yuv420p",
+    "audio": ("aac", "48000", 2, "stereo"),
+}
+
+
+@pytest.fixture
+def ffmpeg(monkeypatch, tmp_path):
+    commands = []
+
+    def run(cmd):
+        commands.append(cmd)
+        open(cmd[-1], "wb").close()
+
+    monkeypatch.setattr(video_concat, "_run", run)
+    clips = [str(tmp_path / f"clip{i}.mp4") for i in range(3)]
+    return commands, clips, str(tmp_path / "out.mp4")
+
+
+def test_identical_specs_are_stream_copied(ffmpeg, monkeypatch):
+    commands, clips, out = ffmpeg
+    monkeypatch.setattr(video_concat, "_probe", lambda path: dict(SPEC))
+    assert video_concat.concat_videos(clips, out) is True
+    assert len(commands) == 1 and "copy" in commands[0]
+
+
+@pytest.mark.parametrize(
+    "change",
+    [{"fps": "30/1"}, {"width": 1920, "height": 1080}, {"pix_fmt": "yuv444p"}, {"audio": None}],
+)
+def test_mismatched_clip_is_reencoded_to_first_spec(ffmpeg, monkeypatch, change):
+    commands, clips, out = ffmpeg
+    specs = {clips[0]: SPEC, clips[1]: SPEC, clips[2]: {**SPEC, **change}}
+    monkeypatch.setattr(video_concat, "_probe", specs.get)
+    assert video_concat.concat_videos(clips, out) is False
+    cmd = commands[0]
+    assert "copy" not in cmd
+    assert "scale=1080:1920" in cmd[cmd.index("-vf") + 1] and "fps=24/1" in cmd[cmd.index("-vf") + 1]
+
+
+def test_unreadable_clip_is_reencoded(ffmpeg, monkeypatch):
+    commands, clips, out = ffmpeg
+    monkeypatch.setattr(video_concat, "_probe", lambda path: None)
+    assert video_concat.concat_videos(clips, out) is False
+    assert "-vf" not in commands[0] and "copy" not in commands[0]
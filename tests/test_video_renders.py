@@ -0,0 +1,64 @@
+"""Manifeste des rendus (backend/video_renders.py) sur un Redis en mémoire."""
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from backend import video_renders  # noqa: E402
+
+
+@pytest.fixture
+def render(monkeypatch):
+    monkeypatch.setattr(video_renders, "_redis", fakeredis.FakeRedis(decode_responses=True))
+    return video_renders.create_render(1, "tiktok", {"keywords": ["focus"]})
+
+
+def test_progress_write_keeps_concurrent_status(render, monkeypatch):
+    render_id = render["render_id"]
+    hset = video_renders._redis.pipeline().__class__.hset
+
+    def hset_after_cancel(pipe, key, *args, **kwargs):
+        # Statut posé par l'API pendant qu'une écriture de progression est en cours
+        if "progress" in (kwargs.get("mapping") or {}):
+            video_renders._redis.hset(key, "status", '"cancelled"')
+        return hset(pipe, key, *args, **kwargs)
+
+    monkeypatch.setattr(video_renders._redis.pipeline().__class__, "hset", hset_after_cancel)
+    video_renders.set_progress(render_id, "assembling", 50)
+
+    manifest = video_renders.load_render(render_id)
+    assert manifest["status"] == "cancelled"
+    assert manifest["progress"] == 50.0
+    assert manifest["params"] == {"keywords": ["focus"]}
+
+
+def test_update_returns_full_manifest(render):
+    manifest = video_renders.update_render(render["render_id"], {"status": "preparing"})
+    assert manifest["status"] == "preparing"
+    assert manifest["platform"] == "tiktok"
+    assert manifest["audio_path"] is None
+
+
+def test_stale_preview_inputs_are_swept(render, tmp_path, monkeypatch):
+    monkeypatch.setenv("ASSET_CACHE_DIR", str(tmp_path / "cache"))
+    audio = tmp_path / "voice.mp3"
+    audio.write_bytes(b"id3")
+    render_id = render["render_id"]
+    video_renders.update_render(
+        render_id, {"status": "preview_ready", "audio_path": str(audio), "preview_ready_at": 0}
+    )
+
+    assert video_renders.expire_stale_previews(max_age=3600) == {"expired": 1}
+    assert video_renders.load_render(render_id)["status"] == "expired"
+    assert not audio.exists()
+
+
+def test_recent_preview_kept_and_approval_races_expiry(render):
+    import time
+
+    render_id = render["render_id"]
+    video_renders.update_render(render_id, {"status": "preview_ready", "preview_ready_at": time.time()})
+    assert video_renders.expire_stale_previews(max_age=3600) == {"expired": 0}
+
+    assert video_renders.transition(render_id, "preview_ready", {"status": "final_queued"})["status"] == "final_queued"
+    # Une seconde transition depuis preview_ready (expiration concurrente) échoue
+    assert video_renders.transition(render_id, "preview_ready", {"status": "expired"}) is None
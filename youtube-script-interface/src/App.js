@@ -195,8 +195,8 @@ function App() {
 
     const id = setInterval(async () => {
       try {
-        const res = await axios.get(`${API_URL}/api/scripts/${savedScriptId}`, { headers: getAuthHeaders() });
-        const v = res.data.script?.extra_metadata?.ltx_video;
+        const res = await axios.get(`${API_URL}/api/video/ltx/status/${savedScriptId}`, { headers: getAuthHeaders() });
+        const v = res.data.ltx_video;
         if (v) {
           setAiVideoStatus(v);
         }
@@ -342,7 +342,7 @@ function App() {
         const s = res.data.script;
         setScript(s.content);
         setSavedScriptId(s.id);
-        const lv = s.extra_metadata?.ltx_video;
+        const lv = res.data.ltx_video;
         if (lv) setAiVideoStatus(lv);
         if (res.data.ltx_notice) {
           console.info('Vidéo:', res.data.ltx_notice);
@@ -467,11 +467,21 @@ function App() {
         }, {
           headers: authHeaders
         });
-        setGeneratedVideoUrl(API_URL + res.data.video_url);
+        // Rendu en file (worker Celery) : on suit la progression jusqu'à l'aperçu
+        const statusUrl = `${API_URL}${res.data.status_url}`;
+        let render = res.data.render;
+        while (!['preview_ready', 'completed', 'failed', 'cancelled'].includes(render.status)) {
+          await new Promise((resolve) => setTimeout(resolve, 2000));
+          render = (await axios.get(statusUrl, { headers: authHeaders })).data.render;
+        }
+        if (render.status === 'failed' || render.status === 'cancelled') {
+          throw new Error(render.error || 'Rendu interrompu');
+        }
+        setGeneratedVideoUrl(API_URL + (render.final_url || render.preview_url));
       }
     } catch (err) {
       console.error(err);
-      alert(err.response?.data?.error || "Erreur lors de la génération vidéo.");
+      alert(err.response?.data?.error || err.message || "Erreur lors de la génération vidéo.");
       setStep(3);
     }
     setVideoGenLoading(false);